@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 import copy
+import hashlib
 import os
 import secrets
+import time
+import traceback
 from contextlib import AsyncExitStack, asynccontextmanager
+from email.utils import formatdate, parsedate_to_datetime
 from inspect import signature
 from pathlib import Path
-from typing import Any, Callable, Mapping, Optional, TypeVar, cast
+from typing import Any, Callable, Mapping, NamedTuple, Optional, TypeVar, cast
 
 import starlette.applications
 import starlette.exceptions
@@ -28,10 +33,18 @@ from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from ._autoreload import InjectAutoreloadMiddleware, autoreload_url
 from ._connection import Connection, StarletteConnection
 from ._error import ErrorMiddleware
+from ._fileupload import (
+    UploadTargetArg,
+    check_checksum_algorithm,
+    check_upload_target,
+)
 from ._shinyenv import is_pyodide
 from ._utils import guess_mime_type, is_async_callable, sort_keys_length
+from .cache import Cache, FileCache, MemoryCache
 from .html_dependencies import jquery_deps, require_deps, shiny_deps
 from .http_staticfiles import FileResponse, StaticFiles
+from .reactive._core import FlushModeArg, flush
+from .reactive._equality import fingerprint
 from .session._session import AppSession, Inputs, Outputs, Session, session_context
 
 T = TypeVar("T")
@@ -66,6 +79,50 @@ class App:
         that mount point.
     debug
         Whether to enable debug mode.
+    flush_mode
+        How each session runs the reactive effects (including outputs) that are pending
+        when it flushes. With ``"sequential"`` (the default), effects run one after the
+        other. With ``"concurrent"``, all pending effects with the same priority run
+        concurrently, so that, for example, several async outputs that each wait on a
+        database query can wait at the same time. Higher priority effects always finish
+        before lower priority effects start. This can also be a function that takes a
+        priority level and returns ``"sequential"`` or ``"concurrent"``, to only run
+        some priority levels concurrently.
+    cache
+        A cache that is shared by all sessions of the app, for example for reactive
+        calculations created with ``@reactive.calc(cache="app", ...)``. Defaults to a
+        :class:`~shiny.cache.MemoryCache` with a 200 MB size limit.
+    download_cache
+        A file cache that is shared by all sessions of the app, for the files generated
+        by downloads created with ``@render.download(cache="app", ...)``. Defaults to a
+        :class:`~shiny.cache.FileCache` in a temporary directory, with a 1 GB size
+        limit.
+    ui_cache_key
+        If ``ui`` is a function, a function that takes the
+        :class:`~starlette.requests.Request` and returns a key (e.g., the user's locale
+        or role) that determines the page. The page is rendered once per key and stored
+        in the app's ``cache``, instead of being rendered on every page load. Requests
+        that return the same key must get the same page. Cached pages are sent with
+        ``ETag`` and ``Last-Modified`` headers, so that browsers can revalidate them
+        with conditional requests. By default (``None``), the page is rendered for every
+        request, and sent without these headers.
+    upload_checksum
+        The name of a :mod:`hashlib` algorithm (e.g., ``"sha256"``) with which to
+        compute a checksum of each uploaded file while it is received. The hexadecimal
+        digest is given in the file's ``"checksum"`` entry (see
+        :class:`~shiny.types.FileInfo`), so that the file doesn't need to be read again
+        to verify or deduplicate it. By default (``None``), no checksum is computed.
+    upload_target
+        Where uploaded files are stored. With ``"disk"`` (the default), each file is
+        written to a temporary file, whose path is the file's ``"datapath"``. With
+        ``"mmap"``, the file's ``"file"`` is also a read-only memory map of that file.
+        With ``"spooled"``, each file is a :class:`tempfile.SpooledTemporaryFile` (the
+        file's ``"file"``), which is only written to disk if it's larger than
+        :attr:`upload_spool_max_size`. This can also be an async function that takes the
+        file's info (see :class:`~shiny.types.FileInfo`) and an async iterator of the
+        chunks of the file's data as they are received, and returns a value to use as
+        the file's ``"file"``, for example to parse a CSV file while it's uploaded,
+        without storing it. Each chunk is awaited before the next one is read.
 
     Examples
     --------
@@ -103,6 +160,19 @@ class App:
     The message to show when an error occurs and ``SANITIZE_ERRORS=True``.
     """
 
+    max_message_size: Optional[int] = 256 * 1024
+    """
+    The size (in bytes) above which a serialized output value is sent to the browser in
+    a WebSocket message of its own, instead of in the same message as the session's
+    other outputs. If ``None``, all of the outputs of a flush are sent in one message.
+    """
+
+    upload_spool_max_size: int = 16 * 1024 * 1024
+    """
+    The size (in bytes) above which an uploaded file is moved from memory to disk, when
+    ``upload_target="spooled"``.
+    """
+
     ui: RenderedHTML | Callable[[Request], Tag | TagList]
     server: Callable[[Inputs, Outputs, Session], None]
 
@@ -115,6 +185,12 @@ class App:
         *,
         static_assets: Optional[str | Path | Mapping[str, str | Path]] = None,
         debug: bool = False,
+        flush_mode: FlushModeArg = "sequential",
+        cache: Optional[Cache] = None,
+        download_cache: Optional[FileCache] = None,
+        ui_cache_key: Optional[Callable[[Request], object]] = None,
+        upload_checksum: Optional[str] = None,
+        upload_target: UploadTargetArg = "disk",
     ) -> None:
         # Used to store callbacks to be called when the app is shutting down (according
         # to the ASGI lifespan protocol)
@@ -134,6 +210,26 @@ class App:
             )
 
         self._debug: bool = debug
+        self._flush_mode: FlushModeArg = flush_mode
+
+        if cache is None:
+            cache = MemoryCache()
+        self.cache: Cache = cache
+        """
+        The cache shared by all sessions of the app.
+        """
+
+        if download_cache is None:
+            download_cache = FileCache()
+        self.download_cache: FileCache = download_cache
+        """
+        The file cache shared by all sessions of the app, for downloads.
+        """
+
+        self._ui_cache_key: Optional[Callable[[Request], object]] = ui_cache_key
+        self._upload_checksum: Optional[str] = check_checksum_algorithm(upload_checksum)
+        self._upload_target: UploadTargetArg = check_upload_target(upload_target)
+        self._page_deps: dict[bool, list[HTMLDependency]] = {}
 
         # Settings that the user can change after creating the App object.
         self.lib_prefix: str = LIB_PREFIX
@@ -167,7 +263,7 @@ class App:
 
         self._sessions: dict[str, AppSession] = {}
 
-        self._sessions_needing_flush: dict[int, AppSession] = {}
+        self._sessions_needing_flush: dict[str, AppSession] = {}
 
         self._registered_dependencies: dict[str, HTMLDependency] = {}
         self._dependency_handler = starlette.routing.Router()
@@ -256,6 +352,7 @@ class App:
         if self._debug:
             print(f"remove_session: {session}", flush=True)
         del self._sessions[session]
+        self._sessions_needing_flush.pop(session, None)
 
     def run(self, **kwargs: object) -> None:
         """
@@ -352,12 +449,31 @@ class App:
         Callback passed to the ConnectionManager which is invoked when a HTTP
         request for / occurs.
         """
-        ui: RenderedHTML
-        if callable(self.ui):
+        if not callable(self.ui):
+            return HTMLResponse(content=self.ui["html"])
+
+        if self._ui_cache_key is None:
             ui = self._render_page(self.ui(request), self.lib_prefix)
+            return HTMLResponse(content=ui["html"])
+
+        key_hash = fingerprint(self._ui_cache_key(request))
+        if key_hash is None:
+            raise TypeError(
+                "`ui_cache_key` returned a value that can't be hashed; it must return a "
+                "picklable value."
+            )
+        key = "page:" + self.lib_prefix + ":" + key_hash
+
+        page = self.cache.get(key)
+        if isinstance(page, CachedPage):
+            # The page may have been rendered by another process that shares the cache.
+            self._ensure_web_dependencies(page.dependencies)
         else:
-            ui = self.ui
-        return HTMLResponse(content=ui["html"])
+            page = CachedPage.from_rendered(
+                self._render_page(self.ui(request), self.lib_prefix)
+            )
+            self.cache.set(key, page)
+        return page.response(request)
 
     async def _on_connect_cb(self, ws: starlette.websockets.WebSocket) -> None:
         """
@@ -389,10 +505,27 @@ class App:
     # Flush
     # ==========================================================================
     def _request_flush(self, session: AppSession) -> None:
-        # TODO: Until we have reactive domains, because we can't yet keep track
-        # of which sessions need a flush.
-        pass
-        # self._sessions_needing_flush[session.id] = session
+        # A session flushes its own reactive domain after handling each of its
+        # messages; we only get here when work was queued on an idle session from
+        # somewhere else (e.g., another session set a shared reactive value). Schedule
+        # a flush for just that session.
+        if session.id in self._sessions_needing_flush:
+            return
+        self._sessions_needing_flush[session.id] = session
+        asyncio.create_task(self._flush_session(session))
+
+    async def _flush_session(self, session: AppSession) -> None:
+        domain = session._reactive_domain
+        async with domain.lock:
+            if self._sessions_needing_flush.pop(session.id, None) is None:
+                # The session ended while we were waiting for the lock
+                return
+            try:
+                with domain.use():
+                    await flush()
+            except Exception:
+                traceback.print_exc()
+                await session.close()
 
     # ==========================================================================
     # HTML Dependency stuff
@@ -443,14 +576,21 @@ class App:
         )
         # Make sure requirejs, jQuery, and Shiny come before any other dependencies.
         # (see require_deps() for a comment about why we even include it)
-        ui_res.insert(
-            0,
-            [require_deps(), jquery_deps(), *shiny_deps(include_css=not has_bootstrap)],
-        )
+        ui_res.insert(0, self._get_page_deps(include_css=not has_bootstrap))
         rendered = HTMLDocument(ui_res).render(lib_prefix=lib_prefix)
         self._ensure_web_dependencies(rendered["dependencies"])
         return rendered
 
+    def _get_page_deps(self, include_css: bool) -> list[HTMLDependency]:
+        # These are the same for every page, so only create them once.
+        if include_css not in self._page_deps:
+            self._page_deps[include_css] = [
+                require_deps(),
+                jquery_deps(),
+                *shiny_deps(include_css=include_css),
+            ]
+        return list(self._page_deps[include_css])
+
     def _render_page_from_file(self, file: Path, lib_prefix: str) -> RenderedHTML:
         with open(file, "r") as f:
             page_html = f.read()
@@ -467,6 +607,56 @@ class App:
         return rendered
 
 
+class CachedPage(NamedTuple):
+    """A rendered page, along with the headers that let browsers cache it."""
+
+    html: str
+    dependencies: list[HTMLDependency]
+    etag: str
+    last_modified: float
+
+    @staticmethod
+    def from_rendered(rendered: RenderedHTML) -> CachedPage:
+        html = rendered["html"]
+        return CachedPage(
+            html=html,
+            dependencies=rendered["dependencies"],
+            etag='"' + hashlib.sha1(html.encode("utf-8")).hexdigest() + '"',
+            # HTTP dates have a resolution of one second
+            last_modified=float(int(time.time())),
+        )
+
+    def response(self, request: Request) -> Response:
+        headers = {
+            "ETag": self.etag,
+            "Last-Modified": formatdate(self.last_modified, usegmt=True),
+            # Browsers may store the page, but must check that it's still current.
+            "Cache-Control": "no-cache",
+        }
+        if self.is_not_modified(request):
+            return Response(status_code=304, headers=headers)
+        return HTMLResponse(content=self.html, headers=headers)
+
+    def is_not_modified(self, request: Request) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            # If-None-Match takes precedence over If-Modified-Since
+            etags = [tag.strip() for tag in if_none_match.split(",")]
+            # Weak comparison: ignore the W/ prefix
+            etags = [tag[2:] if tag.startswith("W/") else tag for tag in etags]
+            return "*" in etags or self.etag in etags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return self.last_modified <= since
+
+        return False
+
+
 def is_uifunc(x: Path | Tag | TagList | Callable[[Request], Tag | TagList]) -> bool:
     if (
         isinstance(x, Path)
@@ -53,7 +53,10 @@ class HotReloadHandler(logging.Handler):
 
 # Called from child process when old application instance is shut down
 def reload_begin():
-    pass
+    # Make sure that Shiny Express apps are recompiled from the changed files.
+    from .express._run import clear_compiled_express_files
+
+    clear_compiled_express_files()
 
 
 # Called from child process when new application instance starts up
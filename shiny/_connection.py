@@ -2,12 +2,19 @@ from __future__ import annotations
 
 import asyncio
 from abc import ABC, abstractmethod
-from typing import Optional
+from collections import deque
+from typing import Deque, Optional, Tuple
 
 import starlette.websockets
 from starlette.requests import HTTPConnection
 from starlette.websockets import WebSocketState
 
+CONTROL_MESSAGE_TYPES: Tuple[str, ...] = ("progress", "busy", "recalculating")
+"""
+The types of control messages that may be combined into a single frame, in the order
+in which the client handles the types of a message.
+"""
+
 
 class Connection(ABC):
     """Abstract class to serve a session and send/receive messages to the
@@ -16,6 +23,23 @@ class Connection(ABC):
     @abstractmethod
     async def send(self, message: str) -> None: ...
 
+    async def send_superseding(self, message: str, key: str) -> None:
+        """
+        Send a message that supersedes any earlier message with the same `key`. If the
+        earlier message hasn't been sent yet, it may be dropped. By default, the message
+        is simply sent.
+        """
+        await self.send(message)
+
+    async def send_control(self, message: str, type: str) -> None:
+        """
+        Send a control message, which is a JSON object with the single key `type` (one
+        of `CONTROL_MESSAGE_TYPES`). If it hasn't been sent yet, it may be combined with
+        the control messages around it into one message. By default, the message is
+        simply sent.
+        """
+        await self.send(message)
+
     @abstractmethod
     async def receive(self) -> str: ...
 
@@ -59,11 +83,40 @@ class MockConnection(Connection):
 
 
 class StarletteConnection(Connection):
+    """
+    A connection over a Starlette WebSocket.
+
+    Messages are sent in order by a writer task, so that sending a message (e.g., one
+    for each output that is recalculated in a flush) doesn't wait for the previous
+    message to be written to the socket. If the client is slow to receive messages and
+    more than `high_water_mark` bytes are waiting to be sent, `send()` waits until at
+    most half of that is left, which slows down the session instead of buffering
+    without limit.
+
+    Control messages that are waiting to be sent together are combined into one frame,
+    as long as the client handles them in the order in which they were sent: the client
+    handles each type of message in a frame once, in the order of
+    `CONTROL_MESSAGE_TYPES`.
+    """
+
     conn: starlette.websockets.WebSocket
 
+    high_water_mark: int = 4 * 1024 * 1024
+    """
+    The number of bytes waiting to be sent at which a client is considered slow, and
+    senders wait for the messages to be sent.
+    """
+
     def __init__(self, conn: starlette.websockets.WebSocket):
         self.conn: starlette.websockets.WebSocket = conn
         self._closed = False
+        # The messages that haven't been sent yet, with their keys and control message
+        # types (if any)
+        self._queue: Deque[Tuple[str, Optional[str], Optional[str]]] = deque()
+        self._queued_size: int = 0
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._writer: Optional[asyncio.Task[None]] = None
 
     async def accept(self, subprotocol: Optional[str] = None):
         await self.conn.accept(subprotocol)  # type: ignore
@@ -71,21 +124,87 @@ class StarletteConnection(Connection):
     async def send(self, message: str) -> None:
         if self._is_closed():
             return
+        self._enqueue(message, None, None)
+        await self._drained.wait()
 
-        try:
-            await self.conn.send_text(message)
+    async def send_superseding(self, message: str, key: str) -> None:
+        if self._is_closed():
             return
-        # For the record, websockets.exceptions.ConnectionClosed is one exception I see
-        # when hammering on the browser reload button
-        except Exception:
-            # The contract of WebSocket.send() is to never throw (unless the websocket
-            # is not yet connected; sending a message after the ws has closed is OK.)
-            # However, it's also not very safe to keep using this websocket if we can't
-            # be sure they've received this message. So close it, and then continue as
-            # if nothing is wrong.
-            if not self._is_closed():
-                await self.close(1008, "Send failure")
+        for superseded in [x for x in self._queue if x[1] == key]:
+            self._queue.remove(superseded)
+            self._queued_size -= len(superseded[0])
+        self._enqueue(message, key, None)
+        # Dropping the superseded messages may leave few enough bytes for the senders
+        # that are waiting to continue
+        if self._queued_size <= self.high_water_mark // 2:
+            self._drained.set()
+        await self._drained.wait()
+
+    async def send_control(self, message: str, type: str) -> None:
+        if self._is_closed():
             return
+        self._enqueue(message, None, type)
+        await self._drained.wait()
+
+    @property
+    def is_slow(self) -> bool:
+        """Whether more than `high_water_mark` bytes are waiting to be sent."""
+        return not self._drained.is_set()
+
+    def _enqueue(self, message: str, key: Optional[str], type: Optional[str]) -> None:
+        self._queue.append((message, key, type))
+        self._queued_size += len(message)
+        if self._queued_size > self.high_water_mark:
+            self._drained.clear()
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write())
+
+    async def _write(self) -> None:
+        try:
+            while self._queue and not self._is_closed():
+                message = self._pop_frame()
+                if self._queued_size <= self.high_water_mark // 2:
+                    self._drained.set()
+                try:
+                    await self.conn.send_text(message)
+                # For the record, websockets.exceptions.ConnectionClosed is one
+                # exception I see when hammering on the browser reload button
+                except Exception:
+                    # The contract of WebSocket.send() is to never throw (unless the
+                    # websocket is not yet connected; sending a message after the ws has
+                    # closed is OK.) However, it's also not very safe to keep using this
+                    # websocket if we can't be sure they've received this message. So
+                    # close it, and then continue as if nothing is wrong.
+                    self._writer = None
+                    if not self._is_closed():
+                        await self.close(1008, "Send failure")
+                    return
+        finally:
+            if self._writer is asyncio.current_task():
+                self._writer = None
+            if self._is_closed():
+                self._queue.clear()
+                self._queued_size = 0
+            self._drained.set()
+
+    def _pop_frame(self) -> str:
+        # Take the next message from the queue, combined with the control messages
+        # that follow it if the client would handle them in the same order
+        message, _, type = self._queue.popleft()
+        self._queued_size -= len(message)
+        if type is None:
+            return message
+        parts = [message[1:-1]]
+        order = CONTROL_MESSAGE_TYPES.index(type)
+        while self._queue:
+            next_message, _, next_type = self._queue[0]
+            if next_type is None or CONTROL_MESSAGE_TYPES.index(next_type) <= order:
+                break
+            self._queue.popleft()
+            self._queued_size -= len(next_message)
+            parts.append(next_message[1:-1])
+            order = CONTROL_MESSAGE_TYPES.index(next_type)
+        return "{" + ",".join(parts) + "}"
 
     async def receive(self) -> str:
         if self._is_closed():
@@ -112,6 +231,13 @@ class StarletteConnection(Connection):
         if self._is_closed():
             return
 
+        # Send the messages that are waiting (e.g., an error message) first
+        writer = self._writer
+        if writer is not None:
+            await asyncio.wait([writer])
+            if self._is_closed():
+                return
+
         # Even if self.conn.close() fails, treat this as closed.
         self._closed = True
 
@@ -40,5 +40,27 @@ class PriorityQueueFIFO(Generic[T]):
         iteminfo: tuple[int, int, T] = self._pq.get()
         return iteminfo[2]
 
+    def peek_priority(self) -> int:
+        """
+        Return the priority of the item that would be returned by `get()`, without
+        removing it from the queue.
+        """
+        if self.empty():
+            raise IndexError("peek_priority() called on an empty queue")
+        return -self._pq.queue[0][0]
+
+    def get_batch(self) -> list[T]:
+        """
+        Remove and return all of the items that have the highest priority in the queue,
+        in the order they were inserted.
+        """
+        if self.empty():
+            return []
+        priority = self._pq.queue[0][0]
+        items: list[T] = []
+        while not self._pq.empty() and self._pq.queue[0][0] == priority:
+            items.append(self._pq.get()[2])
+        return items
+
     def empty(self) -> bool:
         return self._pq.empty()
@@ -1,13 +1,31 @@
 from __future__ import annotations
 
+import asyncio
 import copy
+import hashlib
+import mmap
 import os
 import pathlib
 import shutil
 import tempfile
-from typing import BinaryIO, List, Optional, cast
+import time
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    TypeVar,
+    Union,
+    cast,
+)
 
 from . import _utils
+from ._typing_extensions import TypedDict
 from .types import FileInfo
 
 # File uploads happen through a series of requests. This requires a browser
@@ -31,11 +49,115 @@ from .types import FileInfo
 #    with the tag ID and a null message. The messages look like this:
 #    RECV {"method":"uploadEnd","args":["1651ddebfb643a26e6f18aa1","file1"],"tag":3}
 #    SEND {"response":{"tag":3,"value":null}}
+#
+# The data of each file is written to disk in a worker thread, so that writing (and
+# computing a checksum) doesn't hold up the event loop. Received chunks are collected
+# until there are `UPLOAD_WRITE_SIZE` bytes, which are then written while the next
+# chunks are received. At most one write is in progress, so an upload never holds more
+# than about twice that many bytes in memory; when the disk is slower than the network,
+# the request body simply isn't read until the write finishes.
+#
+# Where the files go depends on the app's upload target:
+#
+# * "disk": a file in a temporary directory, whose path is the file's "datapath".
+# * "mmap": the same, and the file's "file" is a read-only memory map of it.
+# * "spooled": a `tempfile.SpooledTemporaryFile`, which stays in memory until it's
+#   larger than `App.upload_spool_max_size`. It is the file's "file" (with no
+#   "datapath").
+# * A function: it's called with the file's info and an async iterator of the chunks
+#   as they are received, and the value that it returns is the file's "file". Nothing
+#   is written to disk.
+
+UPLOAD_WRITE_SIZE = 1024 * 1024
+
+HandleT = TypeVar("HandleT", BinaryIO, mmap.mmap, bytes)
+UploadTargetFn = Callable[[FileInfo, AsyncIterator[bytes]], Awaitable[object]]
+UploadTargetArg = Union[Literal["disk", "spooled", "mmap"], UploadTargetFn]
+
+# The first bytes of common file formats, for files that the browser doesn't know the
+# type of
+_MAGIC_NUMBERS = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF-", "application/pdf"),
+    (b"PK\x03\x04", "application/zip"),
+    (b"\x1f\x8b", "application/gzip"),
+    (b"PAR1", "application/vnd.apache.parquet"),
+    (b"SQLite format 3\x00", "application/vnd.sqlite3"),
+)
+_SNIFF_SIZE = max(len(magic) for magic, _ in _MAGIC_NUMBERS)
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    """
+    Guess the MIME type of a file from its first bytes, or return `None` if it isn't
+    recognized.
+    """
+    for magic, content_type in _MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return content_type
+    return None
+
+
+def check_checksum_algorithm(algorithm: Optional[str]) -> Optional[str]:
+    if algorithm is not None:
+        try:
+            hashlib.new(algorithm)
+        except (ValueError, TypeError):
+            raise ValueError(
+                f"`upload_checksum` must be a `hashlib` algorithm, not {algorithm!r}"
+            ) from None
+    return algorithm
+
+
+def check_upload_target(target: UploadTargetArg) -> UploadTargetArg:
+    if not callable(target) and target not in ("disk", "spooled", "mmap"):
+        raise ValueError(
+            '`upload_target` must be "disk", "spooled", "mmap", or a function, not '
+            + repr(target)
+        )
+    return target
+
+
+def _map_file(path: str) -> mmap.mmap | bytes:
+    with open(path, "rb") as f:
+        # Empty files can't be mapped
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        # The map keeps its own handle of the file
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class UploadProgress(TypedDict):
+    """
+    The progress of a file upload operation (which can consist of multiple files).
+    """
+
+    bytes_received: int
+    """The number of bytes received so far, for all of the files."""
+    bytes_total: int
+    """The total size of the files, as reported by the browser."""
+    files_done: int
+    """The number of files that have been uploaded."""
+    elapsed: float
+    """The number of seconds since the first file started uploading."""
+    throughput: float
+    """The average number of bytes received per second."""
 
 
 class FileUploadOperation:
     def __init__(
-        self, parent: FileUploadManager, id: str, dir: str, file_infos: List[FileInfo]
+        self,
+        parent: FileUploadManager,
+        id: str,
+        dir: str,
+        file_infos: List[FileInfo],
+        *,
+        checksum: Optional[str] = None,
+        target: UploadTargetArg = "disk",
+        spool_max_size: int = 0,
     ) -> None:
         self._parent: FileUploadManager = parent
         self._id: str = id
@@ -46,28 +168,158 @@ class FileUploadOperation:
         ]
         self._n_uploaded: int = 0
         self._current_file_obj: Optional[BinaryIO] = None
+        self._checksum: Optional[str] = checksum
+        self._target: UploadTargetArg = target
+        self._spool_max_size: int = spool_max_size
+        self._hash: Optional["hashlib._Hash"] = None
+        self._head: bytes = b""
+        self._bytes_received: int = 0
+        self._start_time: Optional[float] = None
 
     # Start uploading one of the files.
     def file_begin(self) -> None:
+        if callable(self._target):
+            raise RuntimeError(
+                "Files that are uploaded to a function must be uploaded with "
+                "`write_file()`."
+            )
         file_info: FileInfo = self._file_infos[self._n_uploaded]
-        file_ext = pathlib.Path(file_info["name"]).suffix
-        file_info["datapath"] = os.path.join(
-            self._dir, str(self._n_uploaded) + file_ext
-        )
-        self._current_file_obj = open(file_info["datapath"], "ab")
+        if self._target == "spooled":
+            self._current_file_obj = cast(
+                BinaryIO,
+                tempfile.SpooledTemporaryFile(
+                    max_size=self._spool_max_size, dir=self._dir
+                ),
+            )
+        else:
+            file_ext = pathlib.Path(file_info["name"]).suffix
+            file_info["datapath"] = os.path.join(
+                self._dir, str(self._n_uploaded) + file_ext
+            )
+            self._current_file_obj = open(file_info["datapath"], "ab")
+        self._begin()
+
+    def _begin(self) -> None:
+        self._hash = None if self._checksum is None else hashlib.new(self._checksum)
+        self._head = b""
+        if self._start_time is None:
+            self._start_time = time.monotonic()
 
     # Finish uploading one of the files.
     def file_end(self) -> None:
-        if self._current_file_obj is not None:
-            self._current_file_obj.close()
+        file_obj = self._current_file_obj
+        if file_obj is not None:
+            file_info = self._file_infos[self._n_uploaded]
+            if self._target == "spooled":
+                file_obj.seek(0)
+                file_info["file"] = file_obj
+                self._parent._add_handle(file_obj)
+            else:
+                file_obj.close()
+                if self._target == "mmap":
+                    file_info["file"] = self._parent._add_handle(
+                        _map_file(file_info["datapath"])
+                    )
+            self._end(file_info)
         self._current_file_obj = None
         self._n_uploaded += 1
 
+    def _end(self, file_info: FileInfo) -> None:
+        if self._hash is not None:
+            file_info["checksum"] = self._hash.hexdigest()
+        if file_info["type"] in ("", "application/octet-stream"):
+            file_info["type"] = (
+                sniff_content_type(self._head) or "application/octet-stream"
+            )
+        self._hash = None
+
     # Write a chunk of data for the currently-open file.
     def write_chunk(self, chunk: bytes) -> None:
+        self._bytes_received += len(chunk)
+        self._write(chunk)
+
+    def _write(self, data: bytes) -> None:
         if self._current_file_obj is None:
             raise RuntimeError(f"FileUploadOperation for {self._id} is not open.")
-        self._current_file_obj.write(chunk)
+        self._current_file_obj.write(data)
+        self._inspect(data)
+
+    def _inspect(self, data: bytes) -> None:
+        if self._hash is not None:
+            self._hash.update(data)
+        if len(self._head) < _SNIFF_SIZE:
+            self._head += data[: _SNIFF_SIZE - len(self._head)]
+
+    async def write_file(self, chunks: AsyncIterable[bytes]) -> None:
+        """
+        Upload one of the files from its chunks of data, writing them to disk in a
+        worker thread (or passing them to the upload target function).
+        """
+        if callable(self._target):
+            await self._write_file_to_fn(self._target, chunks)
+            return
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.file_begin)
+
+        pending: Optional[asyncio.Future[None]] = None
+        try:
+            buffer = bytearray()
+            async for chunk in chunks:
+                self._bytes_received += len(chunk)
+                buffer += chunk
+                if len(buffer) < UPLOAD_WRITE_SIZE:
+                    continue
+                if pending is not None:
+                    await pending
+                pending = loop.run_in_executor(None, self._write, bytes(buffer))
+                buffer.clear()
+
+            if pending is not None:
+                await pending
+            if len(buffer) > 0:
+                pending = loop.run_in_executor(None, self._write, bytes(buffer))
+                await pending
+        finally:
+            # Don't close the file while it's being written to
+            if pending is not None and not pending.done():
+                await asyncio.wait([pending])
+            await loop.run_in_executor(None, self.file_end)
+
+    async def _write_file_to_fn(
+        self, fn: UploadTargetFn, chunks: AsyncIterable[bytes]
+    ) -> None:
+        file_info = self._file_infos[self._n_uploaded]
+        self._begin()
+
+        async def received() -> AsyncIterator[bytes]:
+            async for chunk in chunks:
+                self._bytes_received += len(chunk)
+                # Chunks are small, so this doesn't hold up the event loop for long
+                self._inspect(chunk)
+                yield chunk
+
+        try:
+            file_info["file"] = await fn(file_info, received())
+            self._end(file_info)
+        finally:
+            self._hash = None
+            self._n_uploaded += 1
+
+    def progress(self) -> UploadProgress:
+        """
+        The progress of the upload operation.
+        """
+        elapsed = (
+            0.0 if self._start_time is None else time.monotonic() - self._start_time
+        )
+        return {
+            "bytes_received": self._bytes_received,
+            "bytes_total": sum(fi["size"] for fi in self._file_infos),
+            "files_done": self._n_uploaded,
+            "elapsed": elapsed,
+            "throughput": self._bytes_received / elapsed if elapsed > 0 else 0.0,
+        }
 
     # End the entire operation, which can consist of multiple files.
     def finish(self) -> List[FileInfo]:
@@ -87,15 +339,35 @@ class FileUploadOperation:
 
 
 class FileUploadManager:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        checksum: Optional[str] = None,
+        target: UploadTargetArg = "disk",
+        spool_max_size: int = 0,
+    ) -> None:
         # TODO: Remove basedir when app exits.
         self._basedir: str = tempfile.mkdtemp(prefix="fileupload-")
         self._operations: dict[str, FileUploadOperation] = {}
+        self._checksum: Optional[str] = checksum
+        self._target: UploadTargetArg = target
+        self._spool_max_size: int = spool_max_size
+        # Spooled files and memory maps of uploaded files, which are closed when the
+        # session ends
+        self._handles: list[BinaryIO | mmap.mmap] = []
 
     def create_upload_operation(self, file_infos: List[FileInfo]) -> str:
         job_id = _utils.rand_hex(12)
         dir = tempfile.mkdtemp(dir=self._basedir)
-        self._operations[job_id] = FileUploadOperation(self, job_id, dir, file_infos)
+        self._operations[job_id] = FileUploadOperation(
+            self,
+            job_id,
+            dir,
+            file_infos,
+            checksum=self._checksum,
+            target=self._target,
+            spool_max_size=self._spool_max_size,
+        )
         return job_id
 
     def get_upload_operation(self, id: str) -> Optional[FileUploadOperation]:
@@ -104,10 +376,24 @@ class FileUploadManager:
         else:
             return None
 
+    def progress(self) -> Dict[str, UploadProgress]:
+        """
+        The progress of each upload operation that hasn't finished, by job id.
+        """
+        return {job_id: op.progress() for job_id, op in self._operations.items()}
+
     def on_job_finished(self, job_id: str) -> None:
         del self._operations[job_id]
 
+    def _add_handle(self, handle: HandleT) -> HandleT:
+        if not isinstance(handle, bytes):
+            self._handles.append(handle)
+        return handle
+
     # Remove the directories containing file uploads; this is to be called when
     # a session ends.
     def rm_upload_dir(self) -> None:
+        for handle in self._handles:
+            handle.close()
+        self._handles.clear()
         shutil.rmtree(self._basedir)
@@ -0,0 +1,260 @@
+"""
+JSON encoding and decoding for the session protocol, renderers, and data frames.
+
+Shiny uses `orjson <https://github.com/ijl/orjson>`_ when it is installed, and the
+standard library's :mod:`json` module otherwise. Both encoders handle NumPy scalars and
+arrays, dates and times (including pandas timestamps), and pandas' missing value
+markers, which the standard library can't encode on its own.
+
+Values that are already encoded (e.g., data frame rows that were written as JSON by
+pandas) can be wrapped in :class:`RawJson`, so that they are inserted into the encoded
+output as is, instead of being decoded and encoded again.
+"""
+
+from __future__ import annotations
+
+__all__ = (
+    "JsonCodec",
+    "StdlibJsonCodec",
+    "OrjsonCodec",
+    "RawJson",
+    "dumps",
+    "loads",
+    "get_json_codec",
+    "set_json_codec",
+)
+
+import datetime
+import json
+import re
+import uuid
+import weakref
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Literal, Optional, Union
+
+JsonCodecArg = Union[Literal["auto", "orjson", "json"], "JsonCodec"]
+
+
+class JsonCodec(ABC):
+    """
+    Encodes objects as JSON strings, and decodes JSON strings.
+    """
+
+    name: str
+
+    @abstractmethod
+    def dumps(
+        self, obj: object, *, default: Optional[Callable[[Any], Any]] = None
+    ) -> str:
+        """
+        Encode an object as a compact JSON string.
+
+        Parameters
+        ----------
+        obj
+            The object to encode.
+        default
+            A function that is called for objects that can't otherwise be encoded, and
+            that returns an encodable object. When this is given, dates and times are
+            also passed to it.
+        """
+
+    @abstractmethod
+    def loads(self, s: str | bytes) -> Any:
+        """
+        Decode a JSON string. Raises :class:`json.JSONDecodeError` if the string isn't
+        valid JSON.
+        """
+
+
+class RawJson:
+    """
+    JSON text that is inserted into the output of :func:`dumps` as is.
+
+    Parameters
+    ----------
+    json
+        A valid JSON document. It is not checked.
+    """
+
+    __slots__ = ("json", "__weakref__")
+
+    def __init__(self, json: str) -> None:
+        self.json = json
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, RawJson) and self.json == other.json
+
+    def __hash__(self) -> int:
+        return hash(self.json)
+
+    def __repr__(self) -> str:
+        return f"RawJson({self.json!r})"
+
+    def __getstate__(self) -> str:
+        return self.json
+
+    def __setstate__(self, state: str) -> None:
+        self.json = state
+
+
+# While encoding, each RawJson is replaced by a placeholder string that holds its id, and
+# the placeholders are swapped for the raw JSON afterwards. The objects are kept alive by
+# the object being encoded, so they can be looked up by id until then.
+_raw_json_token = "__shiny_raw_json_" + uuid.uuid4().hex + "_"
+_raw_json_pattern = re.compile('"' + _raw_json_token + r'(\d+)"')
+_raw_json_by_id: weakref.WeakValueDictionary[int, RawJson] = (
+    weakref.WeakValueDictionary()
+)
+
+
+def _raw_json_placeholder(x: RawJson) -> str:
+    _raw_json_by_id[id(x)] = x
+    return _raw_json_token + str(id(x))
+
+
+def _insert_raw_json(s: str) -> str:
+    if _raw_json_token not in s:
+        return s
+    return _raw_json_pattern.sub(lambda m: _raw_json_by_id[int(m.group(1))].json, s)
+
+
+def _default(x: Any) -> Any:
+    # Fallback for objects that the encoders don't handle natively.
+    if isinstance(x, RawJson):
+        return _raw_json_placeholder(x)
+    module = type(x).__module__.split(".")[0]
+    if module == "numpy" and hasattr(x, "tolist"):
+        # Arrays become lists, and scalars become Python scalars.
+        return x.tolist()
+    # pandas.NaT (which is a datetime subclass) and pandas.NA
+    if module == "pandas" and type(x).__name__ in ("NaTType", "NAType"):
+        return None
+    # This includes pandas.Timestamp
+    if isinstance(x, (datetime.date, datetime.time)):
+        return x.isoformat()
+
+    raise TypeError(f"Object of type {type(x).__name__} is not JSON serializable")
+
+
+class StdlibJsonCodec(JsonCodec):
+    """A :class:`JsonCodec` that uses Python's built-in :mod:`json` module."""
+
+    name = "json"
+
+    def dumps(
+        self, obj: object, *, default: Optional[Callable[[Any], Any]] = None
+    ) -> str:
+        return json.dumps(
+            obj, separators=(",", ":"), default=_default if default is None else default
+        )
+
+    def loads(self, s: str | bytes) -> Any:
+        return json.loads(s)
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    A :class:`JsonCodec` that uses `orjson`.
+
+    Objects that orjson can't encode, like integers that don't fit in 64 bits, are
+    encoded with the standard library instead.
+    """
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._orjson = orjson
+        self._option: int = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        self._fallback = StdlibJsonCodec()
+
+    def dumps(
+        self, obj: object, *, default: Optional[Callable[[Any], Any]] = None
+    ) -> str:
+        orjson = self._orjson
+        try:
+            if default is None:
+                res = orjson.dumps(obj, default=_default, option=self._option)
+            else:
+                res = orjson.dumps(
+                    obj,
+                    default=default,
+                    option=self._option | orjson.OPT_PASSTHROUGH_DATETIME,
+                )
+        except orjson.JSONEncodeError:
+            # E.g., an integer that is too large for orjson. If the standard library
+            # can't encode the object either, it raises TypeError (or ValueError).
+            return self._fallback.dumps(obj, default=default)
+        return res.decode("utf-8")
+
+    def loads(self, s: str | bytes) -> Any:
+        # orjson.JSONDecodeError is a subclass of json.JSONDecodeError
+        return self._orjson.loads(s)
+
+
+def _auto_codec() -> JsonCodec:
+    try:
+        return OrjsonCodec()
+    except ImportError:
+        return StdlibJsonCodec()
+
+
+_codec: JsonCodec = _auto_codec()
+
+
+def get_json_codec() -> JsonCodec:
+    """Return the :class:`JsonCodec` that Shiny currently uses."""
+    return _codec
+
+
+def set_json_codec(codec: JsonCodecArg) -> None:
+    """
+    Set the JSON codec that Shiny uses.
+
+    Parameters
+    ----------
+    codec
+        ``"orjson"``, ``"json"`` (the standard library), ``"auto"`` (orjson if it's
+        installed, otherwise the standard library), or a :class:`JsonCodec` object.
+    """
+    global _codec
+
+    if isinstance(codec, JsonCodec):
+        _codec = codec
+    elif codec == "auto":
+        _codec = _auto_codec()
+    elif codec == "orjson":
+        _codec = OrjsonCodec()
+    elif codec == "json":
+        _codec = StdlibJsonCodec()
+    else:
+        raise ValueError(
+            '`codec` must be "auto", "orjson", "json", or a JsonCodec object, not '
+            + repr(codec)
+        )
+
+
+def dumps(obj: object, *, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """
+    Encode an object as a compact JSON string, using the current codec. Any
+    :class:`RawJson` values are inserted as is.
+    """
+    if default is not None:
+        default = _with_raw_json(default)
+    return _insert_raw_json(_codec.dumps(obj, default=default))
+
+
+def _with_raw_json(default: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    def default_with_raw_json(x: Any) -> Any:
+        if isinstance(x, RawJson):
+            return _raw_json_placeholder(x)
+        return default(x)
+
+    return default_with_raw_json
+
+
+def loads(s: str | bytes) -> Any:
+    """Decode a JSON string, using the current codec."""
+    return _codec.loads(s)
@@ -50,9 +50,9 @@ def drop_none(x: dict[str, Any]) -> dict[str, object]:
     return {k: v for k, v in x.items() if v is not None}
 
 
-# Intended for use with json.load()'s object_hook parameter.
-# Note also that object_hook is only called on dicts, not on lists, so this
-# won't work for converting "top-level" lists to tuples
+# Recursively convert lists (e.g., in decoded JSON) to tuples, so that they are read
+# only. This walks the object once, so apply it to the fully decoded object, not as a
+# `json.loads()` object_hook (which would re-walk each nested dict).
 def lists_to_tuples(x: object) -> object:
     if isinstance(x, dict):
         x = cast("dict[str, object]", x)
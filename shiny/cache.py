@@ -0,0 +1,572 @@
+"""
+Caches that can be shared across sessions.
+
+A cache maps string keys to (picklable) values. Shiny uses caches to reuse results
+across sessions, e.g., with :func:`~shiny.reactive.calc`'s ``cache`` argument. Each
+:class:`~shiny.App` has a :class:`MemoryCache` by default (``App.cache``), which can be
+replaced with any other :class:`Cache`.
+
+A :class:`FileCache` instead stores files, e.g., the files generated by
+:class:`~shiny.render.download` handlers, so that they can be served from disk.
+"""
+
+from __future__ import annotations
+
+__all__ = (
+    "Cache",
+    "MemoryCache",
+    "DiskCache",
+    "FileCache",
+)
+
+import hashlib
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, BinaryIO, Optional
+
+from .types import MISSING, MISSING_TYPE
+
+
+class Cache(ABC):
+    """
+    Interface for caches that can be used by Shiny.
+
+    Implementations must be safe to use from multiple threads.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Any | MISSING_TYPE:
+        """
+        Get a value from the cache.
+
+        Parameters
+        ----------
+        key
+            The key to look up.
+
+        Returns
+        -------
+        :
+            The value, or :data:`~shiny.types.MISSING` if the key isn't in the cache (or
+            has expired).
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value in the cache, possibly evicting other values.
+
+        Parameters
+        ----------
+        key
+            The key to store the value under.
+        value
+            The value to store.
+        """
+
+    @abstractmethod
+    def remove(self, key: str) -> None:
+        """
+        Remove a value from the cache, if present.
+
+        Parameters
+        ----------
+        key
+            The key to remove.
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Remove all values from the cache.
+        """
+
+
+class MemoryCache(Cache):
+    """
+    An in-memory, least-recently-used cache.
+
+    Parameters
+    ----------
+    max_size
+        The maximum total size of the cached values, in bytes. Sizes are estimated
+        (e.g., from the length of strings and bytes, and the memory usage of arrays and
+        data frames). Values larger than this are not cached. If ``None``, there is no
+        size limit.
+    max_entries
+        The maximum number of values in the cache. If ``None``, there is no limit.
+    ttl
+        The number of seconds after which a cached value expires. If ``None``, values
+        don't expire.
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = 200 * 1024**2,
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ) -> None:
+        self.max_size = max_size
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> (value, size, expiration time)
+        self._entries: OrderedDict[str, tuple[Any, int, float]] = OrderedDict()
+        self._size: int = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | MISSING_TYPE:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            if entry[2] < time.monotonic():
+                self._remove(key)
+                return MISSING
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: Any) -> None:
+        size = size_of(value)
+        expires = float("inf") if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._remove(key)
+            if self.max_size is not None and size > self.max_size:
+                return
+            self._entries[key] = (value, size, expires)
+            self._size += size
+            self._evict()
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def size(self) -> int:
+        """Return the estimated total size of the cached values, in bytes."""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[1]
+
+    def _evict(self) -> None:
+        while self._entries and (
+            (self.max_size is not None and self._size > self.max_size)
+            or (self.max_entries is not None and len(self._entries) > self.max_entries)
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+
+
+class DiskCache(Cache):
+    """
+    A least-recently-used cache that stores pickled values as files in a directory.
+
+    A disk cache can be shared by multiple processes (e.g., multiple workers of the same
+    app) by pointing them at the same directory.
+
+    Parameters
+    ----------
+    directory
+        The directory to store the values in. It is created if it doesn't exist. If
+        ``None``, a new temporary directory is used.
+    max_size
+        The maximum total size of the files in the cache, in bytes. If ``None``, there
+        is no size limit.
+    max_entries
+        The maximum number of files in the cache. If ``None``, there is no limit.
+    ttl
+        The number of seconds after which a cached value expires. If ``None``, values
+        don't expire.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str | Path] = None,
+        max_size: Optional[int] = 1024**3,
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ) -> None:
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix="shiny-cache-")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    def path(self, key: str) -> Path:
+        """Return the path of the file that the value for `key` is stored in."""
+        return self.directory / (hashlib.sha256(key.encode()).hexdigest() + ".pickle")
+
+    def get(self, key: str) -> Any | MISSING_TYPE:
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                expires, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return MISSING
+        now = time.time()
+        if expires is not None and expires < now:
+            self.remove(key)
+            return MISSING
+        try:
+            # The modification time is when the value was stored, and the access time
+            # is when it was last used.
+            os.utime(path, (now, os.stat(path).st_mtime))
+        except OSError:
+            pass
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        expires = None if self.ttl is None else now + self.ttl
+        path = self.path(key)
+        # Write to a temporary file and then rename it, so that other readers never see
+        # a partially written file.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((expires, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.utime(tmp_path, (now, now))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.prune()
+
+    def remove(self, key: str) -> None:
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        with self._lock:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".pickle"):
+                    _remove_quietly(entry.path)
+
+    def prune(self) -> None:
+        """Remove expired files, then the least recently used files over the limits."""
+        if self.max_size is None and self.max_entries is None and self.ttl is None:
+            return
+        with self._lock:
+            now = time.time()
+            files: list[tuple[float, int, str]] = []
+            for entry in os.scandir(self.directory):
+                if not entry.name.endswith(".pickle"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if self.ttl is not None and stat.st_mtime + self.ttl < now:
+                    _remove_quietly(entry.path)
+                    continue
+                files.append((stat.st_atime, stat.st_size, entry.path))
+            files.sort()
+
+            total_size = sum(f[1] for f in files)
+            n = len(files)
+            for _, file_size, file_path in files:
+                if (self.max_size is None or total_size <= self.max_size) and (
+                    self.max_entries is None or n <= self.max_entries
+                ):
+                    break
+                _remove_quietly(file_path)
+                total_size -= file_size
+                n -= 1
+
+
+class FileCache:
+    """
+    A least-recently-used store of files in a directory.
+
+    Unlike a :class:`Cache`, a file cache stores whole files, which are kept on disk
+    and can be served to the browser as they are, e.g., by
+    :class:`~shiny.render.download` with ``cache=``. Like a :class:`DiskCache`, a file
+    cache can be shared by multiple processes by pointing them at the same directory.
+
+    Parameters
+    ----------
+    directory
+        The directory to store the files in. It is created if it doesn't exist. If
+        ``None``, a new temporary directory is used (which is only created when the
+        first file is stored).
+    max_size
+        The maximum total size of the files in the cache, in bytes. If ``None``, there
+        is no size limit. The most recently stored file is kept even if it is larger
+        than this, until the next file is stored.
+    max_entries
+        The maximum number of files in the cache. If ``None``, there is no limit.
+    ttl
+        The number of seconds after which a stored file expires. If ``None``, files
+        don't expire.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str | Path] = None,
+        max_size: Optional[int] = 1024**3,
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ) -> None:
+        self._directory: Optional[Path] = None
+        if directory is not None:
+            self._directory = Path(directory)
+            self._directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self) -> Path:
+        """The directory that the files are stored in."""
+        with self._lock:
+            if self._directory is None:
+                self._directory = Path(tempfile.mkdtemp(prefix="shiny-files-"))
+            return self._directory
+
+    def path(self, key: str) -> Path:
+        """Return the path that the file for `key` is stored at."""
+        return self.directory / (hashlib.sha256(key.encode()).hexdigest() + ".file")
+
+    def get(self, key: str) -> Optional[Path]:
+        """
+        Get the path of a stored file.
+
+        Parameters
+        ----------
+        key
+            The key to look up.
+
+        Returns
+        -------
+        :
+            The path of the file, or ``None`` if the key isn't in the cache (or has
+            expired).
+        """
+        path = self.path(key)
+        return path if self._lookup(path) else None
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        """
+        Open a stored file for reading.
+
+        An open file can still be read after it is evicted (e.g., when another session
+        stores a file), so this is safer than :meth:`get` for serving a file. On
+        Windows, a file that is open isn't evicted until it's closed.
+
+        Parameters
+        ----------
+        key
+            The key to look up.
+
+        Returns
+        -------
+        :
+            The open file, or ``None`` if the key isn't in the cache (or has expired).
+        """
+        path = self.path(key)
+        # Hold the lock, so that the file isn't evicted between the lookup and opening
+        # it
+        with self._lock:
+            if not self._lookup(path):
+                return None
+            return _open_quietly(path)
+
+    def _open_stored(self, path: Path) -> Optional[BinaryIO]:
+        # Open a file that was just stored, even if it has already expired
+        with self._lock:
+            return _open_quietly(path)
+
+    def _lookup(self, path: Path) -> bool:
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        now = time.time()
+        # The modification time is when the file was stored, and the access time is
+        # when it was last used.
+        if self.ttl is not None and stat.st_mtime + self.ttl < now:
+            _remove_quietly(str(path))
+            return False
+        try:
+            os.utime(path, (now, stat.st_mtime))
+        except OSError:
+            pass
+        return True
+
+    def set(self, key: str, file: str | Path, *, move: bool = False) -> Path:
+        """
+        Store a file in the cache, possibly evicting other files.
+
+        Parameters
+        ----------
+        key
+            The key to store the file under.
+        file
+            The path of the file to store.
+        move
+            Whether to move the file into the cache, instead of copying it.
+
+        Returns
+        -------
+        :
+            The path of the stored file.
+        """
+        path = self.path(key)
+        # Move a complete file into place, so that other readers never see a partially
+        # written file.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            if move:
+                shutil.move(file, tmp_path)
+            else:
+                shutil.copyfile(file, tmp_path)
+            now = time.time()
+            os.utime(tmp_path, (now, now))
+            os.replace(tmp_path, path)
+        except BaseException:
+            _remove_quietly(tmp_path)
+            raise
+        self.prune(keep=path)
+        return path
+
+    def remove(self, key: str) -> None:
+        """
+        Remove a file from the cache, if present.
+
+        Parameters
+        ----------
+        key
+            The key to remove.
+        """
+        _remove_quietly(str(self.path(key)))
+
+    def clear(self) -> None:
+        """Remove all files from the cache."""
+        with self._lock:
+            if self._directory is None:
+                return
+            for entry in os.scandir(self._directory):
+                if entry.name.endswith(".file"):
+                    _remove_quietly(entry.path)
+
+    def prune(self, keep: Optional[Path] = None) -> None:
+        """
+        Remove expired files, then the least recently used files over the limits.
+
+        Parameters
+        ----------
+        keep
+            The path of a file to never remove (e.g., one that is about to be served).
+        """
+        with self._lock:
+            if self._directory is None:
+                return
+            now = time.time()
+            files: list[tuple[float, int, str]] = []
+            for entry in os.scandir(self._directory):
+                if not entry.name.endswith(".file"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if self.ttl is not None and stat.st_mtime + self.ttl < now:
+                    _remove_quietly(entry.path)
+                    continue
+                files.append((stat.st_atime, stat.st_size, entry.path))
+            files.sort()
+
+            total_size = sum(f[1] for f in files)
+            n = len(files)
+            for _, file_size, file_path in files:
+                if (self.max_size is None or total_size <= self.max_size) and (
+                    self.max_entries is None or n <= self.max_entries
+                ):
+                    break
+                if keep is not None and file_path == str(keep):
+                    continue
+                _remove_quietly(file_path)
+                total_size -= file_size
+                n -= 1
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except PermissionError:
+        # On Windows, a file that is open can't be removed; it's removed by a later
+        # prune() instead
+        pass
+
+
+def _open_quietly(path: Path) -> Optional[BinaryIO]:
+    try:
+        return open(path, "rb")
+    except FileNotFoundError:
+        return None
+
+
+def size_of(x: object) -> int:
+    """Estimate the size of a value in memory, in bytes."""
+    return _size_of(x, set())
+
+
+def _size_of(x: object, seen: set[int]) -> int:
+    # `seen` holds the ids of the containers that were already counted, so that a
+    # container that is referenced more than once (including by itself) is only counted
+    # once.
+    if isinstance(x, (bytes, bytearray, memoryview, str)):
+        return len(x)
+    if isinstance(x, (dict, list, tuple, set, frozenset)):
+        if id(x) in seen:
+            return 0
+        seen.add(id(x))
+    if isinstance(x, dict):
+        return sys.getsizeof(x) + sum(
+            _size_of(k, seen) + _size_of(v, seen)
+            for k, v in x.items()  # pyright: ignore[reportUnknownVariableType]
+        )
+    if isinstance(x, (list, tuple, set, frozenset)):
+        return sys.getsizeof(x) + sum(
+            _size_of(v, seen) for v in x  # pyright: ignore[reportUnknownVariableType]
+        )
+
+    module = type(x).__module__.split(".")[0]
+    try:
+        if module == "pandas" and hasattr(x, "memory_usage"):
+            usage = x.memory_usage(deep=True)  # pyright: ignore
+            return int(usage.sum() if hasattr(usage, "sum") else usage)
+        if module == "polars" and hasattr(x, "estimated_size"):
+            return int(x.estimated_size())  # pyright: ignore
+        if hasattr(x, "nbytes"):
+            return int(x.nbytes)  # pyright: ignore
+    except Exception:
+        pass
+    return sys.getsizeof(x)
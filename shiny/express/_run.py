@@ -3,18 +3,21 @@ from __future__ import annotations
 import ast
 import importlib.abc
 import importlib.util
+import os
 import sys
 import types
 from importlib.machinery import ModuleSpec
 from pathlib import Path
-from typing import Mapping, Sequence, cast
+from typing import Mapping, NamedTuple, Sequence, cast
 
 from htmltools import Tag, TagList
 
 from .._app import App
 from .._docstring import no_example
+from .._fileupload import UploadTargetArg
 from .._typing_extensions import NotRequired, TypedDict
 from .._utils import import_module_from_path
+from ..reactive._core import FlushModeArg
 from ..session import Inputs, Outputs, Session, get_current_session, session_context
 from ..types import MISSING, MISSING_TYPE
 from ._is_express import find_magic_comment_mode
@@ -178,12 +181,8 @@ def run_express(file: Path, package_name: str | None = None) -> Tag | TagList:
         and should be something like "shiny_express_app_0". The purpose of this is to
         allow relative imports in the app code.
     """
-    with open(file, encoding="utf-8") as f:
-        content = f.read()
-
-    tree = ast.parse(content, file)
-    tree = DisplayFuncsTransformer().visit(tree)
-    tree = ast.fix_missing_locations(tree)
+    compiled = compile_express_file(file)
+    content = compiled.content
 
     ui_result: Tag | TagList = TagList()
 
@@ -198,7 +197,7 @@ def run_express(file: Path, package_name: str | None = None) -> Tag | TagList:
         reset_top_level_recall_context_manager()
         get_top_level_recall_context_manager().__enter__()
 
-        file_path = str(file.resolve())
+        file_path = compiled.file_path
 
         var_context: dict[str, object] = {
             "__file__": file_path,
@@ -209,19 +208,8 @@ def run_express(file: Path, package_name: str | None = None) -> Tag | TagList:
         }
 
         # Execute each top-level node in the AST
-        for node in tree.body:
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                exec(
-                    compile(ast.Module([node], type_ignores=[]), file_path, "exec"),
-                    var_context,
-                    var_context,
-                )
-            else:
-                exec(
-                    compile(ast.Interactive([node]), file_path, "single"),
-                    var_context,
-                    var_context,
-                )
+        for code in compiled.code:
+            exec(code, var_context, var_context)
 
         # When we called the function to get the top level recall context manager, we didn't
         # store the result in a variable and re-use that variable here. That is intentional,
@@ -258,6 +246,56 @@ def run_express(file: Path, package_name: str | None = None) -> Tag | TagList:
         sys.displayhook = prev_displayhook
 
 
+class CompiledExpressFile(NamedTuple):
+    file_path: str
+    content: str
+    code: list[types.CodeType]
+    """One code object for each top-level node in the file."""
+
+
+# Compiled app files, along with the modification time and size of the file when it was
+# compiled. The code is the same for every session, so it only needs to be parsed,
+# transformed, and compiled again when the file changes.
+_compiled_express_files: dict[str, tuple[tuple[int, int], CompiledExpressFile]] = {}
+
+
+def compile_express_file(file: Path) -> CompiledExpressFile:
+    """
+    Parse, transform, and compile the code in a Shiny Express app file. The result is
+    cached until the file's modification time or size changes.
+    """
+    file_path = str(file.resolve())
+    stat = os.stat(file_path)
+    version = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _compiled_express_files.get(file_path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with open(file_path, encoding="utf-8") as f:
+        content = f.read()
+
+    tree = ast.parse(content, file_path)
+    tree = DisplayFuncsTransformer().visit(tree)
+    tree = ast.fix_missing_locations(tree)
+
+    code: list[types.CodeType] = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            code.append(compile(ast.Module([node], type_ignores=[]), file_path, "exec"))
+        else:
+            code.append(compile(ast.Interactive([node]), file_path, "single"))
+
+    compiled = CompiledExpressFile(file_path=file_path, content=content, code=code)
+    _compiled_express_files[file_path] = (version, compiled)
+    return compiled
+
+
+def clear_compiled_express_files() -> None:
+    """Forget all compiled Shiny Express app files."""
+    _compiled_express_files.clear()
+
+
 _top_level_recall_context_manager: RecallContextManager[Tag] | None = None
 
 
@@ -291,12 +329,18 @@ class InputNotImportedShim:
 class AppOpts(TypedDict):
     static_assets: NotRequired[dict[str, Path]]
     debug: NotRequired[bool]
+    flush_mode: NotRequired[FlushModeArg]
+    upload_checksum: NotRequired[str | None]
+    upload_target: NotRequired[UploadTargetArg]
 
 
 @no_example()
 def app_opts(
     static_assets: str | Path | Mapping[str, str | Path] | MISSING_TYPE = MISSING,
     debug: bool | MISSING_TYPE = MISSING,
+    flush_mode: FlushModeArg | MISSING_TYPE = MISSING,
+    upload_checksum: str | None | MISSING_TYPE = MISSING,
+    upload_target: UploadTargetArg | MISSING_TYPE = MISSING,
 ):
     """
     Set App-level options in Shiny Express
@@ -315,6 +359,18 @@ def app_opts(
         without needing to set the option here.
     debug
         Whether to enable debug mode.
+    flush_mode
+        How each session runs the reactive effects that are pending when it flushes;
+        either ``"sequential"`` (the default) or ``"concurrent"``, or a function that
+        takes a priority level and returns one of those. See :class:`shiny.App` for
+        details.
+    upload_checksum
+        The name of a :mod:`hashlib` algorithm (e.g., ``"sha256"``) with which to
+        compute a checksum of each uploaded file. See :class:`shiny.App` for details.
+    upload_target
+        Where uploaded files are stored: ``"disk"`` (the default), ``"mmap"``,
+        ``"spooled"``, or an async function that receives the chunks of each file as
+        they are uploaded. See :class:`shiny.App` for details.
     """
 
     stub_session = get_current_session()
@@ -342,6 +398,15 @@ def app_opts(
     if not isinstance(debug, MISSING_TYPE):
         stub_session.app_opts["debug"] = debug
 
+    if not isinstance(flush_mode, MISSING_TYPE):
+        stub_session.app_opts["flush_mode"] = flush_mode
+
+    if not isinstance(upload_checksum, MISSING_TYPE):
+        stub_session.app_opts["upload_checksum"] = upload_checksum
+
+    if not isinstance(upload_target, MISSING_TYPE):
+        stub_session.app_opts["upload_target"] = upload_target
+
 
 def _merge_app_opts(app_opts: AppOpts, app_opts_new: AppOpts) -> AppOpts:
     """
@@ -360,6 +425,15 @@ def _merge_app_opts(app_opts: AppOpts, app_opts_new: AppOpts) -> AppOpts:
     if "debug" in app_opts_new:
         app_opts["debug"] = app_opts_new["debug"]
 
+    if "flush_mode" in app_opts_new:
+        app_opts["flush_mode"] = app_opts_new["flush_mode"]
+
+    if "upload_checksum" in app_opts_new:
+        app_opts["upload_checksum"] = app_opts_new["upload_checksum"]
+
+    if "upload_target" in app_opts_new:
+        app_opts["upload_target"] = app_opts_new["upload_target"]
+
     return app_opts
 
 
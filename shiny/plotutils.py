@@ -2,15 +2,17 @@
 
 from __future__ import annotations
 
-__all__ = ("brushed_points", "near_points")
+__all__ = ("brushed_points", "near_points", "PointIndex")
 
 
+import math
 from typing import TYPE_CHECKING, Literal, Optional, Union, cast
 
 from ._typing_extensions import TypedDict
 from .types import BrushInfo, CoordInfo, CoordXY
 
 if TYPE_CHECKING:
+    import numpy as np
     import numpy.typing as npt
     import pandas as pd
 
@@ -37,6 +39,7 @@ def brushed_points(
     panelvar2: Optional[str] = None,
     *,
     all_rows: bool = False,
+    index: Optional[PointIndex] = None,
 ) -> pd.DataFrame:
     """Find rows of data selected on an interactive plot.
 
@@ -70,6 +73,9 @@ def brushed_points(
         selected. If `True`, then all rows from the data frame will be returned, along
         with an additional column named `selected_`, which indicates whether or not each
         row was selected.
+    index
+        A :class:`PointIndex` of `df`'s x and y values. If given, only the rows near the
+        brush are checked, instead of all of the rows of `df`.
 
     Returns
     -------
@@ -81,6 +87,18 @@ def brushed_points(
     """
     import pandas as pd
 
+    if index is not None and brush is not None and "xmin" in brush:
+        return _brushed_points_indexed(
+            df,
+            brush,
+            xvar,
+            yvar,
+            panelvar1,
+            panelvar2,
+            all_rows=all_rows,
+            index=index,
+        )
+
     new_df = df.copy()
 
     if brush is None:
@@ -166,6 +184,7 @@ def near_points(
     max_points: Optional[int] = None,
     add_dist: bool = False,
     all_rows: bool = False,
+    index: Optional[PointIndex] = None,
 ) -> pd.DataFrame:
     """Find rows of data selected on an interactive plot.
 
@@ -209,6 +228,10 @@ def near_points(
         selected. If `True`, then all rows from the data frame will be returned, along
         with an additional column named `selected_`, which indicates whether or not each
         row was selected.
+    index
+        A :class:`PointIndex` of `df`'s x and y values. If given, the distances are only
+        computed for the rows near the pointer, instead of for all of the rows of `df`.
+        (The index isn't used when `add_dist=True`, or for log scales.)
 
     Returns
     -------
@@ -219,8 +242,11 @@ def near_points(
         selected.
     """
     import numpy as np
+    import pandas as pd
 
-    new_df = df.copy()
+    # With an index, only the rows near the pointer are copied (below)
+    use_index = index is not None and coordinfo is not None and not add_dist
+    new_df = df if use_index else df.copy()
 
     # For no current coordinfo
     if coordinfo is None:
@@ -259,8 +285,26 @@ def near_points(
     if yvar not in new_df.columns:
         raise ValueError(f"near_points: `yvar` ('{yvar}')  not in names of input.")
 
-    x: pd.Series[float] = to_float(new_df[xvar])
-    y: pd.Series[float] = to_float(new_df[yvar])
+    # The rows whose distances are computed (by position), or `None` for all rows
+    candidates: Optional[npt.NDArray[np.intp]] = None
+    if use_index:
+        assert index is not None
+        index._check(df, xvar, yvar, "near_points")
+        candidates = index._near_candidates(coordinfo, threshold)
+        if candidates is not None:
+            new_df = df.iloc[candidates]
+        else:
+            new_df = df.copy()
+
+    if candidates is not None:
+        assert index is not None
+        # Use the index's values, since converting only some of the rows of a string
+        # column to floats would give different values
+        x = pd.Series(index._x[candidates], index=new_df.index)
+        y = pd.Series(index._y[candidates], index=new_df.index)
+    else:
+        x = to_float(new_df[xvar])
+        y = to_float(new_df[yvar])
 
     # Get the coordinates of the point (in img pixel coordinates)
     point_img: CoordXY = coordinfo["coords_img"]
@@ -307,6 +351,11 @@ def near_points(
     if max_points is not None and len(keep_idx) > max_points:
         keep_idx = keep_idx[:max_points]
 
+    if candidates is not None:
+        # Back to the rows of `df`
+        keep_idx = candidates[keep_idx]
+        new_df = df.copy() if all_rows else df
+
     if all_rows:
         # Add selected_ column if needed
         new_df["selected_"] = False
@@ -322,6 +371,315 @@ def near_points(
     return new_df
 
 
+def _brushed_points_indexed(
+    df: pd.DataFrame,
+    brush: BrushInfo,
+    xvar: Optional[str],
+    yvar: Optional[str],
+    panelvar1: Optional[str],
+    panelvar2: Optional[str],
+    *,
+    all_rows: bool,
+    index: PointIndex,
+) -> pd.DataFrame:
+    # Same as `brushed_points()`, but only checks the rows that the index finds
+    use_x = "x" in brush["direction"]
+    use_y = "y" in brush["direction"]
+    if use_x and xvar is None:
+        xvar = brush["mapping"].get("x")
+    if use_y and yvar is None:
+        yvar = brush["mapping"].get("y")
+    index._check(df, xvar if use_x else None, yvar if use_y else None, "brushed_points")
+
+    rows = index.brushed_rows(brush)
+
+    # Find which rows are matches for the panel vars (if present)
+    for i, panelvar in ((1, panelvar1), (2, panelvar2)):
+        key = "panelvar1" if i == 1 else "panelvar2"
+        if panelvar is None and key in brush["mapping"]:
+            panelvar = brush["mapping"][key]
+            if panelvar not in df:
+                raise ValueError(
+                    f"brushed_points: `{key}` ({panelvar}) not in dataframe"
+                )
+            matches = df[panelvar].iloc[rows] == brush[key]  # pyright: ignore
+            rows = rows[matches.to_numpy(dtype=bool)]
+
+    if all_rows:
+        new_df = df.copy()
+        new_df["selected_"] = False
+        new_df.iloc[  # pyright: ignore[reportArgumentType]
+            rows,
+            new_df.columns.get_loc(  # pyright: ignore[reportUnknownMemberType]
+                "selected_"
+            ),
+        ] = True
+        return new_df
+
+    return df.iloc[rows].copy()
+
+
+class PointIndex:
+    """
+    A spatial index of the x and y values of a data frame, for finding the rows that
+    are under a brush or near a click on a plot.
+
+    Pass the index to :func:`~shiny.plotutils.brushed_points` and
+    :func:`~shiny.plotutils.near_points` (with the same data frame) so that they only
+    check the rows near the brush or pointer, instead of all of the rows. This makes
+    them much faster for large data frames, e.g., when they are called on every mouse
+    movement of a hover or a brush that is being dragged.
+
+    Building the index takes time proportional to sorting the data, so build it once
+    for each version of the data, e.g., in a :func:`~shiny.reactive.calc`. The index
+    doesn't notice changes to the data frame; build a new index after modifying it.
+
+    Parameters
+    ----------
+    df
+        A pandas DataFrame.
+    xvar
+        The name of the column in `df` that contains the x values.
+    yvar
+        The name of the column in `df` that contains the y values.
+    """
+
+    # The average number of points in a grid cell
+    _points_per_cell = 16
+
+    def __init__(self, df: pd.DataFrame, xvar: str, yvar: str) -> None:
+        import numpy as np
+
+        if xvar not in df:
+            raise ValueError(f"PointIndex: `xvar` ({xvar}) not in dataframe")
+        if yvar not in df:
+            raise ValueError(f"PointIndex: `yvar` ({yvar}) not in dataframe")
+
+        self.xvar = xvar
+        self.yvar = yvar
+        self._n_rows = len(df)
+
+        x = to_float(df[xvar]).to_numpy(dtype=float)
+        y = to_float(df[yvar]).to_numpy(dtype=float)
+        self._x = x
+        self._y = y
+
+        # For brushes in one direction: the rows, by x (or y) value. (NaNs are last.)
+        self._x_order = np.argsort(x)
+        self._x_sorted = x[self._x_order]
+        self._y_order = np.argsort(y)
+        self._y_sorted = y[self._y_order]
+
+        # For brushes in both directions and for clicks: a grid of cells over the
+        # points with finite x and y values, with the rows sorted by cell
+        finite = np.isfinite(x) & np.isfinite(y)
+        finite_rows = np.flatnonzero(finite)
+        # Infinite values are mapped to the edges of a plot, so they're always checked
+        self._nonfinite_rows = np.flatnonzero(~finite & ~np.isnan(x) & ~np.isnan(y))
+
+        n_cells = max(1, len(finite_rows) // self._points_per_cell)
+        self._nx = self._ny = max(1, int(math.sqrt(n_cells)))
+        if len(finite_rows) > 0:
+            self._bounds = (
+                float(x[finite_rows].min()),
+                float(x[finite_rows].max()),
+                float(y[finite_rows].min()),
+                float(y[finite_rows].max()),
+            )
+        else:
+            self._bounds = (0.0, 0.0, 0.0, 0.0)
+
+        cells = self._cell_x(x[finite_rows]) * self._ny + self._cell_y(y[finite_rows])
+        order = np.argsort(cells)
+        self._cell_rows = finite_rows[order]
+        # The rows in cell `i` are `self._cell_rows[self._cell_starts[i]:self._cell_starts[i + 1]]`
+        self._cell_starts = np.searchsorted(
+            cells[order], np.arange(self._nx * self._ny + 1)
+        )
+
+    def _cell_x(self, x: npt.NDArray[np.float64]) -> npt.NDArray[np.intp]:
+        return self._cell(x, self._bounds[0], self._bounds[1], self._nx)
+
+    def _cell_y(self, y: npt.NDArray[np.float64]) -> npt.NDArray[np.intp]:
+        return self._cell(y, self._bounds[2], self._bounds[3], self._ny)
+
+    @staticmethod
+    def _cell(
+        vals: npt.NDArray[np.float64], lo: float, hi: float, n: int
+    ) -> npt.NDArray[np.intp]:
+        import numpy as np
+
+        # Monotonic in `vals`, so that the cells of a range of values are a range of
+        # cells
+        scale = n / (hi - lo) if hi > lo else 0.0
+        with np.errstate(invalid="ignore", over="ignore"):
+            cells = np.floor((np.clip(vals, lo, hi) - lo) * scale)
+        return np.clip(cells, 0, n - 1).astype(np.intp)
+
+    def brushed_rows(self, brush: BrushInfo) -> npt.NDArray[np.intp]:
+        """
+        The positions of the rows that are under a brush, in order.
+
+        The positions can be used to select the same rows in a data frame output, with
+        :meth:`~shiny.render.data_frame.update_cell_selection`.
+
+        Parameters
+        ----------
+        brush
+            The data from a brush, like `input.myplot_brush()`.
+        """
+        import numpy as np
+
+        use_x = "x" in brush["direction"]
+        use_y = "y" in brush["direction"]
+        xmin, xmax = brush["xmin"], brush["xmax"]
+        ymin, ymax = brush["ymin"], brush["ymax"]
+
+        if use_x and use_y:
+            candidates = self._rect_candidates(xmin, xmax, ymin, ymax)
+            x, y = self._x[candidates], self._y[candidates]
+            keep = (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+            return np.sort(candidates[keep])
+        if use_x:
+            return self._range_rows(self._x_order, self._x_sorted, xmin, xmax)
+        if use_y:
+            return self._range_rows(self._y_order, self._y_sorted, ymin, ymax)
+        return np.arange(self._n_rows)
+
+    @staticmethod
+    def _range_rows(
+        order: npt.NDArray[np.intp],
+        sorted_vals: npt.NDArray[np.float64],
+        lo: float,
+        hi: float,
+    ) -> npt.NDArray[np.intp]:
+        import numpy as np
+
+        start = np.searchsorted(sorted_vals, lo, side="left")
+        stop = np.searchsorted(sorted_vals, hi, side="right")
+        return np.sort(order[start:stop])
+
+    def _rect_candidates(
+        self, xmin: float, xmax: float, ymin: float, ymax: float
+    ) -> npt.NDArray[np.intp]:
+        # The rows in the cells that overlap the rectangle (and the rows with infinite
+        # values)
+        import numpy as np
+
+        x_lo, x_hi, y_lo, y_hi = self._bounds
+        if (
+            len(self._cell_rows) == 0
+            or xmin > x_hi
+            or xmax < x_lo
+            or ymin > y_hi
+            or ymax < y_lo
+        ):
+            return self._nonfinite_rows
+
+        ix0, ix1 = self._cell_x(np.array([xmin, xmax], dtype=float))
+        iy0, iy1 = self._cell_y(np.array([ymin, ymax], dtype=float))
+        starts = self._cell_starts
+        # Within a column of cells, the cells from iy0 to iy1 are contiguous
+        pieces = [
+            self._cell_rows[
+                starts[ix * self._ny + iy0] : starts[ix * self._ny + iy1 + 1]
+            ]
+            for ix in range(ix0, ix1 + 1)
+        ]
+        pieces.append(self._nonfinite_rows)
+        return np.concatenate(pieces)
+
+    def _near_candidates(
+        self, coordinfo: CoordInfo, threshold: float
+    ) -> Optional[npt.NDArray[np.intp]]:
+        # The rows that may be within `threshold` css pixels of the pointer, in order,
+        # or `None` if all rows must be checked
+        import numpy as np
+
+        log = coordinfo["log"]
+        if log["x"] is not None or log["y"] is not None:
+            return None
+
+        domain = coordinfo["domain"]
+        range_ = coordinfo["range"]
+        point = coordinfo["coords_img"]
+        ratio = coordinfo["img_css_ratio"]
+        xmin, xmax = _data_interval(
+            point["x"],
+            threshold * abs(ratio["x"]),
+            domain["left"],
+            domain["right"],
+            range_["left"],
+            range_["right"],
+        )
+        ymin, ymax = _data_interval(
+            point["y"],
+            threshold * abs(ratio["y"]),
+            domain["bottom"],
+            domain["top"],
+            range_["bottom"],
+            range_["top"],
+        )
+        return np.unique(self._rect_candidates(xmin, xmax, ymin, ymax))
+
+    def _check(
+        self,
+        df: pd.DataFrame,
+        xvar: Optional[str],
+        yvar: Optional[str],
+        fn_name: str,
+    ) -> None:
+        if len(df) != self._n_rows:
+            raise ValueError(
+                f"{fn_name}: `index` has {self._n_rows} rows, but the data frame has {len(df)}; build a new `PointIndex` for the data frame"
+            )
+        if xvar is not None and xvar != self.xvar:
+            raise ValueError(
+                f"{fn_name}: `index` is for `xvar` {self.xvar}, not {xvar}"
+            )
+        if yvar is not None and yvar != self.yvar:
+            raise ValueError(
+                f"{fn_name}: `index` is for `yvar` {self.yvar}, not {yvar}"
+            )
+
+
+def _data_interval(
+    point: float,
+    dist: float,
+    domain_min: float,
+    domain_max: float,
+    range_min: float,
+    range_max: float,
+) -> tuple[float, float]:
+    # The interval of data values that `map_linear()` maps to within `dist` of `point`,
+    # with some slack for rounding
+    if domain_max == domain_min or range_max == range_min:
+        return -math.inf, math.inf
+    factor = (range_max - range_min) / (domain_max - domain_min)
+    lo, hi = point - dist, point + dist
+    slack = 1e-9 * (abs(range_max) + abs(range_min) + dist) + 1e-12
+    lo, hi = lo - slack, hi + slack
+
+    def inverse(v: float) -> float:
+        return (v - range_min) / factor + domain_min
+
+    # `map_linear()` clips values to the range, so values beyond the edge of the domain
+    # are near the pointer if the edge is
+    data_lo, data_hi = sorted((inverse(lo), inverse(hi)))
+    range_lo, range_hi = sorted((range_min, range_max))
+    if lo <= range_lo:
+        if factor > 0:
+            data_lo = -math.inf
+        else:
+            data_hi = math.inf
+    if hi >= range_hi:
+        if factor > 0:
+            data_hi = math.inf
+        else:
+            data_lo = -math.inf
+    return data_lo, data_hi
+
+
 # ===============================================================================
 # Helper functions
 # ===============================================================================
@@ -8,6 +8,7 @@ from ._core import (  # noqa: F401
     get_current_context,  # pyright: ignore[reportUnusedImport]
 )
 from ._poll import poll, file_reader
+from ._profiler import Profiler, profile
 from ._reactives import (  # noqa: F401
     value,
     Value,
@@ -32,6 +33,8 @@ __all__ = (
     "on_flushed",
     "poll",
     "file_reader",
+    "Profiler",
+    "profile",
     "value",
     "Value",
     "calc",
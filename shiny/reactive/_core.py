@@ -18,18 +18,39 @@ import traceback
 import typing
 import warnings
 from contextvars import ContextVar
-from typing import TYPE_CHECKING, Awaitable, Callable, Generator, Optional, TypeVar
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    Generator,
+    Literal,
+    Optional,
+    TypeVar,
+    Union,
+)
 
 from .. import _utils
 from .._datastructures import PriorityQueueFIFO
 from .._docstring import add_example, no_example
 from ..types import MISSING, MISSING_TYPE
+from . import _profiler
 
 if TYPE_CHECKING:
     from ..session import Session
 
 T = TypeVar("T")
 
+FlushMode = Literal["sequential", "concurrent"]
+"""
+How the contexts that are pending in a flush are run. With `"sequential"`, each context
+runs to completion before the next one starts. With `"concurrent"`, all of the pending
+contexts that share the same priority are run concurrently (with
+:func:`asyncio.gather`); contexts with a higher priority still finish before contexts
+with a lower priority start.
+"""
+
+FlushModeArg = Union[FlushMode, Callable[[int], FlushMode]]
+
 
 class ReactiveWarning(RuntimeWarning):
     pass
@@ -42,8 +63,14 @@ warnings.simplefilter("always", ReactiveWarning)
 class Context:
     """A reactive context"""
 
-    def __init__(self) -> None:
+    def __init__(self, owner: object = None) -> None:
         self.id: int = _reactive_environment.next_id()
+        # The reactive object (e.g. calc or effect) that this context belongs to, if
+        # any. This is only used to label the context when profiling.
+        self._owner: object = owner
+        # The domain that was active when the context was created. When this context is
+        # scheduled for a flush, it is queued on this domain.
+        self._domain: ReactiveDomain = _reactive_environment.current_domain()
         self._invalidated: bool = False
         self._invalidate_callbacks: list[Callable[[], None]] = []
         self._flush_callbacks: list[Callable[[], Awaitable[None]]] = []
@@ -75,7 +102,7 @@ class Context:
     def add_pending_flush(self, priority: int) -> None:
         """Tell the reactive environment that this context should be flushed the
         next time flushReact() called."""
-        _reactive_environment.add_pending_flush(self, priority)
+        self._domain.add_pending_flush(self, priority)
 
     def on_flush(self, func: Callable[[], Awaitable[None]]) -> None:
         """Register a function to be called when this context is flushed."""
@@ -90,8 +117,11 @@ class Context:
 
 
 class Dependents:
-    def __init__(self) -> None:
+    def __init__(self, owner: object = None) -> None:
         self._dependents: dict[int, Context] = {}
+        # The reactive object (e.g. value or calc) whose dependents these are. This is
+        # only used to label invalidations when profiling.
+        self._owner: object = owner
 
     def register(self) -> None:
         ctx: Context = get_current_context()
@@ -115,27 +145,43 @@ class Dependents:
         # possible that a dependent is removed from the dict while iterating over it.
         # https://github.com/posit-dev/py-shiny/issues/26
         ids = sorted(self._dependents.keys())
+        profiler = _profiler.current
         for dep_ctx in [self._dependents[id] for id in ids]:
+            if profiler is not None:
+                profiler._record_invalidation(self._owner, dep_ctx)
             dep_ctx.invalidate()
 
 
-class ReactiveEnvironment:
-    """The reactive environment"""
+class ReactiveDomain:
+    """
+    A unit of reactive scheduling.
 
-    def __init__(self) -> None:
-        self._current_context: ContextVar[Optional[Context]] = ContextVar(
-            "current_context", default=None
-        )
-        self._next_id: int = 0
+    Each domain has its own lock, queue of contexts pending a flush, and flushed
+    callbacks, so that work in one domain (e.g., one session) never has to wait on work
+    in another. Contexts are queued on the domain that was active when they were
+    created.
+
+    `flush_mode` is either a :data:`FlushMode`, or a function that takes a priority
+    level and returns the :data:`FlushMode` for contexts with that priority.
+    """
+
+    def __init__(
+        self,
+        on_flush_requested: Optional[Callable[[], None]] = None,
+        *,
+        flush_mode: FlushModeArg = "sequential",
+    ) -> None:
         self._pending_flush_queue: PriorityQueueFIFO[Context] = PriorityQueueFIFO()
         self._lock: Optional[asyncio.Lock] = None
         self._flushed_callbacks = _utils.AsyncCallbacks()
+        self._on_flush_requested = on_flush_requested
+        self._flush_mode: FlushModeArg = flush_mode
 
     @property
     def lock(self) -> asyncio.Lock:
         """
-        Lock that protects this ReactiveEnvironment. It must be lazily created, because
-        at the time the module is loaded, there generally isn't a running asyncio loop
+        Lock that protects this ReactiveDomain. It must be lazily created, because at
+        the time the module is loaded, there generally isn't a running asyncio loop
         yet. This causes the asyncio.Lock to be created with a different loop than it
         will be invoked from later; when that happens, acquire() will succeed if there's
         no contention, but throw a "hey you're on the wrong loop" error if there is.
@@ -143,9 +189,131 @@ class ReactiveEnvironment:
         if self._lock is None:
             # Ensure we have a loop; get_running_loop() throws an error if we don't
             asyncio.get_running_loop()
-            self._lock = asyncio.Lock()
+            self._lock = _DomainLock(self)
         return self._lock
 
+    def locked(self) -> bool:
+        """Return whether the domain's lock is currently held"""
+        return self._lock is not None and self._lock.locked()
+
+    def needs_flush(self) -> bool:
+        """Return whether there are contexts waiting to be flushed"""
+        return not self._pending_flush_queue.empty()
+
+    @contextlib.contextmanager
+    def use(self) -> Generator[None, None, None]:
+        """Make this the current domain"""
+        with _reactive_environment.use_domain(self):
+            yield
+
+    def on_flushed(
+        self, func: Callable[[], Awaitable[None]], once: bool = False
+    ) -> Callable[[], None]:
+        return self._flushed_callbacks.register(func, once=once)
+
+    async def flush(self) -> None:
+        """Flush all pending operations"""
+        profiler = _profiler.current
+        start = time.perf_counter() if profiler is not None else 0.0
+        first_execution = len(profiler.executions) if profiler is not None else 0
+
+        with self.use():
+            if self._flush_mode == "sequential":
+                await self._flush_sequential()
+            else:
+                await self._flush_by_priority()
+            await self._flushed_callbacks.invoke()
+
+        if profiler is not None:
+            profiler._record_flush(self, start, time.perf_counter(), first_execution)
+
+    async def _flush_sequential(self) -> None:
+        # Sequential flush: instead of storing the tasks in a list and calling gather()
+        # on them later, just run each effect in sequence.
+        while not self._pending_flush_queue.empty():
+            ctx = self._pending_flush_queue.get()
+            await ctx.execute_flush_callbacks()
+
+    async def _flush_by_priority(self) -> None:
+        # Take all of the contexts with the highest pending priority, and run them
+        # either one at a time or all at once, depending on the flush mode for that
+        # priority. Anything that gets queued while a batch is running is picked up by a
+        # later batch.
+        while not self._pending_flush_queue.empty():
+            priority = self._pending_flush_queue.peek_priority()
+            if self._mode_for_priority(priority) == "sequential":
+                ctx = self._pending_flush_queue.get()
+                await ctx.execute_flush_callbacks()
+                continue
+
+            batch = self._pending_flush_queue.get_batch()
+            if len(batch) == 1:
+                await batch[0].execute_flush_callbacks()
+                continue
+
+            # Let every context in the batch finish before reporting an error, so that
+            # an error in one effect doesn't leave the others running unattended.
+            results = await asyncio.gather(
+                *[ctx.execute_flush_callbacks() for ctx in batch],
+                return_exceptions=True,
+            )
+            for res in results:
+                if isinstance(res, BaseException):
+                    raise res
+
+    def _mode_for_priority(self, priority: int) -> FlushMode:
+        if callable(self._flush_mode):
+            return self._flush_mode(priority)
+        return self._flush_mode
+
+    def add_pending_flush(self, ctx: Context, priority: int) -> None:
+        self._pending_flush_queue.put(priority, ctx)
+        # Contexts can be queued from outside of this domain (e.g., when another
+        # session sets a shared reactive value), in which case nobody is going to flush
+        # them unless the owner of the domain is told about it.
+        if self._on_flush_requested is not None:
+            self._on_flush_requested()
+
+    def _on_lock_released(self) -> None:
+        # Whoever holds the lock flushes before releasing it, but contexts can still be
+        # queued after that flush (e.g., while its messages are being sent). Nobody was
+        # told about those while the lock was held.
+        if self.needs_flush() and self._on_flush_requested is not None:
+            self._on_flush_requested()
+
+
+class _DomainLock(asyncio.Lock):
+    """The lock of a `ReactiveDomain`, which tells the domain when it's released."""
+
+    def __init__(self, domain: ReactiveDomain) -> None:
+        super().__init__()
+        self._domain = domain
+
+    def release(self) -> None:
+        super().release()
+        self._domain._on_lock_released()
+
+
+class ReactiveEnvironment:
+    """The reactive environment"""
+
+    def __init__(self) -> None:
+        self._current_context: ContextVar[Optional[Context]] = ContextVar(
+            "current_context", default=None
+        )
+        self._next_id: int = 0
+        # Work that isn't associated with a more specific domain (e.g., reactive code
+        # run outside of a session) is scheduled on the default domain.
+        self._default_domain = ReactiveDomain()
+        self._current_domain: ContextVar[Optional[ReactiveDomain]] = ContextVar(
+            "current_domain", default=None
+        )
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        """Lock that protects the current ReactiveDomain."""
+        return self.current_domain().lock
+
     def next_id(self) -> int:
         """Return the next available id"""
         id = self._next_id
@@ -167,25 +335,40 @@ class ReactiveEnvironment:
             raise RuntimeError("No current reactive context")
         return ctx
 
+    @contextlib.contextmanager
+    def use_domain(self, domain: ReactiveDomain) -> Generator[None, None, None]:
+        token = self._current_domain.set(domain)
+        try:
+            yield
+        finally:
+            self._current_domain.reset(token)
+
+    def current_domain(self) -> ReactiveDomain:
+        """Return the current `ReactiveDomain` object"""
+        domain = self._current_domain.get()
+        if domain is None:
+            return self._default_domain
+        return domain
+
     def on_flushed(
         self, func: Callable[[], Awaitable[None]], once: bool = False
     ) -> Callable[[], None]:
-        return self._flushed_callbacks.register(func, once=once)
+        return self.current_domain().on_flushed(func, once=once)
 
     async def flush(self) -> None:
-        """Flush all pending operations"""
-        await self._flush_sequential()
-        await self._flushed_callbacks.invoke()
-
-    async def _flush_sequential(self) -> None:
-        # Sequential flush: instead of storing the tasks in a list and calling gather()
-        # on them later, just run each effect in sequence.
-        while not self._pending_flush_queue.empty():
-            ctx = self._pending_flush_queue.get()
-            await ctx.execute_flush_callbacks()
-
-    def add_pending_flush(self, ctx: Context, priority: int) -> None:
-        self._pending_flush_queue.put(priority, ctx)
+        """
+        Flush all pending operations in the current domain, and then in the default
+        domain
+        """
+        domain = self.current_domain()
+        await domain.flush()
+        # Work that is queued on the default domain (e.g., by a `reactive.poll()` at the
+        # top level of an app) has no session to flush it, so it's flushed along with
+        # each session's domain.
+        default = self._default_domain
+        if domain is not default and default.needs_flush():
+            async with default.lock:
+                await default.flush()
 
     @contextlib.contextmanager
     def isolate(self) -> Generator[None, None, None]:
@@ -252,6 +435,11 @@ async def flush() -> None:
     """
     Run any pending invalidations (i.e., flush the reactive environment).
 
+    The current reactive domain is flushed: inside of a session, that is the session's
+    own domain; elsewhere, it is the process-wide default domain. The default domain,
+    which holds the reactive objects that were created outside of any session, is then
+    flushed as well.
+
     Warning
     -------
     You shouldn't ever need to call this function inside of a Shiny app. It's only
@@ -297,6 +485,10 @@ def lock() -> asyncio.Lock:
     :class:`~reactive.value` and call :func:`~shiny.reactive.flush` from a different
     :class:`~asyncio.Task` than the one that is running the Shiny
     :class:`~shiny.Session`.
+
+    Each session has its own lock, so that sessions don't have to wait on each other.
+    Tasks created from within a session use that session's lock; elsewhere, this is the
+    lock of the process-wide default domain.
     """
     return _reactive_environment.lock
 
@@ -0,0 +1,114 @@
+"""Strategies for deciding whether a reactive value has changed."""
+
+from __future__ import annotations
+
+import hashlib
+import pickle
+from typing import Any, Callable, Literal, Optional, Union
+
+EqualsFn = Callable[[Any, Any], bool]
+
+EqualsArg = Union[Literal["identity", "equal", "fingerprint"], EqualsFn]
+"""
+How to decide whether a new reactive value is the same as the old one:
+
+* ``"identity"``: only if the new value is the same object (``is``).
+* ``"equal"``: if the values are equal. Data frames, series, and arrays are compared by
+  their contents, and values that can't be compared are treated as different.
+* ``"fingerprint"``: if the values have the same content hash. Data frames, series, and
+  arrays are hashed from their underlying data; other values are hashed from their
+  pickled form.
+* A function that takes the old and new values and returns ``True`` if they should be
+  considered the same.
+"""
+
+
+def resolve_equals(equals: EqualsArg) -> Optional[EqualsFn]:
+    """
+    Turn an `EqualsArg` into a comparison function. `None` means identity, which callers
+    check for themselves with `is`.
+    """
+    if equals == "identity":
+        return None
+    if equals == "equal":
+        return values_equal
+    if equals == "fingerprint":
+        return fingerprints_equal
+    if callable(equals):
+        return equals
+    raise ValueError(
+        '`equals` must be "identity", "equal", "fingerprint", or a function, not '
+        + repr(equals)
+    )
+
+
+def values_equal(x: Any, y: Any) -> bool:
+    if x is y:
+        return True
+    if type(x) is not type(y):
+        return False
+
+    module = type(x).__module__.split(".")[0]
+    if module == "numpy":
+        import numpy as np
+
+        if x.shape != y.shape:
+            return False
+        # `equal_nan=True` is only supported for dtypes that can hold NaN; it raises a
+        # TypeError for, e.g., string and object arrays.
+        equal_nan = x.dtype.kind in "fc" and y.dtype.kind in "fc"
+        try:
+            return bool(np.array_equal(x, y, equal_nan=equal_nan))
+        except Exception:
+            return False
+    if module in ("pandas", "polars"):
+        # pandas and polars objects define `==` elementwise; `.equals()` compares the
+        # whole object (including column names and dtypes).
+        return bool(x.equals(y))
+
+    try:
+        return bool(x == y)
+    except Exception:
+        # Comparison is ambiguous or unsupported; assume the value changed.
+        return False
+
+
+def fingerprints_equal(x: Any, y: Any) -> bool:
+    if x is y:
+        return True
+    if type(x) is not type(y):
+        return False
+    x_fp = fingerprint(x)
+    return x_fp is not None and x_fp == fingerprint(y)
+
+
+def fingerprint(x: Any) -> Optional[str]:
+    """
+    Return a hash of the content of `x`, or `None` if it can't be hashed (in which case
+    it is treated as having changed).
+    """
+    h = hashlib.sha1()
+    module = type(x).__module__.split(".")[0]
+    try:
+        if module == "numpy" and hasattr(x, "tobytes"):
+            h.update(repr((x.shape, str(x.dtype))).encode())
+            if x.dtype.hasobject:
+                h.update(pickle.dumps(x.tolist()))
+            else:
+                h.update(x.tobytes())
+        elif module == "pandas":
+            import pandas as pd
+
+            h.update(pickle.dumps(getattr(x, "columns", getattr(x, "name", None))))
+            h.update(pd.util.hash_pandas_object(x, index=True).to_numpy().tobytes())
+        elif module == "polars" and hasattr(x, "hash_rows"):
+            h.update(pickle.dumps((x.columns, [str(d) for d in x.dtypes])))
+            h.update(x.hash_rows().to_numpy().tobytes())
+        elif module == "polars" and hasattr(x, "hash"):
+            h.update(pickle.dumps((x.name, str(x.dtype))))
+            h.update(x.hash().to_numpy().tobytes())
+        else:
+            h.update(pickle.dumps(x))
+    except Exception:
+        return None
+    return h.hexdigest()
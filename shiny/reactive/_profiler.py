@@ -0,0 +1,306 @@
+"""Profiling of reactive invalidation and execution."""
+
+from __future__ import annotations
+
+__all__ = (
+    "Profiler",
+    "profile",
+)
+
+import contextlib
+import json
+import time
+from typing import TYPE_CHECKING, Any, Generator, Optional
+
+from .._docstring import no_example
+from .._typing_extensions import TypedDict
+
+if TYPE_CHECKING:
+    from ._core import Context, ReactiveDomain
+
+
+class InvalidationRecord(TypedDict):
+    time: float
+    source: str
+    target: str
+
+
+class ExecutionRecord(TypedDict):
+    label: str
+    domain: int
+    start: float
+    duration: float
+    invalidated_by: list[str]
+
+
+class OutputRecord(TypedDict):
+    time: float
+    domain: int
+    output: str
+    bytes: int
+
+
+class FlushRecord(TypedDict):
+    domain: int
+    start: float
+    duration: float
+    executions: int
+    executed_time: float
+
+
+# The profiler that is currently recording, if any. The reactive internals check this
+# before doing any profiling work, so that profiling costs (almost) nothing when it's
+# turned off.
+current: Optional[Profiler] = None
+
+
+def label_of(owner: object) -> str:
+    """Return the label that a reactive object is recorded under."""
+    if owner is None:
+        return "context"
+    return getattr(owner, "_label", type(owner).__name__)
+
+
+class Profiler:
+    """
+    Records reactive invalidations, executions, and flushes.
+
+    Use :func:`~shiny.reactive.profile` to create a profiler and record what happens
+    while it is active. All times are in seconds, relative to when the profiler was
+    created.
+
+    Reactive objects are recorded with labels like ``"input:x"``, ``"value"``,
+    ``"calc:filtered"``, ``"effect:log_changes"``, or ``"output:plot"``.
+
+    The size of each output value that is sent to the browser is also recorded.
+    """
+
+    def __init__(self) -> None:
+        self._start: float = time.perf_counter()
+        self._domain_ids: dict[int, int] = {}
+        self._causes: dict[int, list[str]] = {}
+
+        self.invalidations: list[InvalidationRecord] = []
+        """
+        Each time a reactive object invalidated a reactive context that depended on it.
+        """
+        self.executions: list[ExecutionRecord] = []
+        """
+        Each time a reactive calculation, effect, or output executed, along with what
+        invalidated it since it last executed.
+        """
+        self.flushes: list[FlushRecord] = []
+        """
+        Each reactive flush, with the number of executions that happened during the
+        flush and their total time.
+        """
+        self.outputs: list[OutputRecord] = []
+        """
+        Each time an output value was sent to the browser, with the size of its
+        serialized JSON, in bytes.
+        """
+
+    def clear(self) -> None:
+        """Remove all of the recorded data."""
+        self._causes.clear()
+        self.invalidations.clear()
+        self.executions.clear()
+        self.flushes.clear()
+        self.outputs.clear()
+
+    def _now(self) -> float:
+        return time.perf_counter() - self._start
+
+    def _domain_id(self, domain: ReactiveDomain) -> int:
+        # Number the domains in the order that they are first seen, instead of exposing
+        # object ids.
+        return self._domain_ids.setdefault(id(domain), len(self._domain_ids))
+
+    def _record_invalidation(self, source: object, ctx: Context) -> None:
+        source_label = label_of(source)
+        self.invalidations.append(
+            {
+                "time": self._now(),
+                "source": source_label,
+                "target": label_of(ctx._owner),
+            }
+        )
+        if ctx._owner is not None:
+            self._causes.setdefault(id(ctx._owner), []).append(source_label)
+
+    def _record_execution(
+        self, owner: object, domain: ReactiveDomain, start: float, end: float
+    ) -> None:
+        self.executions.append(
+            {
+                "label": label_of(owner),
+                "domain": self._domain_id(domain),
+                "start": start - self._start,
+                "duration": end - start,
+                "invalidated_by": self._causes.pop(id(owner), []),
+            }
+        )
+
+    def _record_flush(
+        self, domain: ReactiveDomain, start: float, end: float, first_execution: int
+    ) -> None:
+        domain_id = self._domain_id(domain)
+        executions = [
+            x for x in self.executions[first_execution:] if x["domain"] == domain_id
+        ]
+        self.flushes.append(
+            {
+                "domain": domain_id,
+                "start": start - self._start,
+                "duration": end - start,
+                "executions": len(executions),
+                "executed_time": sum(x["duration"] for x in executions),
+            }
+        )
+
+    def _record_output_sizes(
+        self, domain: ReactiveDomain, sizes: dict[str, int]
+    ) -> None:
+        now = self._now()
+        domain_id = self._domain_id(domain)
+        for output, size in sizes.items():
+            self.outputs.append(
+                {"time": now, "domain": domain_id, "output": output, "bytes": size}
+            )
+
+    def to_dict(self) -> dict[str, object]:
+        """
+        Return the recorded data as a JSON-serializable dictionary, with
+        ``"invalidations"``, ``"executions"``, ``"flushes"``, and ``"outputs"`` keys.
+        """
+        return {
+            "invalidations": list(self.invalidations),
+            "executions": list(self.executions),
+            "flushes": list(self.flushes),
+            "outputs": list(self.outputs),
+        }
+
+    def to_json(self, **kwargs: Any) -> str:
+        """
+        Return the recorded data as a JSON string.
+
+        Parameters
+        ----------
+        **kwargs
+            Additional arguments passed to :func:`json.dumps`.
+        """
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_chrome_trace(self) -> dict[str, object]:
+        """
+        Return the recorded data in the Chrome trace event format.
+
+        The result can be saved as JSON and opened in ``chrome://tracing`` or
+        `Perfetto <https://ui.perfetto.dev>`_. Each reactive domain (e.g., each session)
+        is shown as a separate thread, with flushes and executions as slices,
+        invalidations as instant events, and output sizes as counters.
+        """
+
+        def us(seconds: float) -> float:
+            return round(seconds * 1e6, 3)
+
+        events: list[dict[str, object]] = []
+        for flush in self.flushes:
+            events.append(
+                {
+                    "name": "flush",
+                    "cat": "flush",
+                    "ph": "X",
+                    "ts": us(flush["start"]),
+                    "dur": us(flush["duration"]),
+                    "pid": 0,
+                    "tid": flush["domain"],
+                    "args": {"executions": flush["executions"]},
+                }
+            )
+        for execution in self.executions:
+            events.append(
+                {
+                    "name": execution["label"],
+                    "cat": execution["label"].split(":")[0],
+                    "ph": "X",
+                    "ts": us(execution["start"]),
+                    "dur": us(execution["duration"]),
+                    "pid": 0,
+                    "tid": execution["domain"],
+                    "args": {"invalidated_by": execution["invalidated_by"]},
+                }
+            )
+        for invalidation in self.invalidations:
+            events.append(
+                {
+                    "name": "invalidate",
+                    "cat": "invalidate",
+                    "ph": "i",
+                    "s": "p",
+                    "ts": us(invalidation["time"]),
+                    "pid": 0,
+                    "tid": 0,
+                    "args": {
+                        "source": invalidation["source"],
+                        "target": invalidation["target"],
+                    },
+                }
+            )
+        for output in self.outputs:
+            events.append(
+                {
+                    "name": "output bytes",
+                    "cat": "output",
+                    "ph": "C",
+                    "ts": us(output["time"]),
+                    "pid": 0,
+                    "tid": output["domain"],
+                    "args": {output["output"]: output["bytes"]},
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+@no_example()
+@contextlib.contextmanager
+def profile() -> Generator[Profiler, None, None]:
+    """
+    Profile the reactive graph.
+
+    While the ``with`` block is active, every invalidation of a reactive context, every
+    execution of a reactive calculation, effect, or output, and every reactive flush is
+    recorded in the returned :class:`~shiny.reactive.Profiler`. This applies to all
+    sessions in the process.
+
+    Returns
+    -------
+    :
+        A context manager that yields a :class:`~shiny.reactive.Profiler`. The
+        profiler's data can still be read after the ``with`` block has exited.
+
+    Note
+    ----
+    When no profiler is active, the cost of profiling is a single check per
+    invalidation, execution, and flush.
+
+    Examples
+    --------
+    ```python
+    with reactive.profile() as prof:
+        x.set(2)
+        await reactive.flush()
+
+    with open("trace.json", "w") as f:
+        json.dump(prof.to_chrome_trace(), f)
+    ```
+    """
+    global current
+
+    prev = current
+    profiler = Profiler()
+    current = profiler
+    try:
+        yield profiler
+    finally:
+        current = prev
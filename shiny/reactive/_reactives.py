@@ -17,6 +17,8 @@ __all__ = (
 
 import asyncio
 import functools
+import sys
+import time
 import traceback
 import warnings
 from typing import (
@@ -24,8 +26,10 @@ from typing import (
     Awaitable,
     Callable,
     Generic,
+    Literal,
     Optional,
     TypeVar,
+    Union,
     cast,
     overload,
 )
@@ -41,10 +45,13 @@ from ..types import (
     NotifyException,
     SilentException,
 )
+from . import _profiler
 from ._core import Context, Dependents, ReactiveWarning, isolate
+from ._equality import EqualsArg, EqualsFn, fingerprint, resolve_equals
 
 if TYPE_CHECKING:
     from .. import Session
+    from ..cache import Cache
 
 T = TypeVar("T")
 
@@ -73,6 +80,14 @@ class Value(Generic[T]):
         An optional initial value.
     read_only
         If ``True``, then the reactive value cannot be `set()`.
+    equals
+        How to decide whether a new value is the same as the current one, in which case
+        setting it does not invalidate anything that depends on it. The default,
+        ``"identity"``, only treats the very same object as unchanged. ``"equal"``
+        compares values with ``==`` (and data frames, series, and arrays by their
+        contents), and ``"fingerprint"`` compares a hash of their contents. You can also
+        pass a function that takes the old and new values and returns ``True`` if they
+        are the same.
 
     Returns
     -------
@@ -107,21 +122,33 @@ class Value(Generic[T]):
     # - Value(1) works, with T is inferred to be int.
     @overload
     def __init__(
-        self, value: MISSING_TYPE = MISSING, *, read_only: bool = False
+        self,
+        value: MISSING_TYPE = MISSING,
+        *,
+        read_only: bool = False,
+        equals: EqualsArg = "identity",
     ) -> None: ...
 
     @overload
-    def __init__(self, value: T, *, read_only: bool = False) -> None: ...
+    def __init__(
+        self, value: T, *, read_only: bool = False, equals: EqualsArg = "identity"
+    ) -> None: ...
 
     # If `value` is MISSING, then `get()` will raise a SilentException, until a new
     # value is set. Calling `unset()` will set the value to MISSING.
     def __init__(
-        self, value: T | MISSING_TYPE = MISSING, *, read_only: bool = False
+        self,
+        value: T | MISSING_TYPE = MISSING,
+        *,
+        read_only: bool = False,
+        equals: EqualsArg = "identity",
     ) -> None:
         self._value: T | MISSING_TYPE = value
         self._read_only: bool = read_only
-        self._value_dependents: Dependents = Dependents()
-        self._is_set_dependents: Dependents = Dependents()
+        self._equals: Optional[EqualsFn] = resolve_equals(equals)
+        self._label: str = "value"
+        self._value_dependents: Dependents = Dependents(self)
+        self._is_set_dependents: Dependents = Dependents(self)
 
     def __call__(self) -> T:
         return self.get()
@@ -181,6 +208,14 @@ class Value(Generic[T]):
         if self._value is value:
             return False
 
+        if (
+            self._equals is not None
+            and not isinstance(self._value, MISSING_TYPE)
+            and not isinstance(value, MISSING_TYPE)
+            and self._equals(self._value, value)
+        ):
+            return False
+
         if isinstance(self._value, MISSING_TYPE) != isinstance(value, MISSING_TYPE):
             self._is_set_dependents.invalidate()
 
@@ -231,6 +266,8 @@ value = Value
 CalcFunction = Callable[[], T]
 CalcFunctionAsync = Callable[[], Awaitable[T]]
 
+CacheArg = Union[Literal["app"], "Cache", None]
+
 
 class Calc_(Generic[T]):
     """
@@ -247,6 +284,9 @@ class Calc_(Generic[T]):
         fn: CalcFunction[T],
         *,
         session: "MISSING_TYPE | Session | None" = MISSING,
+        equals: Optional[EqualsArg] = None,
+        cache: CacheArg = None,
+        cache_key: Optional[Callable[[], object]] = None,
     ) -> None:
         self.__name__ = fn.__name__
         self.__doc__ = fn.__doc__
@@ -256,14 +296,22 @@ class Calc_(Generic[T]):
         # passed an async function, it will not change it.
         self._fn: CalcFunctionAsync[T] = _utils.wrap_async(fn)
         self._is_async: bool = _utils.is_async_callable(fn)
+        self._label: str = "calc:" + fn.__name__
 
-        self._dependents: Dependents = Dependents()
+        self._dependents: Dependents = Dependents(self)
         self._invalidated: bool = True
         self._running: bool = False
         self._most_recent_ctx_id: int = -1
         self._ctx: Optional[Context] = None
         self._exec_count: int = 0
 
+        # With `equals`, the calc recomputes eagerly when it is invalidated, and only
+        # invalidates its dependents if the result actually changed ("early cutoff").
+        self._cutoff: bool = equals is not None
+        self._equals: Optional[EqualsFn] = (
+            None if equals is None else resolve_equals(equals)
+        )
+
         self._session: Optional[Session]
         # Use `isinstance(x, MISSING_TYPE)`` instead of `x is MISSING` because
         # the type checker doesn't know that MISSING is the only instance of
@@ -276,6 +324,19 @@ class Calc_(Generic[T]):
             session = get_current_session()
         self._session = session
 
+        if (cache is None) != (cache_key is None):
+            raise TypeError("`cache` and `cache_key` must be used together.")
+        self._cache: CacheArg = cache
+        self._cache_key: Optional[Callable[[], object]] = cache_key
+        # Results are shared by every calc created from the same function (e.g., the
+        # same calc in different sessions), so identify the function by its location.
+        code = getattr(fn, "__code__", None)
+        self._cache_id: str = "calc:{}.{}:{}".format(
+            fn.__module__,
+            fn.__qualname__,
+            getattr(code, "co_firstlineno", ""),
+        )
+
         # Use lists to hold (optional) value and error, instead of Optional[T],
         # because it makes typing more straightforward. For example if
         # .get_value() simply returned self._value, self._value had type
@@ -291,10 +352,17 @@ class Calc_(Generic[T]):
 
     # TODO: should this be private?
     async def get_value(self) -> T:
-        self._dependents.register()
+        if self._cutoff:
+            # Bring the value up to date before taking the dependency, so that a change
+            # detected by update_value() doesn't invalidate the caller.
+            if self._invalidated or self._running:
+                await self.update_value()
+            self._dependents.register()
+        else:
+            self._dependents.register()
 
-        if self._invalidated or self._running:
-            await self.update_value()
+            if self._invalidated or self._running:
+                await self.update_value()
 
         if self._error:
             raise self._error[0]
@@ -303,10 +371,10 @@ class Calc_(Generic[T]):
 
     # TODO: should this be private?
     async def update_value(self) -> None:
-        self._ctx = Context()
-        self._most_recent_ctx_id = self._ctx.id
+        self._ctx = ctx = Context(self)
+        self._most_recent_ctx_id = ctx.id
 
-        self._ctx.on_invalidate(self._on_invalidate_cb)
+        ctx.on_invalidate(self._on_invalidate_cb)
 
         self._exec_count += 1
         self._invalidated = False
@@ -316,26 +384,115 @@ class Calc_(Generic[T]):
 
         from ..session import session_context
 
+        profiler = _profiler.current
+        start = time.perf_counter() if profiler is not None else 0.0
+
+        # In early cutoff mode, the previous result is kept around for comparison.
+        old_value = self._value.copy()
+        old_error = self._error.copy()
+        self._value.clear()
+
         with session_context(self._session):
             try:
-                with self._ctx():
+                with ctx():
                     await self._run_func()
             finally:
                 self._running = was_running
+                if profiler is not None:
+                    profiler._record_execution(
+                        self, ctx._domain, start, time.perf_counter()
+                    )
+
+        if self._cutoff and (old_value or old_error):
+            if not self._same_result(old_value, old_error):
+                self._dependents.invalidate()
+
+    def _same_result(self, old_value: list[T], old_error: list[Exception]) -> bool:
+        if old_error or self._error:
+            # Errors are never considered to be the same as anything else
+            return False
+        old, new = old_value[0], self._value[0]
+        if old is new:
+            return True
+        return self._equals is not None and self._equals(old, new)
 
     def _on_invalidate_cb(self) -> None:
         self._invalidated = True
+        old_ctx = self._ctx
+        self._ctx = None  # Allow context to be GC'd
+
+        if self._cutoff and (self._value or self._error):
+            # Don't invalidate dependents yet; recompute at the start of the next flush
+            # of the domain the calc last ran in, and only invalidate them if the result
+            # changed.
+            if old_ctx is not None:
+                with old_ctx._domain.use():
+                    self._schedule_cutoff_check()
+            else:
+                self._schedule_cutoff_check()
+            return
+
         self._value.clear()  # Allow old value to be GC'd
         self._dependents.invalidate()
-        self._ctx = None  # Allow context to be GC'd
+
+    def _schedule_cutoff_check(self) -> None:
+        ctx = Context(self)
+
+        async def check() -> None:
+            # If something read the calc in the meantime, it is already up to date.
+            if self._invalidated:
+                await self.update_value()
+
+        ctx.on_flush(check)
+        # Run before any effects, so that they see the new value if it changed.
+        ctx.add_pending_flush(sys.maxsize)
 
     async def _run_func(self) -> None:
         self._error.clear()
         try:
-            self._value.append(await self._fn())
+            if self._cache_key is None:
+                self._value.append(await self._fn())
+            else:
+                self._value.append(await self._run_func_cached(self._cache_key))
         except Exception as err:
             self._error.append(err)
 
+    async def _run_func_cached(self, cache_key: Callable[[], object]) -> T:
+        # Only the cache key is tracked as a reactive dependency; the function itself
+        # runs isolated, because on a cache hit it doesn't run at all.
+        if is_async_callable(cache_key):
+            key_value = await cache_key()
+        else:
+            key_value = cache_key()
+
+        key_hash = fingerprint(key_value)
+        if key_hash is None:
+            raise TypeError(
+                f"The `cache_key` of `{self.__name__}` returned a value that can't be "
+                "hashed; it must return a picklable value."
+            )
+        key = self._cache_id + ":" + key_hash
+
+        cache = self._resolve_cache()
+        value = cache.get(key)
+        if not isinstance(value, MISSING_TYPE):
+            return cast(T, value)
+
+        with isolate():
+            value = await self._fn()
+        cache.set(key, value)
+        return value
+
+    def _resolve_cache(self) -> Cache:
+        if self._cache != "app":
+            return cast("Cache", self._cache)
+        if self._session is None:
+            raise RuntimeError(
+                '`cache="app"` can only be used in a session; pass a `shiny.cache.Cache` '
+                "object instead."
+            )
+        return self._session.app.cache
+
 
 class CalcAsync_(Calc_[T]):
     """
@@ -352,11 +509,20 @@ class CalcAsync_(Calc_[T]):
         fn: CalcFunctionAsync[T],
         *,
         session: "MISSING_TYPE | Session | None" = MISSING,
+        equals: Optional[EqualsArg] = None,
+        cache: CacheArg = None,
+        cache_key: Optional[Callable[[], object]] = None,
     ) -> None:
         if not _utils.is_async_callable(fn):
             raise TypeError(self.__class__.__name__ + " requires an async function")
 
-        super().__init__(cast(CalcFunction[T], fn), session=session)
+        super().__init__(
+            cast(CalcFunction[T], fn),
+            session=session,
+            equals=equals,
+            cache=cache,
+            cache_key=cache_key,
+        )
 
     async def __call__(self) -> T:  # pyright: ignore[reportIncompatibleMethodOverride]
         return await self.get_value()
@@ -392,7 +558,11 @@ def calc(fn: CalcFunction[T]) -> Calc_[T]: ...
 # works out.
 @overload
 def calc(
-    *, session: "MISSING_TYPE | Session | None" = MISSING
+    *,
+    session: "MISSING_TYPE | Session | None" = MISSING,
+    equals: Optional[EqualsArg] = None,
+    cache: CacheArg = None,
+    cache_key: Optional[Callable[[], object]] = None,
 ) -> Callable[[CalcFunction[T]], Calc_[T]]: ...
 
 
@@ -401,6 +571,9 @@ def calc(
     fn: Optional[CalcFunction[T] | CalcFunctionAsync[T]] = None,
     *,
     session: "MISSING_TYPE | Session | None" = MISSING,
+    equals: Optional[EqualsArg] = None,
+    cache: CacheArg = None,
+    cache_key: Optional[Callable[[], object]] = None,
 ) -> Calc_[T] | Callable[[CalcFunction[T]], Calc_[T]]:
     """
     Mark a function as a reactive calculation.
@@ -417,6 +590,26 @@ def calc(
     session
         A :class:`~shiny.Session` instance. If not provided, the session is inferred via
         :func:`~shiny.session.get_current_session`.
+    equals
+        If provided, the calculation uses "early cutoff": when it is invalidated, it
+        re-executes at the start of the next flush, and only invalidates the reactive
+        functions that depend on it if its result changed. This accepts the same values
+        as the ``equals`` argument of :class:`~shiny.reactive.Value` (e.g.,
+        ``"identity"``, ``"equal"``, ``"fingerprint"``, or a function that takes the old
+        and new results). By default (``None``), every invalidation is passed on to
+        dependents and the calculation only re-executes when it is next called.
+    cache
+        Where to cache results, so that they can be reused by other sessions (and by
+        the same session, when it returns to a previous state). Use ``"app"`` for the
+        app's cache (:attr:`shiny.App.cache`), or pass a :class:`~shiny.cache.Cache`
+        object such as :class:`~shiny.cache.MemoryCache` or
+        :class:`~shiny.cache.DiskCache`. Must be used with ``cache_key``. Cached values
+        must be picklable when using a disk cache.
+    cache_key
+        A function that returns the cache key, e.g., ``lambda: (input.x(), input.y())``.
+        When the calculation is cached, it only takes reactive dependencies on what the
+        cache key reads: the calculation itself runs isolated, so every reactive value
+        that affects the result must be part of the key.
 
     Returns
     -------
@@ -441,10 +634,14 @@ def calc(
 
     def create_calc(fn: CalcFunction[T] | CalcFunctionAsync[T]) -> Calc_[T]:
         if _utils.is_async_callable(fn):
-            return CalcAsync_(fn, session=session)
+            return CalcAsync_(
+                fn, session=session, equals=equals, cache=cache, cache_key=cache_key
+            )
         else:
             fn = cast(CalcFunction[T], fn)
-            return Calc_(fn, session=session)
+            return Calc_(
+                fn, session=session, equals=equals, cache=cache, cache_key=cache_key
+            )
 
     if fn is None:
         return create_calc
@@ -499,6 +696,7 @@ class Effect_:
         self._fn: EffectFunctionAsync = _utils.wrap_async(fn)
         # This indicates whether the user's effect function (before wrapping) is async.
         self._is_async: bool = _utils.is_async_callable(fn)
+        self._label: str = "effect:" + fn.__name__
 
         self._priority: int = priority
         self._suspended = suspended
@@ -534,7 +732,7 @@ class Effect_:
         self._create_context().invalidate()
 
     def _create_context(self) -> Context:
-        ctx = Context()
+        ctx = Context(self)
 
         # Store the context explicitly in Effect object
         # TODO: More explanation here
@@ -576,6 +774,9 @@ class Effect_:
         ctx = self._create_context()
         self._exec_count += 1
 
+        profiler = _profiler.current
+        start = time.perf_counter() if profiler is not None else 0.0
+
         from ..session import session_context
 
         with session_context(self._session):
@@ -611,6 +812,9 @@ class Effect_:
                 if self._session:
                     await self._session._unhandled_error(e)
 
+        if profiler is not None:
+            profiler._record_execution(self, ctx._domain, start, time.perf_counter())
+
     def on_invalidate(self, callback: Callable[[], None]) -> None:
         """
         Register a callback that will be called when this reactive effect is
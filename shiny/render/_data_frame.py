@@ -13,10 +13,15 @@ from .._docstring import add_example
 from .._utils import wrap_async
 from ..session._utils import require_active_session, session_context
 from ..types import JsonifiableDict, ListOrTuple
-from ._data_frame_utils._datagridtable import AbstractTabularData, DataGrid, DataTable
+from ._data_frame_utils._datagridtable import (
+    AbstractTabularData,
+    DataGrid,
+    DataTable,
+)
 from ._data_frame_utils._html import maybe_as_cell_html
 from ._data_frame_utils._patch import (
     CellPatch,
+    CellPatchMap,
     CellValue,
     PatchesFn,
     PatchesFnSync,
@@ -30,15 +35,19 @@ from ._data_frame_utils._selection import (
     SelectionModes,
     as_cell_selection,
 )
-from ._data_frame_utils._styles import as_browser_style_infos
+from ._data_frame_utils._styles import (
+    as_browser_style_infos,
+    update_browser_style_infos,
+)
 from ._data_frame_utils._tbl_data import (
     apply_frame_patches__typed,
+    frame_column_names,
     frame_columns,
-    frame_shape,
     serialize_dtype,
     subset_frame__typed,
 )
 from ._data_frame_utils._types import (
+    BrowserStyleInfo,
     CellPatchProcessed,
     ColumnFilter,
     ColumnSort,
@@ -72,6 +81,14 @@ class data_frame(Renderer[DataFrameResult[DataFrameLikeT]]):
     grid. Features fast virtualized scrolling, sorting, filtering, and row selection
     (single or multiple).
 
+    [PyArrow](https://arrow.apache.org/docs/python/) `Table` objects and
+    [DuckDB](https://duckdb.org/docs/api/python/overview) relations are also supported
+    natively, without converting them to pandas. Polars `LazyFrame`s and DuckDB
+    relations stay lazy: subsetting and edits are added to the query, and
+    `.data_view()` also returns a `LazyFrame` (or relation), which only collects the
+    rows of the view. Rendering still collects all of the rows, since the browser sorts
+    and filters the complete data.
+
     Returns
     -------
     :
@@ -80,8 +97,9 @@ class data_frame(Renderer[DataFrameResult[DataFrameLikeT]]):
         1. A :class:`~shiny.render.DataGrid` or :class:`~shiny.render.DataTable` object,
            which can be used to customize the appearance and behavior of the data frame
            output.
-        2. A pandas `DataFrame` object or a polars `DataFrame` object. This object will
-           be internally upgraded to `shiny.render.DataGrid(df)`.
+        2. A pandas `DataFrame`, polars `DataFrame` or `LazyFrame`, PyArrow `Table`,
+           or DuckDB relation. This object will be internally upgraded to
+           `shiny.render.DataGrid(df)`.
 
     Row selection
     -------------
@@ -167,14 +185,13 @@ class data_frame(Renderer[DataFrameResult[DataFrameLikeT]]):
     patches with updated values.
     """
 
-    _cell_patch_map: reactive.Value[dict[tuple[int, int], CellPatch]]
+    _cell_patch_map: reactive.Value[CellPatchMap]
     """
-    Reactive dictionary of patches to be applied to the data frame.
-
-    This map is used for faster deduplications of patches at each location given the row
-    and column indices.
+    Reactive map of patches to be applied to the data frame.
 
-    The key is defined as `(row_index, column_index)`.
+    This map keeps the latest patch at each location (given the row and column indices),
+    stored by column, and the order in which patches were added, so that only new
+    patches need to be applied to the previously patched data.
     """
     cell_patches: reactive.Calc_[list[CellPatch]]
     """
@@ -306,8 +323,10 @@ class data_frame(Renderer[DataFrameResult[DataFrameLikeT]]):
 
     def _reset_reactives(self) -> None:
         self._value.set(None)
-        self._cell_patch_map.set({})
+        self._cell_patch_map.set(CellPatchMap())
         self._type_hints.set(None)
+        self._data_patched_cache = None
+        self._browser_styles = None
 
     def _init_reactives(self) -> None:
 
@@ -318,11 +337,18 @@ class data_frame(Renderer[DataFrameResult[DataFrameLikeT]]):
             reactive.Value(None)
         )
         self._type_hints: reactive.Value[list[FrameDtype] | None] = reactive.Value(None)
-        self._cell_patch_map = reactive.Value({})
+        self._cell_patch_map = reactive.Value(CellPatchMap())
+        # (data, patch map, patched data) of the last patched data
+        self._data_patched_cache: (
+            tuple[DataFrameLikeT, CellPatchMap, DataFrameLikeT] | None
+        ) = None
+        # (styles last sent to the browser, number of styles when they were last
+        # evaluated for all rows)
+        self._browser_styles: tuple[list[BrowserStyleInfo], int] | None = None
 
         @reactive.calc
         def self_cell_patches() -> list[CellPatch]:
-            return list(self._cell_patch_map().values())
+            return self._cell_patch_map().patches()
 
         self.cell_patches = self_cell_patches
 
@@ -367,7 +393,7 @@ class data_frame(Renderer[DataFrameResult[DataFrameLikeT]]):
                 data_view_rows=self.data_view_rows(),
                 # TODO-barret: replace methods like .shape, .loc. .iat with those from
                 # _tbl_data.py, test in the playright app.
-                data_view_cols=tuple(range(frame_shape(self.data())[1])),
+                data_view_cols=tuple(range(len(frame_column_names(self.data())))),
             )
 
             return cell_selection
@@ -401,7 +427,25 @@ class data_frame(Renderer[DataFrameResult[DataFrameLikeT]]):
 
         @reactive.calc
         def self__data_patched() -> DataFrameLikeT:
-            return apply_frame_patches__typed(self.data(), self.cell_patches())
+            data = self.data()
+            cell_patch_map = self._cell_patch_map()
+
+            # Bring the previously patched data up to date, if possible
+            cached = self._data_patched_cache
+            if (
+                cached is not None
+                and cached[0] is data
+                and cached[1].shares_storage(cell_patch_map)
+            ):
+                new_patches = cell_patch_map.patches_since(cached[1].version)
+                if new_patches is not None:
+                    data_patched = apply_frame_patches__typed(cached[2], new_patches)
+                    self._data_patched_cache = (data, cell_patch_map, data_patched)
+                    return data_patched
+
+            data_patched = apply_frame_patches__typed(data, cell_patch_map.patches())
+            self._data_patched_cache = (data, cell_patch_map, data_patched)
+            return data_patched
 
         self._data_patched = self__data_patched
 
@@ -626,7 +670,9 @@ class data_frame(Renderer[DataFrameResult[DataFrameLikeT]]):
             for ret_processed_patch in processed_patches
         ]
 
-        await self._attempt_update_cell_style()
+        await self._attempt_update_cell_style(
+            rows=[patch["row_index"] for patch in patches]
+        )
 
         # Return the processed patches to the client
         return jsonifiable_patches
@@ -643,9 +689,6 @@ class data_frame(Renderer[DataFrameResult[DataFrameLikeT]]):
         patches
             Set of patches to apply to store in the cell patch map.
         """
-        # Use copy to set the new value
-        cell_patch_map = self._cell_patch_map().copy()
-
         for patch in patches:
             row_index = patch["row_index"]
             column_index = patch["column_index"]
@@ -661,12 +704,22 @@ class data_frame(Renderer[DataFrameResult[DataFrameLikeT]]):
             # TODO-render.data_frame; The `value` should be coerced by pandas to the correct type
             # TODO-render.data_frame; See https://pandas.pydata.org/pandas-docs/stable/user_guide/basics.html#object-conversion
 
-            cell_patch_map[(row_index, column_index)] = patch
+        # Once all patches are checked, update the cell patch map with new version. Only
+        # the new patches are stored; the existing patches are not copied.
+        self._cell_patch_map.set(self._cell_patch_map().with_patches(patches))
 
-        # Once all patches are set, update the cell patch map with new version
-        self._cell_patch_map.set(cell_patch_map)
+    async def _attempt_update_cell_style(
+        self, rows: ListOrTuple[int] | None = None
+    ) -> None:
+        """
+        Re-evaluate the styles of the data frame and send them to the browser.
 
-    async def _attempt_update_cell_style(self) -> None:
+        Parameters
+        ----------
+        rows
+            The rows whose values changed. If given (and the styles are row-wise), only
+            the styles of these rows are re-evaluated.
+        """
         with session_context(self._get_session()):
 
             rendered_value = self._value()
@@ -677,7 +730,24 @@ class data_frame(Renderer[DataFrameResult[DataFrameLikeT]]):
             if not callable(styles_fn):
                 return
 
-            new_styles = as_browser_style_infos(styles_fn, data=self._data_patched())
+            prev = self._browser_styles
+            if (
+                rows is not None
+                and rendered_value.styles_rowwise
+                and prev is not None
+                # Each update adds the styles of the updated rows, so occasionally
+                # start over from the styles of all rows
+                and len(prev[0]) <= 2 * prev[1] + 100
+            ):
+                new_styles = update_browser_style_infos(
+                    prev[0], styles_fn, data=self._data_patched(), rows=rows
+                )
+                self._browser_styles = (new_styles, prev[1])
+            else:
+                new_styles = as_browser_style_infos(
+                    styles_fn, data=self._data_patched()
+                )
+                self._browser_styles = (new_styles, len(new_styles))
 
             await self._send_message_to_browser(
                 "updateStyles",
@@ -760,9 +830,12 @@ class data_frame(Renderer[DataFrameResult[DataFrameLikeT]]):
 
         # Use session context so `to_payload()` gets the correct session
         with session_context(self._get_session()):
-            payload = value.to_payload()
+            # The rows are encoded as JSON once, and sent as is
+            payload = value._to_payload(raw_json=True)
             self._type_hints.set(payload["typeHints"])
-
+            styles = payload.get("options", {}).get("styles")
+            if styles is not None:
+                self._browser_styles = (styles, len(styles))
             ret: FrameRender = {
                 "payload": payload,
                 "patchInfo": {
@@ -812,7 +885,7 @@ class data_frame(Renderer[DataFrameResult[DataFrameLikeT]]):
             selection_modes = self.selection_modes()
             data = self.data()
             data_view_rows = self.data_view_rows()
-            data_view_cols = tuple(range(data.shape[1]))
+            data_view_cols = tuple(range(len(frame_column_names(data))))
 
         if selection_modes._is_none():
             warnings.warn(
@@ -887,7 +960,7 @@ class data_frame(Renderer[DataFrameResult[DataFrameLikeT]]):
         if len(sort) > 0:
             with reactive.isolate():
                 data = self.data()
-            ncol = frame_shape(data)[1]
+            ncol = len(frame_column_names(data))
 
             for val in sort:
                 val_dict: ColumnSort
@@ -930,7 +1003,7 @@ class data_frame(Renderer[DataFrameResult[DataFrameLikeT]]):
         else:
             with reactive.isolate():
                 data = self.data()
-            ncol = len(data.columns)
+            ncol = len(frame_column_names(data))
 
             for column_filter, i in zip(filter, range(len(filter))):
                 assert isinstance(column_filter, dict)
@@ -0,0 +1,101 @@
+"""
+Cache of the metadata of data frame columns (their type hints).
+
+Inferring the type of a pandas column can scan all of its values, so the results are
+kept for as long as the column's values exist, and are reused by every data frame that
+holds the same values (e.g., when a data frame is re-rendered, or when only some of its
+columns change).
+
+Columns are identified by their values, not their contents, so only columns whose type
+hint can't change while their values exist should be cached. Modifying a column of
+Python objects in place (e.g., with `df.loc[...] = ...` when pandas' copy-on-write mode
+is off) can change its type (e.g., to HTML), so those columns aren't cached.
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from typing import TYPE_CHECKING, Any, Dict, Hashable, List, Optional, Tuple
+
+from ._types import FrameDtype
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class ColumnInfo:
+    """
+    The metadata of a column. Each value is `None` until it is first computed.
+    """
+
+    __slots__ = ("dtype",)
+
+    def __init__(self) -> None:
+        self.dtype: Optional[FrameDtype] = None
+
+
+# id of the values that hold a column's data -> (weak reference to the values, the
+# column's location within them -> info). The values are looked up by identity, since
+# arrays aren't hashable, and their entry is removed when they are garbage collected.
+_cache: Dict[int, Tuple["weakref.ref[Any]", Dict[Hashable, ColumnInfo]]] = {}
+_lock = threading.Lock()
+# The ids of garbage collected values. (They are removed from the cache later, since
+# garbage collection can happen while the lock is held.)
+_removed: List[int] = []
+
+
+def column_info_pd(col: "pd.Series[Any]") -> ColumnInfo:
+    """
+    The (cached) metadata of a pandas column.
+    """
+    owner, location = _column_key_pd(col)
+    key = id(owner)
+    with _lock:
+        _remove_collected()
+        entry = _cache.get(key)
+        if entry is None or entry[0]() is not owner:
+            try:
+                ref = weakref.ref(owner, lambda _: _removed.append(key))
+            except TypeError:
+                # The values can't be weakly referenced; don't cache
+                return ColumnInfo()
+            entry = _cache[key] = (ref, {})
+        infos = entry[1]
+        info = infos.get(location)
+        if info is None:
+            info = infos[location] = ColumnInfo()
+        return info
+
+
+def _remove_collected() -> None:
+    while len(_removed) > 0:
+        key = _removed.pop()
+        entry = _cache.get(key)
+        # The id may already have been reused by other values
+        if entry is not None and entry[0]() is None:
+            del _cache[key]
+
+
+def _column_key_pd(col: "pd.Series[Any]") -> tuple[Any, Hashable]:
+    import numpy as np
+
+    # The array (or extension array) that holds the values. Unlike the `Series`, which
+    # is created anew each time a column is taken from a data frame, the array lives as
+    # long as the data.
+    values = col._values  # pyright: ignore[reportAttributeAccessIssue]
+    if not isinstance(values, np.ndarray):
+        return values, None
+
+    # A NumPy column is usually a view of a 2D array that holds several columns (and the
+    # views themselves are also created anew), so use the array that owns the memory,
+    # and where the column is within it
+    owner = values
+    while isinstance(owner.base, np.ndarray):
+        owner = owner.base
+    return owner, (
+        values.__array_interface__["data"][0],
+        values.shape,
+        values.strides,
+        values.dtype.str,
+    )
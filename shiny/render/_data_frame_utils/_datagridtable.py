@@ -11,7 +11,7 @@ from ._selection import (
     as_selection_modes,
 )
 from ._styles import StyleFn, StyleInfo, as_browser_style_infos, as_style_infos
-from ._tbl_data import as_data_frame_like, serialize_frame
+from ._tbl_data import as_data_frame_like, serialize_frame, serialize_frame_json
 from ._types import DataFrameLikeT, FrameJson
 
 
@@ -19,6 +19,14 @@ class AbstractTabularData(abc.ABC):
     @abc.abstractmethod
     def to_payload(self) -> FrameJson: ...
 
+    def _to_payload(self, *, raw_json: bool) -> FrameJson:
+        """
+        The payload for rendering. With `raw_json=True`, the rows may be given as
+        already-encoded JSON (`_json.RawJson`), which is only suitable for sending to
+        the browser.
+        """
+        return self.to_payload()
+
 
 @add_example(ex_dir="../../api-examples/data_frame_grid_table")
 @add_example(ex_dir="../../api-examples/data_frame_styles")
@@ -39,8 +47,9 @@ class DataGrid(AbstractTabularData, Generic[DataFrameLikeT]):
     Parameters
     ----------
     data
-        A pandas or polars `DataFrame` object. If the object has a `.to_pandas()`
-        method, use the pandas form of your data.
+        A pandas or polars `DataFrame`, a polars `LazyFrame`, a PyArrow `Table`, or a
+        DuckDB relation. If the object is of another type with a `.to_pandas()` method,
+        use the pandas form of your data.
     width
         A _maximum_ amount of horizontal space for the data grid to occupy, in CSS units
         (e.g. `"400px"`) or as a number, which will be interpreted as pixels. The
@@ -98,6 +107,17 @@ class DataGrid(AbstractTabularData, Generic[DataFrameLikeT]):
         If both `style` and `class` are missing or `None`, nothing will be applied. If
         both `rows` and `cols` are missing or `None`, the style will be applied to the
         complete data frame.
+
+        Besides a list of row numbers or booleans, `rows` can be a boolean (or integer)
+        NumPy array, pandas or polars Series, or, for polars data frames, a polars
+        expression (e.g. `pl.col("x") > 0`). These are evaluated with vectorized
+        operations.
+    styles_rowwise
+        If `True`, `styles` is a function whose styles for each row only depend on the
+        values in that row (and not, e.g., on the rank of a value within its column).
+        After cells are edited, the function is then only called with the edited rows,
+        and the styles of the other rows are kept, instead of re-evaluating the styles
+        of the complete data frame.
     row_selection_mode
         Deprecated. Please use `selection_mode=` instead.
 
@@ -122,6 +142,7 @@ class DataGrid(AbstractTabularData, Generic[DataFrameLikeT]):
     editable: bool
     selection_modes: SelectionModes
     styles: list[StyleInfo] | StyleFn[DataFrameLikeT]
+    styles_rowwise: bool
 
     def __init__(
         self,
@@ -134,6 +155,7 @@ class DataGrid(AbstractTabularData, Generic[DataFrameLikeT]):
         editable: bool = False,
         selection_mode: SelectionModeInput = "none",
         styles: StyleInfo | list[StyleInfo] | StyleFn[DataFrameLikeT] | None = None,
+        styles_rowwise: bool = False,
         row_selection_mode: RowSelectionModeDeprecated = "deprecated",
     ):
 
@@ -150,6 +172,7 @@ class DataGrid(AbstractTabularData, Generic[DataFrameLikeT]):
             row_selection_mode=row_selection_mode,
         )
         self.styles = as_style_infos(styles)
+        self.styles_rowwise = bool(styles_rowwise)
 
     def to_payload(self) -> FrameJson:
         """
@@ -160,8 +183,12 @@ class DataGrid(AbstractTabularData, Generic[DataFrameLikeT]):
         :
             The payload dictionary representing the `DataGrid` object.
         """
+        return self._to_payload(raw_json=False)
+
+    def _to_payload(self, *, raw_json: bool) -> FrameJson:
+        serialize = serialize_frame_json if raw_json else serialize_frame
         res: FrameJson = {
-            **serialize_frame(self.data),
+            **serialize(self.data),
             "options": {
                 "width": self.width,
                 "height": self.height,
@@ -198,8 +225,9 @@ class DataTable(AbstractTabularData, Generic[DataFrameLikeT]):
     Parameters
     ----------
     data
-        A pandas or polars `DataFrame` object. If the object has a `.to_pandas()`
-        method, use the pandas form of your data.
+        A pandas or polars `DataFrame`, a polars `LazyFrame`, a PyArrow `Table`, or a
+        DuckDB relation. If the object is of another type with a `.to_pandas()` method,
+        use the pandas form of your data.
     width
         A _maximum_ amount of vertical space for the data table to occupy, in CSS units
         (e.g. `"400px"`) or as a number, which will be interpreted as pixels. The
@@ -257,6 +285,17 @@ class DataTable(AbstractTabularData, Generic[DataFrameLikeT]):
         If both `style` and `class` are missing or `None`, nothing will be applied. If
         both `rows` and `cols` are missing or `None`, the style will be applied to the
         complete data frame.
+
+        Besides a list of row numbers or booleans, `rows` can be a boolean (or integer)
+        NumPy array, pandas or polars Series, or, for polars data frames, a polars
+        expression (e.g. `pl.col("x") > 0`). These are evaluated with vectorized
+        operations.
+    styles_rowwise
+        If `True`, `styles` is a function whose styles for each row only depend on the
+        values in that row (and not, e.g., on the rank of a value within its column).
+        After cells are edited, the function is then only called with the edited rows,
+        and the styles of the other rows are kept, instead of re-evaluating the styles
+        of the complete data frame.
     row_selection_mode
         Deprecated. Please use `mode={row_selection_mode}_row` instead.
 
@@ -281,6 +320,7 @@ class DataTable(AbstractTabularData, Generic[DataFrameLikeT]):
     editable: bool
     selection_modes: SelectionModes
     styles: list[StyleInfo] | StyleFn[DataFrameLikeT]
+    styles_rowwise: bool
 
     def __init__(
         self,
@@ -293,6 +333,7 @@ class DataTable(AbstractTabularData, Generic[DataFrameLikeT]):
         editable: bool = False,
         selection_mode: SelectionModeInput = "none",
         styles: StyleInfo | list[StyleInfo] | StyleFn[DataFrameLikeT] | None = None,
+        styles_rowwise: bool = False,
         row_selection_mode: Literal["deprecated"] = "deprecated",
     ):
         self.data = as_data_frame_like(data)
@@ -308,6 +349,7 @@ class DataTable(AbstractTabularData, Generic[DataFrameLikeT]):
             row_selection_mode=row_selection_mode,
         )
         self.styles = as_style_infos(styles)
+        self.styles_rowwise = bool(styles_rowwise)
 
     def to_payload(self) -> FrameJson:
         """
@@ -318,8 +360,12 @@ class DataTable(AbstractTabularData, Generic[DataFrameLikeT]):
         :
             The payload dictionary representing the `DataTable` object.
         """
+        return self._to_payload(raw_json=False)
+
+    def _to_payload(self, *, raw_json: bool) -> FrameJson:
+        serialize = serialize_frame_json if raw_json else serialize_frame
         res: FrameJson = {
-            **serialize_frame(self.data),
+            **serialize(self.data),
             "options": {
                 "width": self.width,
                 "height": self.height,
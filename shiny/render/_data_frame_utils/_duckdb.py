@@ -0,0 +1,169 @@
+"""
+Data frame backend for DuckDB relations.
+
+Relations are lazy: subsetting and patching build new relations (or queries), and rows
+are only fetched when they are serialized. Rows are numbered in the order that the
+relation produces them, so the relation should have a deterministic order (e.g., by
+ending with `ORDER BY`). The number of rows is counted once per relation, so a relation
+whose underlying tables change should be created again.
+"""
+
+from __future__ import annotations
+
+import math
+import weakref
+from typing import TYPE_CHECKING, Any, List, Tuple
+
+from ._patch import patches_by_column
+from ._types import CellPatch, ColsList, FrameDtype, RowsList
+
+if TYPE_CHECKING:
+    import duckdb
+
+# The name that a relation has within the queries below
+_REL = "__shiny_rel"
+# The (zero-based) row number, in the order that the relation produces the rows
+_ROW = "__shiny_row"
+_NUMBERED = f"SELECT *, row_number() OVER () - 1 AS {_ROW} FROM {_REL}"
+
+
+# The number of rows of each relation (which takes running the relation's query)
+_row_counts: weakref.WeakKeyDictionary[duckdb.DuckDBPyRelation, int] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _literal(value: Any) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if math.isnan(value) or math.isinf(value):
+            return f"'{value}'::DOUBLE"
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _col_name(rel: "duckdb.DuckDBPyRelation", col: str | int) -> str:
+    return col if isinstance(col, str) else rel.columns[col]
+
+
+def frame_columns_duckdb(
+    rel: "duckdb.DuckDBPyRelation",
+) -> List["duckdb.DuckDBPyRelation"]:
+    return [rel.project(_ident(name)) for name in rel.columns]
+
+
+def frame_shape_duckdb(rel: "duckdb.DuckDBPyRelation") -> Tuple[int, ...]:
+    n = _row_counts.get(rel)
+    if n is None:
+        row = rel.aggregate("count(*)").fetchone()
+        n = 0 if row is None else int(row[0])
+        _row_counts[rel] = n
+    return (n, len(rel.columns))
+
+
+def subset_frame_duckdb(
+    rel: "duckdb.DuckDBPyRelation",
+    *,
+    rows: RowsList = None,
+    cols: ColsList = None,
+) -> "duckdb.DuckDBPyRelation":
+    if cols is not None:
+        rel = rel.project(", ".join(_ident(_col_name(rel, col)) for col in cols))
+    if rows is None:
+        return rel
+
+    rows = [int(row) for row in rows]
+    if len(rows) == 0:
+        return rel.limit(0)
+    if rows == list(range(rows[0], rows[0] + len(rows))):
+        # A contiguous window of rows
+        return rel.limit(len(rows), offset=rows[0])
+
+    import numpy as np
+
+    # The rows are joined from arrays, which DuckDB finds by their variable name (so
+    # that the row numbers don't have to be written into the query), and are kept in
+    # the requested order
+    __shiny_rows = {  # noqa: F841
+        _ROW: np.asarray(rows, dtype=np.int64),
+        "__shiny_ord": np.arange(len(rows)),
+    }
+    return rel.query(
+        _REL,
+        f"SELECT * EXCLUDE ({_ROW}, __shiny_ord) FROM ({_NUMBERED}) "
+        f"JOIN __shiny_rows USING ({_ROW}) ORDER BY __shiny_ord",
+    )
+
+
+def get_frame_cell_duckdb(rel: "duckdb.DuckDBPyRelation", row: int, col: int) -> Any:
+    res = rel.limit(1, offset=row).fetchone()
+    if res is None:
+        raise IndexError(f"Row {row} is out of bounds")
+    return res[col]
+
+
+def apply_frame_patches_duckdb(
+    rel: "duckdb.DuckDBPyRelation",
+    patches: List[CellPatch],
+) -> "duckdb.DuckDBPyRelation":
+    if len(patches) == 0:
+        return rel
+
+    replacements: list[str] = []
+    for col, (rows, values) in patches_by_column(patches).items():
+        col_type = str(rel.types[col])
+        cases = " ".join(
+            f"WHEN {row} THEN CAST({_literal(value)} AS {col_type})"
+            for row, value in zip(rows, values)
+        )
+        name = _ident(rel.columns[col])
+        replacements.append(f"CASE {_ROW} {cases} ELSE {name} END AS {name}")
+
+    return rel.query(
+        _REL,
+        f"SELECT * EXCLUDE ({_ROW}) REPLACE ({', '.join(replacements)}) "
+        f"FROM ({_NUMBERED}) ORDER BY {_ROW}",
+    )
+
+
+_numeric_types = {
+    "TINYINT",
+    "SMALLINT",
+    "INTEGER",
+    "BIGINT",
+    "HUGEINT",
+    "UTINYINT",
+    "USMALLINT",
+    "UINTEGER",
+    "UBIGINT",
+    "UHUGEINT",
+    "FLOAT",
+    "DOUBLE",
+}
+
+
+def serialize_dtype_duckdb(col: "duckdb.DuckDBPyRelation") -> FrameDtype:
+    col_type = str(col.types[0])
+
+    if col_type == "VARCHAR":
+        return {"type": "string"}
+    if col_type in _numeric_types or col_type.startswith("DECIMAL"):
+        return {"type": "numeric"}
+    if col_type.startswith("ENUM"):
+        res = col.query(_REL, f"SELECT enum_range(NULL::{col_type})").fetchone()
+        categories = [] if res is None else [str(x) for x in res[0]]
+        return {"type": "categorical", "categories": categories}
+    if col_type.startswith("TIMESTAMP") or col_type == "DATE":
+        return {"type": "datetime"}
+    if col_type == "INTERVAL":
+        return {"type": "timedelta"}
+    return {"type": "unknown"}
@@ -42,7 +42,17 @@ def maybe_as_cell_html(
 
 
 def col_contains_shiny_html(col: SeriesLike) -> bool:
-    return any(is_shiny_html(val) for _, val in enumerate(col))
+    # Whether a value is HTML only depends on its type, so check one value of each type.
+    # (The checks against protocols are much slower than looking up the type.)
+    checked_types: set[type] = set()
+    for val in col:
+        val_type = type(val)
+        if val_type in checked_types:
+            continue
+        if is_shiny_html(val):
+            return True
+        checked_types.add(val_type)
+    return False
 
 
 # TODO-barret-test; Add test to assert the union type of `TagNode` contains `str` and (HTML | Tagifiable | MetadataNode | ReprHtml). Until a `is tag renderable` method is available in htmltools, we need to check for these types manually and must stay in sync with the `TagNode` union type.
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import json
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, cast
 
 from htmltools import TagNode
 
+from ... import _json
 from ...session._utils import require_active_session
+from ._column_cache import column_info_pd
 from ._html import col_contains_shiny_html, maybe_as_cell_html
 from ._tbl_data import PdDataFrame, frame_column_names
 from ._types import FrameDtype, FrameJson
@@ -15,6 +16,54 @@ if TYPE_CHECKING:
 
 
 def serialize_frame_pd(df: "pd.DataFrame") -> FrameJson:
+    df, type_hints = _prepare_frame_pd(df)
+
+    res = _json.loads(
+        # {index: [index], columns: [columns], data: [values]}
+        df.to_json(  # pyright: ignore[reportUnknownMemberType]
+            None,
+            orient="split",
+            # note that date_format iso converts durations to ISO8601 Durations.
+            # e.g. 1 Day -> P1DT0H0M0S
+            # see https://en.wikipedia.org/wiki/ISO_8601#Durations
+            date_format="iso",
+            default_handler=str,
+        )
+    )
+
+    res["typeHints"] = type_hints
+
+    # print(json.dumps(res, indent=4))
+    return res
+
+
+def serialize_frame_json_pd(df: "pd.DataFrame") -> FrameJson:
+    """
+    Like `serialize_frame_pd()`, but the rows are left as the JSON text that pandas
+    writes, so that they are never turned into Python objects.
+    """
+    df, type_hints = _prepare_frame_pd(df)
+
+    data = df.to_json(  # pyright: ignore[reportUnknownMemberType]
+        None,
+        orient="values",
+        date_format="iso",
+        default_handler=str,
+    )
+
+    return {
+        # Column names are written as strings, as with `orient="split"`
+        "columns": [str(col) for col in frame_column_names(df)],
+        "data": cast(Any, _json.RawJson(data)),
+        "typeHints": type_hints,
+    }
+
+
+def _prepare_frame_pd(df: "pd.DataFrame") -> tuple["pd.DataFrame", list[FrameDtype]]:
+    """
+    Check the column names, drop the index, and upgrade HTML columns to `CellHtml`
+    objects.
+    """
     import pandas as pd
 
     columns = frame_column_names(df)
@@ -25,6 +74,10 @@ def serialize_frame_pd(df: "pd.DataFrame") -> FrameJson:
             " This is not supported by the data_frame renderer."
         )
 
+    # Infer the types before the index is reset, which copies the columns (and so
+    # would miss the cached type hints of the columns)
+    type_hints = serialize_numpy_dtypes(df)
+
     # Currently, we don't make use of the index; drop it so we don't error trying to
     # serialize it or something
     df = df.reset_index(drop=True)
@@ -39,8 +92,6 @@ def serialize_frame_pd(df: "pd.DataFrame") -> FrameJson:
     #             " This is not supported by the data_frame renderer."
     #         )
 
-    type_hints = serialize_numpy_dtypes(df)
-
     # Auto opt-in for html columns
     html_columns = [
         i for i, type_hint in enumerate(type_hints) if type_hint["type"] == "html"
@@ -65,23 +116,7 @@ def serialize_frame_pd(df: "pd.DataFrame") -> FrameJson:
                     wrap_shiny_html_with_session
                 )
 
-    res = json.loads(
-        # {index: [index], columns: [columns], data: [values]}
-        df.to_json(  # pyright: ignore[reportUnknownMemberType]
-            None,
-            orient="split",
-            # note that date_format iso converts durations to ISO8601 Durations.
-            # e.g. 1 Day -> P1DT0H0M0S
-            # see https://en.wikipedia.org/wiki/ISO_8601#Durations
-            date_format="iso",
-            default_handler=str,
-        )
-    )
-
-    res["typeHints"] = type_hints
-
-    # print(json.dumps(res, indent=4))
-    return res
+    return df, type_hints
 
 
 def serialize_numpy_dtypes(df: PdDataFrame) -> list[FrameDtype]:
@@ -96,6 +131,24 @@ def serialize_pd_dtype(
 ) -> FrameDtype:
     import pandas as pd
 
+    if pd.api.types.is_object_dtype(col.dtype) or isinstance(col.dtype, pd.StringDtype):
+        # The values of a column of Python objects (or strings) can be replaced in place
+        # (e.g., a string with `ui.HTML`) without creating new values, so its type is
+        # inferred every time
+        return _serialize_pd_dtype(col)
+
+    info = column_info_pd(col)
+    if info.dtype is None:
+        info.dtype = _serialize_pd_dtype(col)
+    # Copy, so that the cached type hint can't be modified
+    return cast(FrameDtype, dict(info.dtype))
+
+
+def _serialize_pd_dtype(
+    col: "pd.Series[Any]",
+) -> FrameDtype:
+    import pandas as pd
+
     t = pd.api.types.infer_dtype(col)
     # t can be any of: string, bytes, floating, integer, mixed-integer,
     #     mixed-integer-float, decimal, complex, categorical, boolean, datetime64,
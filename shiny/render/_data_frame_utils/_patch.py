@@ -2,7 +2,7 @@ from __future__ import annotations
 
 # TODO-barret-render.data_frame; Docs
 # TODO-barret-render.data_frame; Add examples of patch!
-from typing import Protocol, Sequence
+from typing import Dict, Iterable, List, Optional, Protocol, Sequence, Tuple
 
 from ...types import ListOrTuple
 from ._types import CellPatch, CellValue
@@ -48,3 +48,93 @@ def assert_patches_shape(x: Sequence[CellPatch]) -> None:
         assert "row_index" in patch
         assert "column_index" in patch
         assert "value" in patch
+
+
+def patches_by_column(
+    patches: Iterable[CellPatch],
+) -> Dict[int, Tuple[List[int], List[CellValue]]]:
+    """
+    Group patches by column, as `{column_index: (row_indices, values)}`. When a cell is
+    patched more than once, the last patch wins.
+    """
+    columns: Dict[int, Dict[int, CellValue]] = {}
+    for patch in patches:
+        columns.setdefault(patch["column_index"], {})[patch["row_index"]] = patch[
+            "value"
+        ]
+    return {
+        col: (list(row_values.keys()), list(row_values.values()))
+        for col, row_values in columns.items()
+    }
+
+
+class CellPatchMap:
+    """
+    The latest patch of each edited cell, stored by column.
+
+    The map also keeps a log of the order in which patches were added, so that a
+    patched data frame can be brought up to date by applying only the patches that were
+    added since it was last patched.
+
+    Adding patches with `.with_patches()` returns a new map (so that setting it in a
+    `reactive.Value` is seen as a change) that shares its storage with the old map; only
+    the newest map should be used afterwards.
+    """
+
+    # Once the log is this much longer than the number of patched cells, it is dropped
+    _max_log_ratio = 4
+
+    def __init__(self, patches: Iterable[CellPatch] = ()) -> None:
+        self._columns: Dict[int, Dict[int, CellPatch]] = {}
+        self._n_cells = 0
+        self._log: List[CellPatch] = []
+        # The version of the first patch in the log
+        self._log_start = 0
+        self._add(patches)
+        self.version = self._log_start + len(self._log)
+
+    def with_patches(self, patches: Iterable[CellPatch]) -> CellPatchMap:
+        new = CellPatchMap.__new__(CellPatchMap)
+        new._columns = self._columns
+        new._log = self._log
+        new._log_start = self._log_start
+        new._n_cells = self._n_cells
+        new._add(patches)
+        new.version = new._log_start + len(new._log)
+        return new
+
+    def _add(self, patches: Iterable[CellPatch]) -> None:
+        for patch in patches:
+            col = self._columns.setdefault(patch["column_index"], {})
+            if patch["row_index"] not in col:
+                self._n_cells += 1
+            col[patch["row_index"]] = patch
+            self._log.append(patch)
+
+        if len(self._log) > self._max_log_ratio * self._n_cells + 1000:
+            self._log_start += len(self._log)
+            self._log.clear()
+
+    def shares_storage(self, other: CellPatchMap) -> bool:
+        """Whether `other` is an earlier (or later) version of this map."""
+        return self._columns is other._columns
+
+    def patches_since(self, version: int) -> Optional[List[CellPatch]]:
+        """
+        The patches that were added after `version`, in order, or `None` if they are no
+        longer known.
+        """
+        if version < self._log_start:
+            return None
+        return self._log[version - self._log_start : self.version - self._log_start]
+
+    def patches(self) -> List[CellPatch]:
+        """The latest patch of each cell, by column and then by row."""
+        return [
+            patch
+            for col in sorted(self._columns)
+            for _, patch in sorted(self._columns[col].items())
+        ]
+
+    def __len__(self) -> int:
+        return self._n_cells
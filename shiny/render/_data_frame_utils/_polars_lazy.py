@@ -0,0 +1,104 @@
+"""
+Data frame backend for polars `LazyFrame`s.
+
+Like DuckDB relations, lazy frames stay lazy: subsetting and patching extend the query
+plan, and rows are only collected when they are serialized (or when a cell is read). A
+column of a lazy frame is a lazy frame with a single column.
+
+Rendering a data frame serializes all of its rows, since the browser sorts and filters
+the complete data, so the whole (patched) frame is collected then. Only the frames that
+are derived from it, such as the data view, limit the rows that are collected.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, List, Tuple
+
+from ._patch import patches_by_column
+from ._types import CellPatch, ColsList, RowsList
+
+if TYPE_CHECKING:
+    import polars as pl
+
+# The (zero-based) row number, in the order that the frame produces the rows
+_ROW = "__shiny_row__"
+
+
+def frame_column_names_pl_lazy(data: "pl.LazyFrame") -> List[str]:
+    # Resolving the schema doesn't run the query
+    return data.collect_schema().names()
+
+
+def frame_columns_pl_lazy(data: "pl.LazyFrame") -> List["pl.LazyFrame"]:
+    return [data.select(name) for name in frame_column_names_pl_lazy(data)]
+
+
+def frame_shape_pl_lazy(data: "pl.LazyFrame") -> Tuple[int, ...]:
+    import polars as pl
+
+    # Only the rows are counted (which, e.g., for Parquet files, reads no data)
+    nrow = data.select(pl.len()).collect().item()
+    return (nrow, len(frame_column_names_pl_lazy(data)))
+
+
+def subset_frame_pl_lazy(
+    data: "pl.LazyFrame",
+    *,
+    rows: RowsList = None,
+    cols: ColsList = None,
+) -> "pl.LazyFrame":
+    import polars as pl
+
+    if cols is not None:
+        names = frame_column_names_pl_lazy(data)
+        data = data.select(
+            [col if isinstance(col, str) else names[col] for col in cols]
+        )
+    if rows is None:
+        return data
+
+    rows = [int(row) for row in rows]
+    if len(rows) == 0:
+        return data.head(0)
+    if rows == list(range(rows[0], rows[0] + len(rows))):
+        # A contiguous window of rows, which polars can push down into the scan
+        return data.slice(rows[0], len(rows))
+
+    # Keep the rows in the requested order
+    return data.select(pl.all().gather(rows))
+
+
+def get_frame_cell_pl_lazy(data: "pl.LazyFrame", row: int, col: int) -> Any:
+    import polars as pl
+
+    res = data.slice(row, 1).select(pl.nth(col)).collect()
+    if res.height == 0:
+        raise IndexError(f"Row {row} is out of bounds")
+    return res.item()
+
+
+def apply_frame_patches_pl_lazy(
+    data: "pl.LazyFrame",
+    patches: List[CellPatch],
+) -> "pl.LazyFrame":
+    import polars as pl
+
+    if len(patches) == 0:
+        return data
+
+    schema = data.collect_schema()
+    names = schema.names()
+    replacements = [
+        # Look up the row number among the patched rows, keeping the other values
+        pl.col(_ROW)
+        .replace_strict(
+            rows,
+            values,
+            default=pl.col(names[col]),
+            return_dtype=schema[names[col]],
+        )
+        .alias(names[col])
+        for col, (rows, values) in patches_by_column(patches).items()
+    ]
+
+    return data.with_row_index(_ROW).with_columns(replacements).drop(_ROW)
@@ -1,10 +1,26 @@
 from __future__ import annotations
 
-from typing import Callable, List
+import sys
+from typing import TYPE_CHECKING, Any, Callable, List
 
 from ...types import ListOrTuple
-from ._tbl_data import frame_column_names
-from ._types import BrowserStyleInfo, DataFrameLikeT, StyleInfo
+from ._tbl_data import frame_column_names, frame_shape, subset_frame__typed
+from ._types import (
+    BrowserStyleInfo,
+    DataFrameLike,
+    DataFrameLikeT,
+    PdDataFrame,
+    PdSeries,
+    PlDataFrame,
+    PlExpr,
+    PlLazyFrame,
+    PlSeries,
+    StyleInfo,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
 
 StyleFn = Callable[[DataFrameLikeT], List["StyleInfo"]]
 
@@ -14,6 +30,7 @@ def style_info_to_browser_style_info(
     *,
     nrow: int,
     browser_column_names: ListOrTuple[str],
+    data: DataFrameLike | None = None,
 ) -> BrowserStyleInfo | None:
     if not isinstance(info, dict):
         raise TypeError("`StyleInfo` objects must be a dictionary. Received: ", info)
@@ -27,7 +44,7 @@ def style_info_to_browser_style_info(
             f"`StyleInfo` `location` value must be 'body', not '{location}'"
         )
 
-    rows = style_info_rows(info, nrow=nrow)
+    rows = style_info_rows(info, nrow=nrow, data=data)
     cols = style_info_cols(info, browser_column_names=browser_column_names)
 
     style = info.get("style", None)
@@ -82,16 +99,16 @@ def style_info_cols(
 
     if isinstance(cols[0], str):
         ret: list[int] = []
-        col_names = set(browser_column_names)
+        col_indices = {name: i for i, name in enumerate(browser_column_names)}
         for col in cols:
             assert isinstance(
                 col, str
             ), "All elements of `StyleInfo` `cols` must be of the same type: str, int, or bool."
-            if col not in col_names:
+            if col not in col_indices:
                 raise ValueError(
                     f"`StyleInfo` `cols` value '{col}' not found in data frame column names"
                 )
-            ret.append(browser_column_names.index(col))
+            ret.append(col_indices[col])
         return tuple(ret)
     elif isinstance(cols[0], int):
         ret: list[int] = []
@@ -123,12 +140,28 @@ def style_info_rows(
     info: StyleInfo,
     *,
     nrow: int,
+    data: DataFrameLike | None = None,
 ) -> None | tuple[int, ...]:
     rows = info.get("rows", None)
     if rows is None:
         return None
     if isinstance(rows, (bool, int)):
         return (rows,)
+
+    arr = _as_row_array(rows, data=data)
+    if arr is not None:
+        if arr.dtype.kind == "b":
+            if len(arr) != nrow:
+                raise ValueError(
+                    f"Length of `StyleInfo` `rows` must match the number of rows in the data frame when `rows` is a boolean array. Expected {nrow}, got {len(arr)}"
+                )
+            return _mask_rows(arr)
+        if arr.dtype.kind in ("i", "u"):
+            return tuple(arr.tolist())
+        raise TypeError(
+            f"`StyleInfo` `rows` array must contain booleans or integers, not {arr.dtype}"
+        )
+
     if not isinstance(rows, (list, tuple)):
         raise TypeError("`StyleInfo` `rows` value must be a list, tuple, int or string")
 
@@ -142,8 +175,7 @@ def style_info_rows(
         ), "Length of `StyleInfo` `rows` must match the number of rows in the data frame when `rows` is a boolean list / tuple."
         if all(isinstance(row, bool) for row in rows_tup):
             # Turn into a tuple of indices
-            ret = tuple(i for i, val in enumerate(rows_tup) if val)
-            return ret
+            return tuple(i for i, val in enumerate(rows_tup) if val)
 
         raise TypeError(
             "All elements of `StyleInfo` `rows` must be of the same type: bool or int."
@@ -162,6 +194,46 @@ def style_info_rows(
         )
 
 
+def _as_row_array(rows: Any, *, data: DataFrameLike | None) -> npt.NDArray[Any] | None:
+    # Returns `None` if `rows` isn't a vector type
+    if isinstance(rows, PlExpr):
+        if isinstance(data, PlLazyFrame):
+            rows = data.select(rows).collect().to_series()
+        elif isinstance(data, PlDataFrame):
+            rows = data.select(rows).to_series()
+        else:
+            raise TypeError(
+                "`StyleInfo` `rows` can only be a polars expression for polars data frames"
+            )
+
+    if isinstance(rows, PlSeries):
+        import polars as pl
+
+        if rows.dtype == pl.Boolean:
+            rows = rows.fill_null(False)
+        return rows.to_numpy()
+    if isinstance(rows, PdSeries):
+        import pandas as pd
+
+        if pd.api.types.is_bool_dtype(rows.dtype) or (
+            rows.dtype == object and pd.api.types.infer_dtype(rows) == "boolean"
+        ):
+            return rows.to_numpy(dtype=bool, na_value=False)
+        return rows.to_numpy()
+    if "numpy" in sys.modules:
+        import numpy as np
+
+        if isinstance(rows, np.ndarray):
+            return rows
+    return None
+
+
+def _mask_rows(mask: npt.NDArray[np.bool_]) -> tuple[int, ...]:
+    import numpy as np
+
+    return tuple(np.flatnonzero(mask).tolist())
+
+
 def as_style_infos(
     infos: StyleInfo | list[StyleInfo] | StyleFn[DataFrameLikeT] | None,
 ) -> list[StyleInfo] | StyleFn[DataFrameLikeT]:
@@ -195,14 +267,70 @@ def as_browser_style_infos(
 
     if not isinstance(style_infos, list):
         style_infos = [style_infos]
-    nrow = data.shape[0]
+    nrow = frame_shape(data)[0]
 
     browser_infos = [
         style_info_to_browser_style_info(
             info,
             nrow=nrow,
             browser_column_names=browser_column_names,
+            data=data,
         )
         for info in style_infos
     ]
     return [browser_info for browser_info in browser_infos if browser_info is not None]
+
+
+def update_browser_style_infos(
+    browser_infos: list[BrowserStyleInfo],
+    infos: StyleFn[DataFrameLikeT],
+    *,
+    data: DataFrameLikeT,
+    rows: ListOrTuple[int],
+) -> list[BrowserStyleInfo]:
+    """
+    Re-evaluate a row-wise style function for some of the rows of the data.
+
+    The style function is only called with the given rows. Their new styles replace
+    their previous styles in `browser_infos`, while the styles of the other rows are
+    kept.
+    """
+    rows = sorted(set(rows))
+    if len(rows) == 0:
+        return list(browser_infos)
+
+    updated_rows = set(rows)
+    subset = subset_frame__typed(data, rows=rows)
+    if isinstance(subset, PdDataFrame):
+        # Style rows are positions, which a style function may find from the index
+        # labels (e.g., `df.index[df["x"] > 0]`), so give the subset a default index, as
+        # the labels of the data's rows would otherwise be read as subset positions
+        subset = subset.reset_index(drop=True)
+    new_infos = as_browser_style_infos(infos, data=subset)
+
+    ret: list[BrowserStyleInfo] = []
+    for info in browser_infos:
+        if info["rows"] is None and info in new_infos:
+            # The style still applies to all of the rows
+            new_infos.remove(info)
+            ret.append(info)
+            continue
+        info_rows = tuple(
+            row
+            for row in (
+                range(frame_shape(data)[0]) if info["rows"] is None else info["rows"]
+            )
+            if row not in updated_rows
+        )
+        if len(info_rows) > 0:
+            ret.append({**info, "rows": info_rows})
+
+    # Map the row positions within the subset back to the rows of the data
+    for info in new_infos:
+        if info["rows"] is None:
+            info_rows = tuple(rows)
+        else:
+            info_rows = tuple(rows[i] for i in info["rows"] if 0 <= i < len(rows))
+        if len(info_rows) > 0:
+            ret.append({**info, "rows": info_rows})
+    return ret
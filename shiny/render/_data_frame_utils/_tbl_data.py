@@ -7,9 +7,11 @@ from typing import Any, List, Tuple, cast
 
 from htmltools import TagNode
 
+from ... import _json
 from ..._typing_extensions import TypeIs
 from ...session import require_active_session
 from ._html import maybe_as_cell_html
+from ._patch import patches_by_column
 
 # from ...types import Jsonifiable
 from ._types import (
@@ -17,13 +19,17 @@ from ._types import (
     ColsList,
     DataFrameLike,
     DataFrameLikeT,
+    DuckDBRelation,
     FrameDtype,
     FrameJson,
     ListSeriesLike,
+    PaChunkedArray,
     PandasCompatible,
+    PaTable,
     PdDataFrame,
     PdSeries,
     PlDataFrame,
+    PlLazyFrame,
     PlSeries,
     RowsList,
     SeriesLike,
@@ -36,6 +42,7 @@ __all__ = (
     "apply_frame_patches",
     "serialize_dtype",
     "serialize_frame",
+    "serialize_frame_json",
     "subset_frame",
     "get_frame_cell",
     "frame_shape",
@@ -89,7 +96,9 @@ def as_data_frame_like(
 def is_data_frame_like(
     data: DataFrameLikeT | object,
 ) -> TypeIs[DataFrameLikeT]:
-    if isinstance(data, (PdDataFrame, PlDataFrame)):
+    if isinstance(
+        data, (PdDataFrame, PlDataFrame, PlLazyFrame, PaTable, DuckDBRelation)
+    ):
         return True
 
     return False
@@ -114,6 +123,25 @@ def _(data: PlDataFrame) -> ListSeriesLike:
     return data.get_columns()
 
 
+@frame_columns.register
+def _(data: PlLazyFrame) -> ListSeriesLike:
+    from ._polars_lazy import frame_columns_pl_lazy
+
+    return frame_columns_pl_lazy(data)
+
+
+@frame_columns.register
+def _(data: PaTable) -> ListSeriesLike:
+    return data.columns
+
+
+@frame_columns.register
+def _(data: DuckDBRelation) -> ListSeriesLike:
+    from ._duckdb import frame_columns_duckdb
+
+    return frame_columns_duckdb(data)
+
+
 # apply_frame_patches --------------------------------------------------------------------
 
 
@@ -138,13 +166,10 @@ def _(data: PdDataFrame, patches: List[CellPatch]) -> PdDataFrame:
     # Enable copy-on-write mode for the data;
     # Use `deep=False` to avoid copying the full data; CoW will copy the necessary data when modified
     with pd.option_context("mode.copy_on_write", True):
-        # Apply patches!
+        # Apply patches, one column at a time
         data = data.copy(deep=False)
-        for cell_patch in patches:
-            data.iat[  # pyright: ignore[reportUnknownMemberType]
-                cell_patch["row_index"],
-                cell_patch["column_index"],
-            ] = cell_patch["value"]
+        for col, (rows, values) in patches_by_column(patches).items():
+            data.iloc[rows, col] = values  # pyright: ignore[reportArgumentType]
 
         return data
 
@@ -152,12 +177,62 @@ def _(data: PdDataFrame, patches: List[CellPatch]) -> PdDataFrame:
 @apply_frame_patches.register
 def _(data: PlDataFrame, patches: List[CellPatch]) -> PlDataFrame:
     data = data.clone()
-    for cell_patch in patches:
-        data[cell_patch["row_index"], cell_patch["column_index"]] = cell_patch["value"]
+    for col, (rows, values) in patches_by_column(patches).items():
+        # Only the patched columns are copied
+        series = data.to_series(col).clone()
+        series.scatter(rows, values)
+        data.replace_column(col, series)
 
     return data
 
 
+@apply_frame_patches.register
+def _(data: PlLazyFrame, patches: List[CellPatch]) -> PlLazyFrame:
+    from ._polars_lazy import apply_frame_patches_pl_lazy
+
+    return apply_frame_patches_pl_lazy(data, patches)
+
+
+@apply_frame_patches.register
+def _(data: PaTable, patches: List[CellPatch]) -> PaTable:
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    for col, (rows, values) in patches_by_column(patches).items():
+        field = data.schema.field(col)
+        column = data.column(col).combine_chunks()
+        # The replacements must be in row order
+        rows_values = sorted(zip(rows, values), key=lambda x: x[0])
+        mask = np.zeros(data.num_rows, dtype=bool)
+        mask[rows] = True
+        try:
+            new_column = pc.replace_with_mask(
+                column,
+                pa.array(mask),
+                pa.array([value for _, value in rows_values], type=field.type),
+            )
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            # The new values don't fit the column's type (e.g., a string in a numeric
+            # column), so fall back to a string column
+            new_values = column.to_pylist()
+            for row, value in rows_values:
+                new_values[row] = value
+            new_column = pa.array(
+                [None if value is None else str(value) for value in new_values]
+            )
+        data = data.set_column(col, field.name, new_column)
+
+    return data
+
+
+@apply_frame_patches.register
+def _(data: DuckDBRelation, patches: List[CellPatch]) -> DuckDBRelation:
+    from ._duckdb import apply_frame_patches_duckdb
+
+    return apply_frame_patches_duckdb(data, patches)
+
+
 # serialize_dtype ----------------------------------------------------------------------
 
 
@@ -185,10 +260,8 @@ def _(col: PlSeries) -> FrameDtype:
     from ._html import col_contains_shiny_html
 
     if col.dtype.is_(pl.String):
-        if col_contains_shiny_html(col):
-            type_ = "html"
-        else:
-            type_ = "string"
+        # polars stores `HTML` strings as plain strings, so they can't be detected
+        type_ = "string"
     elif col.dtype.is_numeric():
         type_ = "numeric"
 
@@ -203,6 +276,51 @@ def _(col: PlSeries) -> FrameDtype:
     return {"type": type_}
 
 
+@serialize_dtype.register
+def _(col: PlLazyFrame) -> FrameDtype:
+    import polars as pl
+
+    dtype = col.collect_schema().dtypes()[0]
+    if dtype == pl.String:
+        return {"type": "string"}
+    if dtype.is_numeric():
+        return {"type": "numeric"}
+    if dtype == pl.Categorical or dtype == pl.Object:
+        # The categories, and whether objects are HTML, depend on the values
+        return serialize_dtype(col.collect().to_series())
+    return {"type": "unknown"}
+
+
+@serialize_dtype.register
+def _(col: PaChunkedArray) -> FrameDtype:
+    import pyarrow as pa
+
+    t = col.type
+    if pa.types.is_string(t) or pa.types.is_large_string(t):
+        return {"type": "string"}
+    if pa.types.is_integer(t) or pa.types.is_floating(t) or pa.types.is_decimal(t):
+        return {"type": "numeric"}
+    if pa.types.is_dictionary(t):
+        chunks = col.unify_dictionaries().chunks
+        categories = [] if len(chunks) == 0 else chunks[0].dictionary.to_pylist()
+        return {
+            "type": "categorical",
+            "categories": [str(x) for x in categories],
+        }
+    if pa.types.is_timestamp(t) or pa.types.is_date(t):
+        return {"type": "datetime"}
+    if pa.types.is_duration(t):
+        return {"type": "timedelta"}
+    return {"type": "unknown"}
+
+
+@serialize_dtype.register
+def _(col: DuckDBRelation) -> FrameDtype:
+    from ._duckdb import serialize_dtype_duckdb
+
+    return serialize_dtype_duckdb(col)
+
+
 # serialize_frame ----------------------------------------------------------------------
 
 
@@ -220,8 +338,6 @@ def _(data: PdDataFrame) -> FrameJson:
 
 @serialize_frame.register
 def _(data: PlDataFrame) -> FrameJson:
-    import json
-
     type_hints = list(map(serialize_dtype, data))
     data_by_row = list(map(list, data.rows()))
 
@@ -239,7 +355,7 @@ def _(data: PlDataFrame) -> FrameJson:
             for row in data_by_row:
                 row[html_column] = wrap_shiny_html_with_session(row[html_column])
 
-    data_val = json.loads(json.dumps(data_by_row, default=str))
+    data_val = _json.loads(_json.dumps(data_by_row, default=str))
 
     return {
         # "index": list(range(len(data))),
@@ -249,6 +365,151 @@ def _(data: PlDataFrame) -> FrameJson:
     }
 
 
+@serialize_frame.register
+def _(data: PlLazyFrame) -> FrameJson:
+    # Only now are the rows collected
+    return serialize_frame(data.collect())
+
+
+@serialize_frame.register
+def _(data: PaTable) -> FrameJson:
+    data_by_row = list(map(list, _rows_pa(data)))
+
+    return {
+        "columns": data.column_names,
+        "data": _json.loads(_json.dumps(data_by_row, default=str)),
+        "typeHints": list(map(serialize_dtype, data.columns)),
+    }
+
+
+@serialize_frame.register
+def _(data: DuckDBRelation) -> FrameJson:
+    # Only now are the rows fetched
+    data_by_row = data.fetchall()
+
+    return {
+        "columns": data.columns,
+        "data": _json.loads(_json.dumps(data_by_row, default=str)),
+        "typeHints": list(map(serialize_dtype, frame_columns(data))),
+    }
+
+
+# serialize_frame_json -----------------------------------------------------------------
+
+
+@singledispatch
+def serialize_frame_json(data: DataFrameLike) -> FrameJson:
+    """
+    Serialize a data frame for sending to the browser.
+
+    Unlike `serialize_frame()`, the rows are encoded as JSON text once (and wrapped in
+    `RawJson`), rather than as a Python object for every cell, which the session would
+    then need to encode again.
+    """
+    raise TypeError(f"Unsupported type: {type(data)}")
+
+
+@serialize_frame_json.register
+def _(data: PdDataFrame) -> FrameJson:
+    from ._pandas import serialize_frame_json_pd
+
+    return serialize_frame_json_pd(data)
+
+
+@serialize_frame_json.register
+def _(data: PlDataFrame) -> FrameJson:
+    type_hints = list(map(serialize_dtype, data))
+    type_hints_type = [type_hint["type"] for type_hint in type_hints]
+
+    if "html" in type_hints_type:
+        session = require_active_session(None)
+        html_columns = [i for i, x in enumerate(type_hints_type) if x == "html"]
+        rows: Any = list(map(list, data.rows()))
+        for row in rows:
+            for html_column in html_columns:
+                row[html_column] = maybe_as_cell_html(row[html_column], session=session)
+    elif _is_numpy_serializable_pl(data):
+        # Encoded straight from the array's memory (with orjson)
+        rows = data.to_numpy(order="c")
+    else:
+        rows = data.rows()
+
+    return {
+        "columns": data.columns,
+        "data": cast(Any, _json.RawJson(_json.dumps(rows, default=_default_str))),
+        "typeHints": type_hints,
+    }
+
+
+@serialize_frame_json.register
+def _(data: PlLazyFrame) -> FrameJson:
+    return serialize_frame_json(data.collect())
+
+
+@serialize_frame_json.register
+def _(data: PaTable) -> FrameJson:
+    if _is_numpy_serializable_pa(data):
+        import numpy as np
+
+        rows: Any = np.column_stack([col.to_numpy() for col in data.columns])
+    else:
+        rows = _rows_pa(data)
+
+    return {
+        "columns": data.column_names,
+        "data": cast(Any, _json.RawJson(_json.dumps(rows, default=_default_str))),
+        "typeHints": list(map(serialize_dtype, data.columns)),
+    }
+
+
+@serialize_frame_json.register
+def _(data: DuckDBRelation) -> FrameJson:
+    data_by_row = data.fetchall()
+
+    return {
+        "columns": data.columns,
+        "data": cast(
+            Any, _json.RawJson(_json.dumps(data_by_row, default=_default_str))
+        ),
+        "typeHints": list(map(serialize_dtype, frame_columns(data))),
+    }
+
+
+def _is_numpy_serializable_pl(data: PlDataFrame) -> bool:
+    # Columns without nulls that turn into a single numeric array without changing how
+    # any value is written: all floats, or integers of a single type.
+    dtypes = data.dtypes
+    if len(dtypes) == 0 or any(col.has_nulls() for col in data):
+        return False
+    if all(dtype.is_float() for dtype in dtypes):
+        return True
+    return dtypes[0].is_integer() and all(dtype == dtypes[0] for dtype in dtypes)
+
+
+def _is_numpy_serializable_pa(data: PaTable) -> bool:
+    import pyarrow as pa
+
+    types = data.schema.types
+    if len(types) == 0 or any(col.null_count > 0 for col in data.columns):
+        return False
+    if all(pa.types.is_floating(t) for t in types):
+        return True
+    return pa.types.is_integer(types[0]) and all(t == types[0] for t in types)
+
+
+def _rows_pa(data: PaTable) -> List[Tuple[Any, ...]]:
+    # Convert column by column, which is much faster than row by row
+    if data.num_columns == 0:
+        return [()] * data.num_rows
+    return list(zip(*(col.to_pylist() for col in data.columns)))
+
+
+def _default_str(x: Any) -> Any:
+    if type(x).__module__.split(".")[0] == "numpy" and hasattr(x, "tolist"):
+        return x.tolist()
+    return str(x)
+
+
 # subset_frame -------------------------------------------------------------------------
 def subset_frame__typed(
     data: DataFrameLikeT, *, rows: RowsList = None, cols: ColsList = None
@@ -324,6 +585,44 @@ def _(
     return data[indx_rows, indx_cols]
 
 
+@subset_frame.register
+def _(
+    data: PlLazyFrame,
+    *,
+    rows: RowsList = None,
+    cols: ColsList = None,
+) -> PlLazyFrame:
+    from ._polars_lazy import subset_frame_pl_lazy
+
+    return subset_frame_pl_lazy(data, rows=rows, cols=cols)
+
+
+@subset_frame.register
+def _(
+    data: PaTable,
+    *,
+    rows: RowsList = None,
+    cols: ColsList = None,
+) -> PaTable:
+    if cols is not None:
+        data = data.select(list(cols))
+    if rows is not None:
+        data = data.take(list(rows))
+    return data
+
+
+@subset_frame.register
+def _(
+    data: DuckDBRelation,
+    *,
+    rows: RowsList = None,
+    cols: ColsList = None,
+) -> DuckDBRelation:
+    from ._duckdb import subset_frame_duckdb
+
+    return subset_frame_duckdb(data, rows=rows, cols=cols)
+
+
 # get_frame_cell -----------------------------------------------------------------------
 
 
@@ -346,6 +645,25 @@ def _(data: PlDataFrame, row: int, col: int) -> Any:
     return data[row, col]
 
 
+@get_frame_cell.register
+def _(data: PlLazyFrame, row: int, col: int) -> Any:
+    from ._polars_lazy import get_frame_cell_pl_lazy
+
+    return get_frame_cell_pl_lazy(data, row, col)
+
+
+@get_frame_cell.register
+def _(data: PaTable, row: int, col: int) -> Any:
+    return data.column(col)[row].as_py()
+
+
+@get_frame_cell.register
+def _(data: DuckDBRelation, row: int, col: int) -> Any:
+    from ._duckdb import get_frame_cell_duckdb
+
+    return get_frame_cell_duckdb(data, row, col)
+
+
 # shape --------------------------------------------------------------------------------
 
 
@@ -364,6 +682,25 @@ def _(data: PlDataFrame) -> Tuple[int, ...]:
     return data.shape
 
 
+@frame_shape.register
+def _(data: PlLazyFrame) -> Tuple[int, ...]:
+    from ._polars_lazy import frame_shape_pl_lazy
+
+    return frame_shape_pl_lazy(data)
+
+
+@frame_shape.register
+def _(data: PaTable) -> Tuple[int, ...]:
+    return (data.num_rows, data.num_columns)
+
+
+@frame_shape.register
+def _(data: DuckDBRelation) -> Tuple[int, ...]:
+    from ._duckdb import frame_shape_duckdb
+
+    return frame_shape_duckdb(data)
+
+
 # copy_frame ---------------------------------------------------------------------------
 
 
@@ -382,6 +719,24 @@ def _(data: PlDataFrame) -> PlDataFrame:
     return data.clone()
 
 
+@copy_frame.register
+def _(data: PlLazyFrame) -> PlLazyFrame:
+    # Lazy frames are immutable
+    return data
+
+
+@copy_frame.register
+def _(data: PaTable) -> PaTable:
+    # Tables are immutable
+    return data
+
+
+@copy_frame.register
+def _(data: DuckDBRelation) -> DuckDBRelation:
+    # Relations are immutable
+    return data
+
+
 # column_names -------------------------------------------------------------------------
 @singledispatch
 def frame_column_names(data: DataFrameLike) -> List[str]:
@@ -396,3 +751,20 @@ def _(data: PdDataFrame) -> List[str]:
 @frame_column_names.register
 def _(data: PlDataFrame) -> List[str]:
     return data.columns
+
+
+@frame_column_names.register
+def _(data: PlLazyFrame) -> List[str]:
+    from ._polars_lazy import frame_column_names_pl_lazy
+
+    return frame_column_names_pl_lazy(data)
+
+
+@frame_column_names.register
+def _(data: PaTable) -> List[str]:
+    return data.column_names
+
+
+@frame_column_names.register
+def _(data: DuckDBRelation) -> List[str]:
+    return data.columns
@@ -25,19 +25,36 @@ from ._databackend import AbstractBackend
 # ---------------------------------------------------------------------
 
 if TYPE_CHECKING:
+    import duckdb
     import pandas as pd
     import polars as pl
+    import pyarrow as pa
 
     from ...session._utils import RenderedDeps
 
     PdDataFrame = pd.DataFrame
     PlDataFrame = pl.DataFrame
+    PlLazyFrame = pl.LazyFrame
+    PaTable = pa.Table
+    DuckDBRelation = duckdb.DuckDBPyRelation
     PdSeries = pd.Series[Any]
     PlSeries = pl.Series
-
-    ListSeriesLike = Union[List[PdSeries], List[PlSeries]]
-    SeriesLike = Union[PdSeries, PlSeries]
-    DataFrameLike = Union[PdDataFrame, PlDataFrame]
+    PaChunkedArray = pa.ChunkedArray
+    PlExpr = pl.Expr
+
+    # A column of a polars lazy frame or a DuckDB relation is a lazy frame or relation
+    # with a single column
+    ListSeriesLike = Union[
+        List[PdSeries],
+        List[PlSeries],
+        List[PlLazyFrame],
+        List[PaChunkedArray],
+        List[DuckDBRelation],
+    ]
+    SeriesLike = Union[PdSeries, PlSeries, PlLazyFrame, PaChunkedArray, DuckDBRelation]
+    DataFrameLike = Union[
+        PdDataFrame, PlDataFrame, PlLazyFrame, PaTable, DuckDBRelation
+    ]
 
 
 else:
@@ -48,12 +65,27 @@ else:
     class PlDataFrame(AbstractBackend):
         _backends = [("polars", "DataFrame")]
 
+    class PlLazyFrame(AbstractBackend):
+        _backends = [("polars", "LazyFrame")]
+
+    class PaTable(AbstractBackend):
+        _backends = [("pyarrow", "Table")]
+
+    class DuckDBRelation(AbstractBackend):
+        _backends = [("duckdb", "DuckDBPyRelation")]
+
     class PdSeries(AbstractBackend):
         _backends = [("pandas", "Series")]
 
     class PlSeries(AbstractBackend):
         _backends = [("polars", "Series")]
 
+    class PaChunkedArray(AbstractBackend):
+        _backends = [("pyarrow", "ChunkedArray")]
+
+    class PlExpr(AbstractBackend):
+        _backends = [("polars", "Expr")]
+
     class ListSeriesLike(ABC): ...
 
     class SeriesLike(ABC): ...
@@ -62,14 +94,25 @@ else:
 
     ListSeriesLike.register(PdSeries)
     ListSeriesLike.register(PlSeries)
+    ListSeriesLike.register(PlLazyFrame)
+    ListSeriesLike.register(PaChunkedArray)
+    ListSeriesLike.register(DuckDBRelation)
 
     SeriesLike.register(PdSeries)
     SeriesLike.register(PlSeries)
+    SeriesLike.register(PlLazyFrame)
+    SeriesLike.register(PaChunkedArray)
+    SeriesLike.register(DuckDBRelation)
 
     DataFrameLike.register(PdDataFrame)
     DataFrameLike.register(PlDataFrame)
+    DataFrameLike.register(PlLazyFrame)
+    DataFrameLike.register(PaTable)
+    DataFrameLike.register(DuckDBRelation)
 
-DataFrameLikeT = TypeVar("DataFrameLikeT", PdDataFrame, PlDataFrame)
+DataFrameLikeT = TypeVar(
+    "DataFrameLikeT", PdDataFrame, PlDataFrame, PlLazyFrame, PaTable, DuckDBRelation
+)
 
 # ---------------------------------------------------------------------
 
@@ -209,7 +252,11 @@ StyleInfoBody = TypedDict(
     "StyleInfoBody",
     {
         "location": NotRequired[Literal["body"]],
-        "rows": NotRequired[Union[int, ListOrTuple[int], ListOrTuple[bool], None]],
+        # Besides lists, `rows` can be a NumPy array, a pandas or polars Series, or a
+        # polars expression (for polars data frames) of row indices or booleans
+        "rows": NotRequired[
+            Union[int, ListOrTuple[int], ListOrTuple[bool], PlExpr, Any, None]
+        ],
         "cols": NotRequired[
             Union[str, int, ListOrTuple[str], ListOrTuple[int], ListOrTuple[bool], None]
         ],
@@ -7,7 +7,16 @@ import typing
 
 # `typing.Dict` sed for python 3.8 compatibility
 # Can use `dict` in python >= 3.9
-from typing import TYPE_CHECKING, Any, Callable, Literal, Optional, Union, cast
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Literal,
+    Optional,
+    Union,
+    cast,
+)
 
 from htmltools import Tag, TagAttrValue, TagChild
 
@@ -22,9 +31,13 @@ from .. import ui as _ui
 from .._docstring import add_example, no_example
 from .._namespaces import ResolvedId
 from .._typing_extensions import Self
+from ..cache import FileCache
+from ..reactive import isolate
+from ..reactive._equality import fingerprint
 from ..session import get_current_session, require_active_session
 from ..session._session import DownloadHandler, DownloadInfo
 from ..types import MISSING, MISSING_TYPE, ImgData
+from ._render_cache import RenderCache, RenderCacheArg, value_fn_id
 from ._try_render_plot import (
     PlotSizeInfo,
     try_render_matplotlib,
@@ -201,6 +214,20 @@ class plot(Renderer[object]):
         determined by the size of the corresponding :func:`~shiny.ui.output_plot`. (You
         should not need to use this argument in most Shiny apps--set the desired height
         on :func:`~shiny.ui.output_plot` instead.)
+    cache
+        Where to cache rendered images, so that they can be reused by other sessions
+        (and by the same session, e.g., when the browser window is resized back to a
+        previous size). Use ``"app"`` for the app's cache (:attr:`shiny.App.cache`), or
+        pass a :class:`~shiny.cache.Cache` object such as
+        :class:`~shiny.cache.MemoryCache` or :class:`~shiny.cache.DiskCache`. Must be
+        used with ``cache_key``.
+    cache_key
+        A function that returns the cache key, e.g., ``lambda: (input.x(), input.y())``.
+        The plot's size and the browser's pixel ratio are automatically added to the
+        key. When the plot is cached, it only takes reactive dependencies on what the
+        cache key reads (and on the plot size): the decorated function itself runs
+        isolated, so every reactive value that affects the plot must be part of the
+        key.
     **kwargs
         Additional keyword arguments passed to the relevant method for saving the image
         (e.g., for matplotlib, arguments to ``savefig()``; for PIL and plotnine,
@@ -260,6 +287,8 @@ class plot(Renderer[object]):
         alt: Optional[str] = None,
         width: float | None | MISSING_TYPE = MISSING,
         height: float | None | MISSING_TYPE = MISSING,
+        cache: RenderCacheArg = None,
+        cache_key: Optional[Callable[[], object]] = None,
         **kwargs: object,
     ) -> None:
         super().__init__(_fn)
@@ -267,6 +296,9 @@ class plot(Renderer[object]):
         self.width = width
         self.height = height
         self.kwargs = kwargs
+        self._render_cache: RenderCache | None = None
+        if cache is not None or cache_key is not None:
+            self._render_cache = RenderCache(self, cache, cache_key)
 
     async def render(self) -> dict[str, Jsonifiable] | Jsonifiable | None:
         is_userfn_async = self.fn.is_async()
@@ -302,14 +334,56 @@ class plot(Renderer[object]):
             cast(Union[float, None], width) if width is not MISSING else None,
             cast(Union[float, None], height) if height is not MISSING else None,
         )
-        plot_size_info = PlotSizeInfo(
-            container_size_px_fn=(
-                lambda: container_size("width"),
-                lambda: container_size("height"),
+
+        if self._render_cache is None:
+            plot_size_info = PlotSizeInfo(
+                container_size_px_fn=(
+                    lambda: container_size("width"),
+                    lambda: container_size("height"),
+                ),
+                user_specified_size_px=non_missing_size,
+                pixelratio=pixelratio,
+            )
+            return await self._render_plot(plot_size_info, is_userfn_async)
+
+        # When caching, the size must be part of the key, so read the container size up
+        # front (for each dimension that the user didn't specify). This means that a
+        # plot whose figure sets its own size is still looked up again when the
+        # container is resized, but it won't be re-drawn.
+        size_px = (
+            (
+                non_missing_size[0]
+                if non_missing_size[0] is not None
+                else container_size("width")
+            ),
+            (
+                non_missing_size[1]
+                if non_missing_size[1] is not None
+                else container_size("height")
             ),
+        )
+        key = await self._render_cache.key(
+            size_px, pixelratio, non_missing_size, alt, repr(sorted(kwargs.items()))
+        )
+        cached = self._render_cache.get(key)
+        if not isinstance(cached, MISSING_TYPE):
+            return cached
+
+        plot_size_info = PlotSizeInfo(
+            container_size_px_fn=(lambda: size_px[0], lambda: size_px[1]),
             user_specified_size_px=non_missing_size,
             pixelratio=pixelratio,
         )
+        with isolate():
+            result = await self._render_plot(plot_size_info, is_userfn_async)
+        self._render_cache.set(key, result)
+        return result
+
+    async def _render_plot(
+        self, plot_size_info: PlotSizeInfo, is_userfn_async: bool
+    ) -> dict[str, Jsonifiable] | None:
+        alt = self.alt
+        kwargs = self.kwargs
 
         # Call the user function to get the plot object.
         x = await self.fn()
@@ -567,6 +641,21 @@ class ui(Renderer[TagChild]):
     This function is used to render HTML content, but it requires that the funciton
     returns the content, using Shiny Core syntax.
 
+    Parameters
+    ----------
+    cache
+        Where to cache the returned content, so that it can be reused by other sessions
+        (and by the same session, when it returns to a previous state). Use ``"app"``
+        for the app's cache (:attr:`shiny.App.cache`), or pass a
+        :class:`~shiny.cache.Cache` object such as :class:`~shiny.cache.MemoryCache` or
+        :class:`~shiny.cache.DiskCache`. Must be used with ``cache_key``. The content
+        must be picklable when using a disk cache.
+    cache_key
+        A function that returns the cache key, e.g., ``lambda: (input.x(), input.y())``.
+        When the content is cached, it only takes reactive dependencies on what the
+        cache key reads: the decorated function itself runs isolated, so every reactive
+        value that affects the content must be part of the key.
+
     Returns
     -------
     :
@@ -589,6 +678,35 @@ class ui(Renderer[TagChild]):
     def auto_output_ui(self) -> Tag:
         return _ui.output_ui(self.output_id)
 
+    def __init__(
+        self,
+        _fn: Optional[ValueFn[TagChild]] = None,
+        *,
+        cache: RenderCacheArg = None,
+        cache_key: Optional[Callable[[], object]] = None,
+    ) -> None:
+        super().__init__(_fn)
+        self._render_cache: RenderCache | None = None
+        if cache is not None or cache_key is not None:
+            self._render_cache = RenderCache(self, cache, cache_key)
+
+    async def render(self) -> Jsonifiable:
+        if self._render_cache is None:
+            return await super().render()
+
+        # The content (not the rendered HTML) is cached, because its HTML dependencies
+        # still need to be registered with each session's app.
+        key = await self._render_cache.key()
+        value = self._render_cache.get(key)
+        if isinstance(value, MISSING_TYPE):
+            with isolate():
+                value = await self.fn()
+            self._render_cache.set(key, value)
+
+        if value is None:
+            return None
+        return await self.transform(value)
+
     async def transform(self, value: TagChild) -> Jsonifiable:
         session = require_active_session(None)
         return rendered_deps_to_jsonifiable(
@@ -631,6 +749,31 @@ class download(Renderer[str]):
         The encoding of the download.
     label
         (Express only) A label for the button. Defaults to "Download".
+    run_in_thread
+        Whether to call a sync function, and iterate over the chunks that it yields, in
+        a worker thread, so that building a large download doesn't hold up the app's
+        other sessions. The chunks are sent in batches of at least 64 KB, and the next
+        batch is built while the previous one is sent. The function can read reactive
+        values (e.g., inputs), but must not set them.
+    gzip
+        Whether to compress the download with gzip while it's sent, for clients that
+        accept it. This is worthwhile for large text formats (e.g., CSV), but not for
+        formats that are already compressed (e.g., images or Excel files).
+    cache
+        Where to store the generated file, so that it can be downloaded again (by any
+        session) without calling the function again. Use ``"app"`` for the app's file
+        cache (:attr:`shiny.App.download_cache`), or pass a
+        :class:`~shiny.cache.FileCache`. Must be used with ``cache_key`` and
+        ``filename``.
+    cache_key
+        A function that returns the cache key, e.g., ``lambda: (input.year(),
+        data_version())``. Downloads with the same key get the same file, so every
+        value that affects the file must be part of the key.
+
+    Files (when the function returns a path, or when they are cached) are sent with
+    their size, and support requests for a range of bytes (unless they are
+    compressed), so that interrupted downloads can be resumed. Cached files are also
+    sent with an ``ETag``, so that the browser can check whether its copy is current.
 
     Returns
     -------
@@ -657,13 +800,26 @@ class download(Renderer[str]):
         media_type: None | str | Callable[[], str] = None,
         encoding: str = "utf-8",
         label: TagChild = "Download",
+        run_in_thread: bool = False,
+        gzip: bool = False,
+        cache: Union[Literal["app"], FileCache, None] = None,
+        cache_key: Optional[Callable[[], object]] = None,
     ) -> None:
         super().__init__()
 
+        if (cache is None) != (cache_key is None):
+            raise TypeError("`cache` and `cache_key` must be used together.")
+        if cache is not None and filename is None:
+            raise TypeError("Cached downloads must have a `filename`.")
+
         self.filename = filename
         self.media_type = media_type
         self.encoding = encoding
         self.label = label
+        self.run_in_thread = run_in_thread
+        self.gzip = gzip
+        self.cache: Union[Literal["app"], FileCache, None] = cache
+        self.cache_key: Optional[Callable[[], object]] = cache_key
 
         if fn is not None:
             self(fn)
@@ -710,9 +866,33 @@ class download(Renderer[str]):
                 content_type=self.media_type,
                 handler=fn,
                 encoding=self.encoding,
+                run_in_thread=self.run_in_thread,
+                gzip=self.gzip,
+                cache=self.cache,
+                cache_key=None if self.cache_key is None else self._file_key(fn),
             )
 
         return self
 
+    def _file_key(self, fn: DownloadHandler) -> Callable[[], Awaitable[str]]:
+        cache_key = self.cache_key
+        assert cache_key is not None
+
+        async def file_key() -> str:
+            if _utils.is_async_callable(cache_key):
+                key_value = await cache_key()
+            else:
+                key_value = cache_key()
+
+            key_hash = fingerprint(key_value)
+            if key_hash is None:
+                raise TypeError(
+                    f"The `cache_key` of `{self.output_id}` returned a value that "
+                    "can't be hashed; it must return a picklable value."
+                )
+            return value_fn_id(self, fn) + ":" + key_hash
+
+        return file_key
+
     async def transform(self, value: str) -> Jsonifiable:
         return value
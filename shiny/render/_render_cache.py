@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, Literal, Optional, Union, cast
+
+from .._utils import is_async_callable
+from ..reactive._equality import fingerprint
+from ..session import require_active_session
+from ..types import MISSING_TYPE
+
+if TYPE_CHECKING:
+    from ..cache import Cache
+    from .renderer import Renderer
+
+RenderCacheArg = Union[Literal["app"], "Cache", None]
+
+
+class RenderCache:
+    """
+    Stores the results of a renderer in a :class:`~shiny.cache.Cache`, so that they can
+    be reused by other sessions (and by the same session, when it returns to a previous
+    state).
+
+    A cache entry is keyed by the renderer's value function, the value returned by the
+    app-supplied ``cache_key`` function, and any extra values that the renderer itself
+    adds (e.g., the plot size).
+    """
+
+    def __init__(
+        self,
+        renderer: Renderer[Any],
+        cache: RenderCacheArg,
+        cache_key: Optional[Callable[[], object]],
+    ) -> None:
+        if cache is None or cache_key is None:
+            raise TypeError("`cache` and `cache_key` must be used together.")
+        self._renderer = renderer
+        self._cache: RenderCacheArg = cache
+        self._cache_key: Callable[[], object] = cache_key
+
+    async def key(self, *extra: object) -> str:
+        """
+        Compute the cache key. This takes reactive dependencies on whatever the
+        app-supplied ``cache_key`` function reads.
+        """
+        if is_async_callable(self._cache_key):
+            key_value = await self._cache_key()
+        else:
+            key_value = self._cache_key()
+
+        key_hash = fingerprint((key_value, extra))
+        if key_hash is None:
+            raise TypeError(
+                f"The `cache_key` of `{self._renderer.output_id}` returned a value that "
+                "can't be hashed; it must return a picklable value."
+            )
+        return self._renderer_id() + ":" + key_hash
+
+    def get(self, key: str) -> Any | MISSING_TYPE:
+        return self._resolve_cache().get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        self._resolve_cache().set(key, value)
+
+    def _renderer_id(self) -> str:
+        return value_fn_id(self._renderer, self._renderer.fn._orig_fn)
+
+    def _resolve_cache(self) -> Cache:
+        if self._cache != "app":
+            return cast("Cache", self._cache)
+        return require_active_session(None).app.cache
+
+
+def value_fn_id(renderer: Renderer[Any], fn: Callable[..., object]) -> str:
+    # Identify the value function by where it is defined, rather than by the output ID,
+    # so that the same function can share cache entries across sessions and modules,
+    # but two functions in different places never do.
+    code = getattr(fn, "__code__", None)
+    return "render.{}:{}.{}:{}".format(
+        type(renderer).__name__,
+        getattr(fn, "__module__", ""),
+        getattr(fn, "__qualname__", renderer.__name__),
+        getattr(code, "co_firstlineno", ""),
+    )
@@ -0,0 +1,485 @@
+"""
+Responses for `@render.download` handlers.
+
+Sync handlers (and the sync iterators that they return) can run in a worker thread, so
+that building a large download doesn't hold up the event loop. The iterator's chunks
+are then combined into batches of at least `DOWNLOAD_CHUNK_SIZE` bytes (each batch is
+one trip to the thread), and the next batch is built while the previous one is sent.
+Since a batch is only sent when the client has received the one before it, a slow
+client slows down the handler, instead of the chunks piling up in memory.
+
+Files (handlers that return a path) are served with their `Content-Length`, and
+support single byte `Range` requests, for resumable downloads. A complete file is sent
+with a `FileResponse`, so that the server can send it without reading it into Python
+(e.g., with `sendfile`); only ranges and compressed files are read in chunks.
+
+Cached downloads are generated once per key and stored in a `FileCache`, from which
+they are served as files (to any session). A cached file is opened as soon as it's
+found, so that it can still be sent if another session evicts it in the meantime.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import os
+import tempfile
+import weakref
+import zlib
+from email.utils import formatdate
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from .._shinyenv import is_pyodide
+from ..http_staticfiles import FileResponse
+
+if TYPE_CHECKING:
+    from ..cache import FileCache
+
+T = TypeVar("T")
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+_done = object()
+
+
+def threads_available() -> bool:
+    # Under WebAssembly, threads can't be started
+    return not is_pyodide
+
+
+async def run_sync(fn: Callable[..., T], *args: Any, in_thread: bool) -> T:
+    """
+    Call a sync function, in a worker thread if `in_thread` is true. The function runs
+    in a copy of the current context (e.g., the current session).
+    """
+    if not in_thread:
+        return fn(*args)
+    ctx = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(None, ctx.run, fn, *args)
+
+
+def accepts_gzip(request: Request) -> bool:
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() not in ("gzip", "*"):
+            continue
+        params = params.replace(" ", "")
+        return params not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def _gzip_compressor() -> Any:
+    # `wbits=31` writes the gzip format
+    return zlib.compressobj(wbits=31)
+
+
+async def download_chunks(
+    contents: Iterable[Union[bytes, str]] | AsyncIterable[Union[bytes, str]],
+    *,
+    encoding: str,
+    in_thread: bool = False,
+    gzip: bool = False,
+) -> AsyncIterator[bytes]:
+    """
+    The chunks of a download, encoded as bytes (and compressed, if `gzip` is true).
+    """
+    compressor = _gzip_compressor() if gzip else None
+
+    def as_bytes(chunk: Union[bytes, str]) -> bytes:
+        return chunk.encode(encoding) if isinstance(chunk, str) else chunk
+
+    if isinstance(contents, AsyncIterable):
+        async for chunk in contents:
+            data = as_bytes(chunk)
+            if compressor is not None:
+                data = await run_sync(compressor.compress, data, in_thread=in_thread)
+            if len(data) > 0:
+                yield data
+    elif not in_thread:
+        for chunk in contents:
+            data = as_bytes(chunk)
+            if compressor is not None:
+                data = compressor.compress(data)
+            if len(data) > 0:
+                yield data
+    else:
+        batches = _iterate_in_thread(iter(contents), as_bytes, compressor)
+        try:
+            async for data in batches:
+                yield data
+        finally:
+            # Close the handler's iterator now, even if the download was cut short
+            await batches.aclose()  # pyright: ignore[reportAttributeAccessIssue]
+        compressor = None
+
+    if compressor is not None:
+        yield compressor.flush()
+
+
+async def _iterate_in_thread(
+    it: Iterator[Union[bytes, str]],
+    as_bytes: Callable[[Union[bytes, str]], bytes],
+    compressor: Any,
+) -> AsyncIterator[bytes]:
+    done = False
+
+    def next_batch() -> Optional[bytes]:
+        # Runs in the worker thread; returns `None` once the iterator is done
+        nonlocal done
+        if done:
+            return None
+        parts: list[bytes] = []
+        size = 0
+        while size < DOWNLOAD_CHUNK_SIZE:
+            chunk = next(it, _done)
+            if chunk is _done:
+                done = True
+                break
+            data = as_bytes(chunk)  # pyright: ignore[reportArgumentType]
+            parts.append(data)
+            size += len(data)
+        data = b"".join(parts)
+        if compressor is not None:
+            data = compressor.compress(data)
+            if done:
+                data += compressor.flush()
+        return data
+
+    pending: Optional[asyncio.Future[Optional[bytes]]] = None
+    try:
+        pending = asyncio.ensure_future(run_sync(next_batch, in_thread=True))
+        while True:
+            batch = await pending
+            pending = None
+            if batch is None:
+                break
+            # Build the next batch while this one is sent
+            pending = asyncio.ensure_future(run_sync(next_batch, in_thread=True))
+            if len(batch) > 0:
+                yield batch
+    finally:
+        # The iterator can't be closed while it's running
+        if pending is not None:
+            await asyncio.wait([pending])
+            if not pending.cancelled():
+                pending.exception()
+        close = getattr(it, "close", None)
+        if close is not None:
+            await run_sync(close, in_thread=True)
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(value: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a `Range` header into the first and last (inclusive) byte positions. Returns
+    `None` if the header should be ignored (because it's invalid, or asks for multiple
+    ranges), and raises `RangeNotSatisfiable` if the range is outside of the file.
+    """
+    unit, _, ranges = value.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+    first, sep, last = ranges.strip().partition("-")
+    if sep == "" or any(x != "" and not x.isdigit() for x in (first, last)):
+        return None
+
+    if first == "":
+        # The last bytes of the file
+        if last == "":
+            return None
+        n = int(last)
+        if n == 0 or size == 0:
+            raise RangeNotSatisfiable()
+        return (max(size - n, 0), size - 1)
+
+    start = int(first)
+    end = None if last == "" else int(last)
+    if end is not None and end < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    return (start, size - 1 if end is None else min(end, size - 1))
+
+
+def _read_file(
+    f: BinaryIO, start: int = 0, end: Optional[int] = None
+) -> Iterator[bytes]:
+    # Reads bytes `start` to `end` (inclusive), or to the end of the file, and then
+    # closes it
+    with f:
+        f.seek(start)
+        remaining = None if end is None else end - start + 1
+        while remaining is None or remaining > 0:
+            size = DOWNLOAD_CHUNK_SIZE if remaining is None else remaining
+            chunk = f.read(min(size, DOWNLOAD_CHUNK_SIZE))
+            if len(chunk) == 0:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+
+# The files that are being generated for each cache, by key
+_pending_files: weakref.WeakKeyDictionary[
+    FileCache, dict[str, asyncio.Future[Path]]
+] = weakref.WeakKeyDictionary()
+
+
+async def cached_download(
+    cache: FileCache,
+    key: str,
+    generate: Callable[[], Awaitable[object]],
+    *,
+    encoding: str,
+    in_thread: bool = False,
+) -> BinaryIO:
+    """
+    The cached file for `key`, opened for reading. If it isn't in the cache,
+    `generate()` is called to get the download's contents (a path, or an iterable of
+    chunks), which are then stored in the cache. If another session is already
+    generating the same file, it is awaited instead.
+    """
+    pending = _pending_files.setdefault(cache, {})
+    while True:
+        file = await run_sync(cache.open, key, in_thread=in_thread)
+        if file is not None:
+            return file
+
+        future = pending.get(key)
+        if future is None:
+            path = await _generate_download(
+                cache, key, generate, encoding=encoding, in_thread=in_thread
+            )
+        else:
+            await asyncio.wait([future])
+            # If the other session's download was cancelled, try again
+            if future.cancelled():
+                continue
+            path = future.result()
+
+        # If the file was evicted before it could be opened, generate it again
+        file = await run_sync(cache._open_stored, path, in_thread=in_thread)
+        if file is not None:
+            return file
+
+
+async def _generate_download(
+    cache: FileCache,
+    key: str,
+    generate: Callable[[], Awaitable[object]],
+    *,
+    encoding: str,
+    in_thread: bool,
+) -> Path:
+    pending = _pending_files.setdefault(cache, {})
+    future = asyncio.get_running_loop().create_future()
+    pending[key] = future
+    try:
+        path = await _store_download(
+            cache, key, await generate(), encoding=encoding, in_thread=in_thread
+        )
+        future.set_result(path)
+        return path
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as e:
+        future.set_exception(e)
+        # Mark the exception as retrieved, in case no other session is waiting
+        future.exception()
+        raise
+    finally:
+        del pending[key]
+
+
+async def _store_download(
+    cache: FileCache, key: str, contents: object, *, encoding: str, in_thread: bool
+) -> Path:
+    if isinstance(contents, str):
+        return await run_sync(cache.set, key, contents, in_thread=in_thread)
+
+    fd, tmp_path = await run_sync(
+        functools.partial(tempfile.mkstemp, dir=cache.directory, suffix=".tmp"),
+        in_thread=in_thread,
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in download_chunks(
+                contents,  # pyright: ignore[reportArgumentType]
+                encoding=encoding,
+                in_thread=in_thread,
+            ):
+                await run_sync(f.write, chunk, in_thread=in_thread)
+        return await run_sync(
+            functools.partial(cache.set, key, tmp_path, move=True),
+            in_thread=in_thread,
+        )
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _etag_matches(if_none_match: str, etag: Optional[str]) -> bool:
+    etags = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison: ignore the W/ prefix
+    etags = [tag[2:] if tag.startswith("W/") else tag for tag in etags]
+    return "*" in etags or etag in etags
+
+
+async def file_download_response(
+    file: Union[str, os.PathLike[str], BinaryIO],
+    *,
+    request: Request,
+    headers: dict[str, str],
+    media_type: Optional[str],
+    gzip: bool = False,
+) -> Response:
+    """
+    A response with the contents of a file (a path, or a file that is open for reading,
+    which is closed once it's sent): compressed, if `gzip` is true and the client
+    accepts it, or else the requested range of bytes, if any.
+    """
+    in_thread = threads_available()
+    if isinstance(file, (str, os.PathLike)):
+        return await _file_response(
+            Path(file),
+            request=request,
+            headers=headers,
+            media_type=media_type,
+            gzip=gzip,
+            in_thread=in_thread,
+        )
+
+    try:
+        return await _file_response(
+            file,
+            request=request,
+            headers=headers,
+            media_type=media_type,
+            gzip=gzip,
+            in_thread=in_thread,
+        )
+    except BaseException:
+        file.close()
+        raise
+
+
+async def _file_response(
+    file: Union[Path, BinaryIO],
+    *,
+    request: Request,
+    headers: dict[str, str],
+    media_type: Optional[str],
+    gzip: bool,
+    in_thread: bool,
+) -> Response:
+    # A path is only opened if the file is read in chunks; a complete file is sent with
+    # a `FileResponse`
+    async def open_file() -> BinaryIO:
+        if isinstance(file, Path):
+            return await run_sync(open, file, "rb", in_thread=in_thread)
+        return file
+
+    def close_file() -> None:
+        if not isinstance(file, Path):
+            file.close()
+
+    if gzip:
+        headers["Vary"] = "Accept-Encoding"
+        if accepts_gzip(request):
+            headers["Content-Encoding"] = "gzip"
+            return StreamingResponse(
+                download_chunks(
+                    _read_file(await open_file()),
+                    encoding="",
+                    in_thread=in_thread,
+                    gzip=True,
+                ),
+                headers=headers,
+                media_type=media_type,
+            )
+
+    if isinstance(file, Path):
+        stat_result = await run_sync(os.stat, file, in_thread=in_thread)
+    else:
+        stat_result = await run_sync(os.fstat, file.fileno(), in_thread=in_thread)
+    size = stat_result.st_size
+    etag = f'"{stat_result.st_mtime_ns:x}-{size:x}"'
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+    headers.update(
+        {"Accept-Ranges": "bytes", "ETag": etag, "Last-Modified": last_modified}
+    )
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and _etag_matches(if_none_match, etag):
+        close_file()
+        not_modified_headers = {
+            name: headers[name]
+            for name in ("ETag", "Last-Modified", "Cache-Control")
+            if name in headers
+        }
+        return Response(status_code=304, headers=not_modified_headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    # Only send part of the file if it hasn't changed since the client got the rest
+    if_range = request.headers.get("if-range")
+    if range_header is not None and (
+        if_range is None or if_range in (etag, last_modified)
+    ):
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            close_file()
+            return Response(
+                status_code=416,
+                headers={"Content-Range": f"bytes */{size}", "Accept-Ranges": "bytes"},
+            )
+
+    if byte_range is None:
+        if isinstance(file, Path):
+            return FileResponse(
+                file,
+                headers={**headers, "Content-Length": str(size)},
+                media_type=media_type,
+            )
+        return StreamingResponse(
+            download_chunks(_read_file(file), encoding="", in_thread=in_thread),
+            headers={**headers, "Content-Length": str(size)},
+            media_type=media_type,
+        )
+
+    start, end = byte_range
+    return StreamingResponse(
+        download_chunks(
+            _read_file(await open_file(), start, end), encoding="", in_thread=in_thread
+        ),
+        status_code=206,
+        headers={
+            **headers,
+            "Content-Range": f"bytes {start}-{end}/{size}",
+            "Content-Length": str(end - start + 1),
+        },
+        media_type=media_type,
+    )
@@ -16,12 +16,12 @@ import typing
 import urllib.parse
 import warnings
 from abc import ABC, abstractmethod
-from pathlib import Path
 from typing import (
     TYPE_CHECKING,
     Any,
     AsyncIterable,
     Awaitable,
+    BinaryIO,
     Callable,
     Iterable,
     Literal,
@@ -36,18 +36,17 @@ from starlette.requests import HTTPConnection, Request
 from starlette.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 from starlette.types import ASGIApp
 
-from .. import _utils, reactive, render
-from .._connection import Connection, ConnectionClosed
+from .. import _json, _utils, reactive, render
+from .._connection import CONTROL_MESSAGE_TYPES, Connection, ConnectionClosed
 from .._deprecated import warn_deprecated
 from .._docstring import add_example
 from .._fileupload import FileInfo, FileUploadManager
 from .._namespaces import Id, ResolvedId, Root
 from .._typing_extensions import NotRequired, TypedDict
 from .._utils import wrap_async
-from ..http_staticfiles import FileResponse
 from ..input_handler import input_handlers
-from ..reactive import Effect_, Value, effect, flush, isolate
-from ..reactive._core import lock, on_flushed
+from ..reactive import Effect_, Value, _profiler, effect, flush, isolate
+from ..reactive._core import ReactiveDomain, lock, on_flushed
 from ..render.renderer import Renderer, RendererT
 from ..types import (
     Jsonifiable,
@@ -56,10 +55,19 @@ from ..types import (
     SilentException,
     SilentOperationInProgressException,
 )
+from ._download import (
+    accepts_gzip,
+    cached_download,
+    download_chunks,
+    file_download_response,
+    run_sync,
+    threads_available,
+)
 from ._utils import RenderedDeps, read_thunk_opt, session_context
 
 if TYPE_CHECKING:
     from .._app import App
+    from ..cache import FileCache
 
 
 class ConnectionState(enum.Enum):
@@ -127,6 +135,12 @@ class DownloadInfo:
     content_type: Optional[Callable[[], str] | str]
     handler: DownloadHandler
     encoding: str
+    run_in_thread: bool = False
+    gzip: bool = False
+    # A `FileCache` (or "app", for the app's download cache) to store the generated
+    # file in, under the key that `cache_key()` returns
+    cache: Union[FileCache, Literal["app"], None] = None
+    cache_key: Optional[Callable[[], Awaitable[str]]] = None
 
 
 class OutBoundMessageQueues:
@@ -155,6 +169,50 @@ class OutBoundMessageQueues:
     def add_input_message(self, id: str, message: dict[str, Any]) -> None:
         self.input_messages.append({"id": id, "message": message})
 
+    def serialize(
+        self, max_message_size: Optional[int] = None
+    ) -> tuple[list[tuple[Optional[str], str]], dict[str, int]]:
+        """
+        Serialize the queued values, errors, and input messages as one or more JSON
+        messages.
+
+        Each output value is serialized exactly once. Values that are larger than
+        `max_message_size` (in bytes) are each sent in a message of their own, before
+        the message with everything else, so that one large value doesn't have to be
+        copied into a message with all the others. These messages only have `values`
+        (and no `errors`), so that the browser doesn't treat them as the end of the
+        flush.
+
+        Returns a tuple of the messages, each with the ID of the output whose value it
+        holds (or `None`, for the message with everything else), and the size (in
+        bytes) of each output value.
+        """
+        messages: list[tuple[Optional[str], str]] = []
+        sizes: dict[str, int] = {}
+        fragments: list[str] = []
+        for id, value in self.values.items():
+            fragment = _json.dumps(id) + ":" + _json.dumps(value)
+            size = len(fragment) if fragment.isascii() else len(fragment.encode())
+            sizes[id] = size
+            if max_message_size is not None and size > max_message_size:
+                messages.append((id, '{"values":{' + fragment + "}}"))
+            else:
+                fragments.append(fragment)
+
+        messages.append(
+            (
+                None,
+                '{"values":{'
+                + ",".join(fragments)
+                + '},"inputMessages":'
+                + _json.dumps(self.input_messages)
+                + ',"errors":'
+                + _json.dumps(self.errors)
+                + "}",
+            )
+        )
+        return messages, sizes
+
 
 # ======================================================================================
 # Session abstract base class
@@ -541,7 +599,11 @@ class AppSession(Session):
 
         self._outbound_message_queues = OutBoundMessageQueues()
 
-        self._file_upload_manager: FileUploadManager = FileUploadManager()
+        self._file_upload_manager: FileUploadManager = FileUploadManager(
+            checksum=app._upload_checksum,
+            target=app._upload_target,
+            spool_max_size=app.upload_spool_max_size,
+        )
         self._on_ended_callbacks = _utils.AsyncCallbacks()
         self._has_run_session_end_tasks: bool = False
         self._downloads: dict[str, DownloadInfo] = {}
@@ -552,6 +614,13 @@ class AppSession(Session):
         self._flush_callbacks = _utils.AsyncCallbacks()
         self._flushed_callbacks = _utils.AsyncCallbacks()
 
+        # Each session has its own lock and flush queue, so that one session's reactive
+        # work doesn't hold up any other session in the same process.
+        self._reactive_domain = ReactiveDomain(
+            on_flush_requested=self._request_flush,
+            flush_mode=app._flush_mode,
+        )
+
     def _register_session_end_callbacks(self) -> None:
         # This is to be called from the initialization. It registers functions
         # that are called when a session ends.
@@ -583,7 +652,7 @@ class AppSession(Session):
             if conn_state != expected_state:
                 raise ProtocolError("Invalid method for the current session state")
 
-        with contextlib.ExitStack() as stack:
+        with contextlib.ExitStack() as stack, self._reactive_domain.use():
             try:
                 await self._send_message(
                     {
@@ -601,8 +670,9 @@ class AppSession(Session):
                         print("RECV: " + message, flush=True)
 
                     try:
-                        message_obj = json.loads(
-                            message, object_hook=_utils.lists_to_tuples
+                        # Convert lists to tuples in one pass, after decoding.
+                        message_obj = cast(
+                            Any, _utils.lists_to_tuples(_json.loads(message))
                         )
                     except json.JSONDecodeError:
                         warnings.warn(
@@ -620,8 +690,8 @@ class AppSession(Session):
                         if message_obj["method"] == "init":
                             verify_state(ConnectionState.Start)
 
-                            # When a reactive flush occurs, flush the session's outputs,
-                            # errors, etc. to the client. Note that this is
+                            # When the session's reactive domain is flushed, flush the
+                            # session's outputs, errors, etc. to the client. Note that this is
                             # `reactive._core.on_flushed`, not `self.on_flushed`.
                             unreg = on_flushed(self._flush)
                             # When the session ends, stop flushing outputs on reactive
@@ -658,8 +728,6 @@ class AppSession(Session):
                         # https://github.com/posit-dev/py-shiny/issues/1381
                         await asyncio.sleep(0)
 
-                        self._request_flush()
-
                         await flush()
 
             except ConnectionClosed:
@@ -816,11 +884,18 @@ class AppSession(Session):
                 return HTMLResponse("<h1>Bad Request</h1>", 400)
 
             # The FileUploadOperation can have multiple files; each one will
-            # have a separate POST request. Each call to  `with upload_op` will
-            # open up each file (in sequence) for writing.
-            with upload_op:
-                async for chunk in request.stream():
-                    upload_op.write_chunk(chunk)
+            # have a separate POST request. Each call to `upload_op.write_file()`
+            # writes the next file (in sequence), without blocking the event loop.
+            await upload_op.write_file(request.stream())
+
+            if self._debug:
+                progress = upload_op.progress()
+                print(
+                    f"Upload {job_id}: {progress['bytes_received']} of "
+                    f"{progress['bytes_total']} bytes received, at "
+                    f"{progress['throughput'] / 1e6:.1f} MB/s",
+                    flush=True,
+                )
 
             return PlainTextResponse("OK", 200)
 
@@ -832,7 +907,24 @@ class AppSession(Session):
                         download = self._downloads[download_id]
                         filename = read_thunk_opt(download.filename)
                         content_type = read_thunk_opt(download.content_type)
-                        contents = download.handler()
+                        in_thread = download.run_in_thread and threads_available()
+                        cached_file: Optional[BinaryIO] = None
+                        if download.cache is None or download.cache_key is None:
+                            contents = await run_sync(
+                                download.handler, in_thread=in_thread
+                            )
+                        else:
+                            cache = download.cache
+                            if cache == "app":
+                                cache = self.app.download_cache
+                            contents = None
+                            cached_file = await cached_download(
+                                cache,
+                                await download.cache_key(),
+                                lambda: run_sync(download.handler, in_thread=in_thread),
+                                encoding=download.encoding,
+                                in_thread=in_thread,
+                            )
 
                         if filename is None:
                             if isinstance(contents, str):
@@ -857,48 +949,51 @@ class AppSession(Session):
                             content_disposition = f'attachment; filename="{filename}"'
                         headers = {
                             "Content-Disposition": content_disposition,
-                            "Cache-Control": "no-store",
+                            # Cached files may be stored by the browser, but it must
+                            # check that they're still current (with their ETag).
+                            "Cache-Control": (
+                                "no-store"
+                                if download.cache is None
+                                else "private, no-cache"
+                            ),
                         }
 
+                        file: Union[str, BinaryIO, None] = cached_file
                         if isinstance(contents, str):
                             # contents is the path to a file
-                            return FileResponse(
-                                Path(contents),
+                            file = contents
+                        if file is not None:
+                            return await file_download_response(
+                                file,
+                                request=request,
                                 headers=headers,
                                 media_type=content_type,
+                                gzip=download.gzip,
                             )
 
-                        wrapped_contents: AsyncIterable[bytes]
-
-                        if isinstance(contents, AsyncIterable):
-                            # Need to wrap the app-author-provided iterator in a
-                            # callback that installs the appropriate context mgrs.
-                            # We already use this context mgrs further up in the
-                            # implementation of handle_request(), but the iterators
-                            # aren't invoked until after handle_request() returns.
-                            async def wrap_content_async() -> AsyncIterable[bytes]:
-                                with session_context(self):
-                                    with isolate():
-                                        async for chunk in contents:
-                                            if isinstance(chunk, str):
-                                                yield chunk.encode(download.encoding)
-                                            else:
-                                                yield chunk
-
-                            wrapped_contents = wrap_content_async()
-
-                        else:  # isinstance(contents, Iterable):
-
-                            async def wrap_content_sync() -> AsyncIterable[bytes]:
-                                with session_context(self):
-                                    with isolate():
-                                        for chunk in contents:
-                                            if isinstance(chunk, str):
-                                                yield chunk.encode(download.encoding)
-                                            else:
-                                                yield chunk
-
-                            wrapped_contents = wrap_content_sync()
+                        gzip = False
+                        if download.gzip:
+                            headers["Vary"] = "Accept-Encoding"
+                            if accepts_gzip(request):
+                                headers["Content-Encoding"] = "gzip"
+                                gzip = True
+
+                        # Need to wrap the app-author-provided iterator in a callback
+                        # that installs the appropriate context mgrs. We already use
+                        # this context mgrs further up in the implementation of
+                        # handle_request(), but the iterators aren't invoked until after
+                        # handle_request() returns. (Sync iterators can also run in a
+                        # worker thread, in a copy of this context.)
+                        async def wrap_content() -> AsyncIterable[bytes]:
+                            with session_context(self):
+                                with isolate():
+                                    async for chunk in download_chunks(
+                                        contents,
+                                        encoding=download.encoding,
+                                        in_thread=in_thread,
+                                        gzip=gzip,
+                                    ):
+                                        yield chunk
 
                         # In streaming downloads, we send a 200 response, but if an
                         # error occurs in the middle of it, the client needs to know.
@@ -907,7 +1002,7 @@ class AppSession(Session):
                         headers["Transfer-Encoding"] = "chunked"
 
                         return StreamingResponse(
-                            wrapped_contents,
+                            wrap_content(),
                             200,
                             headers=headers,
                             media_type=content_type,  # type: ignore
@@ -955,15 +1050,36 @@ class AppSession(Session):
         await self._send_message({"custom": {type: message}})
 
     async def _send_message(self, message: dict[str, object]) -> None:
-        message_str: str = json.dumps(message) + "\n"
+        control = None
+        if len(message) == 1:
+            type = next(iter(message))
+            if type in CONTROL_MESSAGE_TYPES:
+                control = type
+        await self._send_message_str(_json.dumps(message), control=control)
+
+    async def _send_message_str(
+        self,
+        message_str: str,
+        key: Optional[str] = None,
+        *,
+        control: Optional[str] = None,
+    ) -> None:
+        # Send a message that has already been serialized to JSON. A message with a
+        # `key` replaces an earlier message with the same key, if that one hasn't been
+        # sent yet. A `control` message (e.g., "recalculating") may be combined with
+        # the control messages around it.
         if self._debug:
             print(
                 "SEND: "
                 + re.sub("(?m)base64,[a-zA-Z0-9+/=]+", "[base64 data]", message_str),
-                end="",
                 flush=True,
             )
-        await self._conn.send(json.dumps(message))
+        if key is not None:
+            await self._conn.send_superseding(message_str, key)
+        elif control is not None:
+            await self._conn.send_control(message_str, control)
+        else:
+            await self._conn.send(message_str)
 
     def _send_message_sync(self, message: dict[str, object]) -> None:
         _utils.run_coro_hybrid(self._send_message(message))
@@ -1000,7 +1116,11 @@ class AppSession(Session):
         return self._flushed_callbacks.register(wrap_async(fn), once)
 
     def _request_flush(self) -> None:
-        self.app._request_flush(self)
+        # Whoever holds the session's reactive lock flushes before releasing it (and the
+        # domain asks for another flush if more contexts were queued by then), so the
+        # app only needs to schedule a flush when the session is idle.
+        if not self._reactive_domain.locked():
+            self.app._request_flush(self)
 
     async def _flush(self) -> None:
         with session_context(self):
@@ -1009,16 +1129,21 @@ class AppSession(Session):
         try:
             omq = self._outbound_message_queues
 
-            message: dict[str, object] = {
-                "values": omq.values,
-                "inputMessages": omq.input_messages,
-                "errors": omq.errors,
-            }
-
             try:
-                await self._send_message(message)
+                messages, sizes = omq.serialize(self.app.max_message_size)
             finally:
-                self._outbound_message_queues.reset()
+                omq.reset()
+
+            profiler = _profiler.current
+            if profiler is not None:
+                profiler._record_output_sizes(self._reactive_domain, sizes)
+
+            for id, message_str in messages:
+                # A large value that is still waiting to be sent to a slow client is
+                # dropped when a newer value for the same output is sent.
+                await self._send_message_str(
+                    message_str, key=None if id is None else "values:" + id
+                )
         finally:
             with session_context(self):
                 await self._flushed_callbacks.invoke()
@@ -1321,6 +1446,7 @@ class Inputs:
         # yet.
         if key not in self._map:
             self._map[key] = Value[Any](read_only=True)
+            self._map[key]._label = "input:" + key
 
         return self._map[key]
 
@@ -1484,6 +1610,8 @@ class Outputs:
                     }
                 )
 
+            output_obs._label = "output:" + output_name
+
             output_obs.on_invalidate(
                 lambda: require_real_session()._send_progress(
                     "binding", {"id": output_name}
@@ -68,9 +68,27 @@ class FileInfo(TypedDict):
     size: int
     """The size of the file in bytes."""
     type: str
-    """The MIME type of the file."""
+    """
+    The MIME type of the file. If neither the browser nor the file's extension gives a
+    type, common formats are recognized from the first bytes of the file.
+    """
     datapath: str
-    """The path to the file on the server."""
+    """
+    The path to the file on the server, or `""` if the file isn't stored in a file of
+    its own (with `App(upload_target="spooled")` or an upload target function).
+    """
+    file: NotRequired[Any]
+    """
+    The uploaded file, for other upload targets than `App(upload_target="disk")`: a
+    binary file object, positioned at the start (for `"spooled"`), a read-only
+    :class:`mmap.mmap` (for `"mmap"`; `b""` for an empty file), or the value that the
+    upload target function returned. Files and maps are closed when the session ends.
+    """
+    checksum: NotRequired[str]
+    """
+    The hexadecimal digest of the file's contents, if a checksum algorithm was given
+    with `App(upload_checksum=)`.
+    """
 
 
 @add_example(ex_dir="./api-examples/output_image")
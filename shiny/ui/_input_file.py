@@ -68,10 +68,15 @@ def input_file(
     * ``name``: The filename provided by the web browser. This is *not* the path to read
         to get at the actual data that was uploaded (see 'datapath').
     * ``size``: The size of the uploaded data, in bytes.
-    * ``type``: The MIME type reported by the browser (for example, 'text/plain'), or
-        empty string if the browser didn't know.
+    * ``type``: The MIME type reported by the browser (for example, 'text/plain'). If
+        the browser didn't know, it's guessed from the filename or the data.
     * ``datapath``: The path to a temp file that contains the data that was uploaded.
-        This file may be deleted if the user performs another upload operation.
+        This file may be deleted if the user performs another upload operation. It's an
+        empty string if the app's ``upload_target`` doesn't store files on disk.
+    * ``file``: Only with other upload targets than ``"disk"`` (see
+        :class:`~shiny.App`): the file object, memory map, or value returned by the
+        upload target function.
+    * ``checksum``: Only with ``App(upload_checksum=)``: the checksum of the data.
     :::
 
     See Also
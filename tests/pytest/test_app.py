@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import pytest
+from starlette.requests import Request
+
+from shiny import App, ui
+from shiny.cache import MemoryCache
+
+
+def make_request(headers: dict[str, str] | None = None) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "query_string": b"",
+            "headers": [
+                (k.lower().encode(), v.encode()) for k, v in (headers or {}).items()
+            ],
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_root_page_cache():
+    n_renders = 0
+
+    def page(request: Request):
+        nonlocal n_renders
+        n_renders += 1
+        return ui.page_fluid(ui.h1("Hello, " + request.headers.get("x-user", "")))
+
+    cache = MemoryCache()
+    app = App(
+        page,
+        None,
+        cache=cache,
+        ui_cache_key=lambda request: request.headers.get("x-user"),
+    )
+
+    res = await app._on_root_request_cb(make_request({"x-user": "a"}))
+    assert res.status_code == 200
+    assert b"Hello, a" in res.body
+    etag = res.headers["etag"]
+    assert res.headers["last-modified"]
+
+    res = await app._on_root_request_cb(make_request({"x-user": "a"}))
+    assert res.headers["etag"] == etag
+    assert n_renders == 1
+
+    # A different key renders a different page
+    res = await app._on_root_request_cb(make_request({"x-user": "b"}))
+    assert b"Hello, b" in res.body
+    assert res.headers["etag"] != etag
+    assert n_renders == 2
+    assert len(cache) == 2
+
+    # Conditional requests
+    res = await app._on_root_request_cb(
+        make_request({"x-user": "a", "if-none-match": etag})
+    )
+    assert res.status_code == 304
+    assert res.body == b""
+    res = await app._on_root_request_cb(
+        make_request({"x-user": "a", "if-none-match": 'W/"nope", ' + etag})
+    )
+    assert res.status_code == 304
+    res = await app._on_root_request_cb(
+        make_request({"x-user": "b", "if-none-match": etag})
+    )
+    assert res.status_code == 200
+    last_modified = res.headers["last-modified"]
+    res = await app._on_root_request_cb(
+        make_request({"x-user": "b", "if-modified-since": last_modified})
+    )
+    assert res.status_code == 304
+    assert n_renders == 2
+
+
+@pytest.mark.asyncio
+async def test_root_page_uncached():
+    n_renders = 0
+
+    def page(request: Request):
+        nonlocal n_renders
+        n_renders += 1
+        return ui.page_fluid("Hello")
+
+    app = App(page, None)
+    for _ in range(2):
+        res = await app._on_root_request_cb(make_request())
+        assert res.status_code == 200
+        assert "etag" not in res.headers
+    assert n_renders == 2
+
+    # Nor does a static page
+    app = App(ui.page_fluid("Hello"), None)
+    res = await app._on_root_request_cb(make_request({"if-none-match": "*"}))
+    assert res.status_code == 200
+    assert "etag" not in res.headers
+    assert "cache-control" not in res.headers
@@ -0,0 +1,149 @@
+"""Tests for `shiny.cache`."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+from shiny.cache import DiskCache, FileCache, MemoryCache, size_of
+from shiny.types import MISSING
+
+
+def test_memory_cache_lru():
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    # "b" is now the least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+    cache.remove("a")
+    assert cache.get("a") is MISSING
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.size() == 0
+
+
+def test_memory_cache_max_size():
+    cache = MemoryCache(max_size=10)
+    cache.set("a", b"12345")
+    cache.set("b", b"12345")
+    assert cache.size() == 10
+    cache.set("c", b"123")
+    assert cache.get("a") is MISSING
+    assert cache.get("b") == b"12345"
+    # Values that are too big are never stored
+    cache.set("d", b"12345678901")
+    assert cache.get("d") is MISSING
+    assert cache.size() == 8
+
+
+def test_size_of_self_referencing_values():
+    items: list[object] = [b"x" * 100]
+    items.append(items)
+    mapping: dict[str, object] = {"data": b"y" * 100}
+    mapping["self"] = mapping
+
+    assert size_of(items) >= 100
+    assert size_of(mapping) >= 100
+    # A value that is referenced more than once is only counted once
+    assert size_of([items, items]) < 2 * size_of(items)
+
+    cache = MemoryCache(max_size=10_000)
+    cache.set("a", items)
+    assert cache.get("a") is items
+
+
+def test_memory_cache_ttl():
+    cache = MemoryCache(ttl=10)
+    with patch("time.monotonic", return_value=100):
+        cache.set("a", 1)
+    with patch("time.monotonic", return_value=105):
+        assert cache.get("a") == 1
+    with patch("time.monotonic", return_value=111):
+        assert cache.get("a") is MISSING
+
+
+def test_disk_cache(tmp_path: Path):
+    cache = DiskCache(tmp_path, max_entries=2)
+    cache.set("a", {"x": [1, 2]})
+    assert cache.get("a") == {"x": [1, 2]}
+    assert cache.path("a").exists()
+
+    # Another cache object pointed at the same directory sees the same values
+    assert DiskCache(tmp_path).get("a") == {"x": [1, 2]}
+
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert len(list(tmp_path.glob("*.pickle"))) == 2
+
+    cache.remove("c")
+    assert cache.get("c") is MISSING
+    cache.clear()
+    assert list(tmp_path.glob("*.pickle")) == []
+
+
+def test_disk_cache_ttl(tmp_path: Path):
+    cache = DiskCache(tmp_path, max_size=None, ttl=10)
+    with patch("time.time", return_value=100):
+        cache.set("a", 1)
+    with patch("time.time", return_value=105):
+        assert cache.get("a") == 1
+        cache.set("b", 2)
+    # Expired values are removed when another value is stored, even if they're never
+    # read again
+    with patch("time.time", return_value=112):
+        cache.set("c", 3)
+        assert not cache.path("a").exists()
+        assert cache.get("b") == 2
+        assert cache.get("c") == 3
+
+
+def test_file_cache(tmp_path: Path):
+    src = tmp_path / "src.txt"
+    src.write_bytes(b"12345")
+    cache = FileCache(tmp_path / "files", max_size=10)
+    path = cache.set("a", src)
+    assert path.read_bytes() == b"12345"
+    assert src.exists()
+    assert cache.get("a") == path
+    assert cache.get("b") is None
+    with cache.open("a") as f:  # pyright: ignore[reportOptionalContextManager]
+        assert f.read() == b"12345"
+    assert cache.open("b") is None
+
+    src.write_bytes(b"1234")
+    cache.set("b", src, move=True)
+    assert not src.exists()
+    # "a" is now the least recently used
+    assert cache.get("a") is not None
+    src.write_bytes(b"123")
+    cache.set("c", src)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+    # Files that are too big are kept until the next file is stored
+    src.write_bytes(b"12345678901")
+    cache.set("d", src)
+    assert [cache.get(key) is not None for key in "acd"] == [False, False, True]
+    cache.set("e", src)
+    assert cache.get("d") is None
+
+    cache.clear()
+    assert list((tmp_path / "files").glob("*.file")) == []
+
+
+def test_file_cache_ttl(tmp_path: Path):
+    src = tmp_path / "src.txt"
+    src.write_bytes(b"12345")
+    cache = FileCache(ttl=10)
+    with patch("time.time", return_value=100):
+        path = cache.set("a", src)
+    assert path.parent == cache.directory
+    with patch("time.time", return_value=105):
+        assert cache.get("a") == path
+    with patch("time.time", return_value=111):
+        assert cache.get("a") is None
+    assert not path.exists()
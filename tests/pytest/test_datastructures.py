@@ -17,3 +17,22 @@ def test_priority_queue_fifo():
     assert q.get() == "7"
     assert q.get() == "9"
     assert q.get() == "8"
+
+
+def test_priority_queue_fifo_batch():
+    q: PriorityQueueFIFO[str] = PriorityQueueFIFO()
+
+    assert q.get_batch() == []
+
+    q.put(1, "9")
+    q.put(2, "6")
+    q.put(1, "8")
+    q.put(2, "7")
+    q.put(-1, "5")
+
+    assert q.peek_priority() == 2
+    assert q.get_batch() == ["6", "7"]
+    assert q.peek_priority() == 1
+    assert q.get_batch() == ["9", "8"]
+    assert q.get() == "5"
+    assert q.empty()
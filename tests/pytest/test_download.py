@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import threading
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+from starlette.requests import Request
+
+from shiny import App, render, ui
+from shiny._connection import MockConnection
+from shiny.cache import FileCache
+from shiny.http_staticfiles import FileResponse
+from shiny.session import session_context
+from shiny.session._download import (
+    RangeNotSatisfiable,
+    accepts_gzip,
+    download_chunks,
+    parse_range,
+)
+
+
+def test_parse_range():
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=95-200", 100) == (95, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=-200", 100) == (0, 99)
+    # Ignored
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("bytes=5-1", 100) is None
+    assert parse_range("items=0-1", 100) is None
+    assert parse_range("bytes=a-1", 100) is None
+
+    for value, size in [("bytes=100-", 100), ("bytes=-0", 100), ("bytes=0-1", 0)]:
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range(value, size)
+
+
+def _request(headers: dict[str, str] | None = None) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [
+                (k.lower().encode(), v.encode()) for k, v in (headers or {}).items()
+            ],
+        }
+    )
+
+
+def test_accepts_gzip():
+    assert accepts_gzip(_request({"Accept-Encoding": "gzip, deflate, br"}))
+    assert accepts_gzip(_request({"Accept-Encoding": "br;q=1.0, gzip;q=0.8"}))
+    assert not accepts_gzip(_request({"Accept-Encoding": "gzip;q=0"}))
+    assert not accepts_gzip(_request({"Accept-Encoding": "br"}))
+    assert not accepts_gzip(_request())
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_gzip", [False, True])
+async def test_download_chunks_in_thread(use_gzip: bool):
+    threads: set[int] = set()
+    closed: list[bool] = []
+
+    def contents() -> Iterator[str | bytes]:
+        try:
+            for i in range(3000):
+                threads.add(threading.get_ident())
+                yield f"{i}," if i % 2 == 0 else f"{i},".encode()
+        finally:
+            closed.append(True)
+
+    chunks = [
+        chunk
+        async for chunk in download_chunks(
+            contents(), encoding="utf-8", in_thread=True, gzip=use_gzip
+        )
+    ]
+
+    data = b"".join(chunks)
+    if use_gzip:
+        data = gzip.decompress(data)
+    else:
+        # The small chunks are sent in batches
+        assert len(chunks) == 1
+    assert data == "".join(f"{i}," for i in range(3000)).encode()
+    assert threading.get_ident() not in threads
+    assert closed == [True]
+
+
+@pytest.mark.asyncio
+async def test_download_chunks_closed_early():
+    closed: list[bool] = []
+
+    def contents() -> Iterator[bytes]:
+        try:
+            while True:
+                yield b"x" * 100_000
+        finally:
+            closed.append(True)
+
+    it = download_chunks(contents(), encoding="utf-8", in_thread=True)
+    assert len(await it.__anext__()) == 100_000
+    # E.g., the client disconnected
+    await it.aclose()  # pyright: ignore[reportAttributeAccessIssue]
+    assert closed == [True]
+
+
+async def _get(
+    app: Any, headers: dict[str, str] | None = None
+) -> tuple[int, dict[str, str], bytes]:
+    messages: list[dict[str, Any]] = []
+
+    async def receive() -> Any:
+        # The client stays connected
+        await asyncio.Event().wait()
+
+    async def send(message: Any) -> None:
+        messages.append(message)
+
+    request = _request(headers)
+    await app(request.scope, receive, send)
+    start = messages[0]
+    return (
+        start["status"],
+        {k.decode(): v.decode() for k, v in start["headers"]},
+        b"".join(m.get("body", b"") for m in messages[1:]),
+    )
+
+
+@pytest.mark.asyncio
+async def test_download_file_range(tmp_path: Path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"0123456789" * 10)
+
+    app = App(ui.TagList(), None)
+    session = app._create_session(MockConnection())
+    threads: list[int] = []
+
+    with session_context(session):
+
+        @render.download(run_in_thread=True)
+        def out():
+            threads.append(threading.get_ident())
+            return str(path)
+
+    async def get(headers: dict[str, str] | None = None):
+        response = await session._handle_request_impl(
+            _request(headers), "download", "out"
+        )
+        return await _get(response, headers)
+
+    status, headers, body = await get()
+    assert (status, headers["content-length"], headers["accept-ranges"]) == (
+        200,
+        "100",
+        "bytes",
+    )
+    assert body == path.read_bytes()
+    assert threading.get_ident() not in threads
+
+    # The complete file can be sent by the server itself (e.g., with sendfile)
+    response = await session._handle_request_impl(_request(), "download", "out")
+    assert isinstance(response, FileResponse)
+
+    status, headers, body = await get({"Range": "bytes=5-14"})
+    assert (status, headers["content-range"], body) == (
+        206,
+        "bytes 5-14/100",
+        b"5678901234",
+    )
+    assert headers["content-length"] == "10"
+
+    # An If-Range that doesn't match gets the whole file
+    status, _, body = await get({"Range": "bytes=5-14", "If-Range": '"old"'})
+    assert (status, len(body)) == (200, 100)
+
+    status, headers, _ = await get({"Range": "bytes=200-"})
+    assert (status, headers["content-range"]) == (416, "bytes */100")
+
+
+@pytest.mark.asyncio
+async def test_download_gzip():
+    app = App(ui.TagList(), None)
+    session = app._create_session(MockConnection())
+
+    with session_context(session):
+
+        @render.download(filename="data.csv", gzip=True)
+        def out():
+            yield "a,b\n"
+            for i in range(1000):
+                yield f"{i},{i * 2}\n"
+
+    async def get(headers: dict[str, str]):
+        response = await session._handle_request_impl(
+            _request(headers), "download", "out"
+        )
+        return await _get(response, headers)
+
+    status, headers, body = await get({"Accept-Encoding": "gzip"})
+    assert (status, headers["content-encoding"], headers["vary"]) == (
+        200,
+        "gzip",
+        "Accept-Encoding",
+    )
+    expected = ("a,b\n" + "".join(f"{i},{i * 2}\n" for i in range(1000))).encode()
+    assert gzip.decompress(body) == expected
+
+    status, headers, body = await get({})
+    assert "content-encoding" not in headers
+    assert body == expected
+
+
+@pytest.mark.asyncio
+async def test_download_cache(tmp_path: Path):
+    cache = FileCache(tmp_path)
+    app = App(ui.TagList(), None)
+    calls: list[str] = []
+
+    async def get(
+        year: str, headers: dict[str, str] | None = None
+    ) -> tuple[int, dict[str, str], bytes]:
+        session = app._create_session(MockConnection())
+        with session_context(session):
+
+            @render.download(filename="report.csv", cache=cache, cache_key=lambda: year)
+            async def out():
+                calls.append(year)
+                await asyncio.sleep(0.01)
+                yield f"year,{year}\n"
+
+        response = await session._handle_request_impl(
+            _request(headers), "download", "out"
+        )
+        return await _get(response, headers)
+
+    # Concurrent downloads of the same file only generate it once
+    res = await asyncio.gather(get("2024"), get("2024"))
+    assert calls == ["2024"]
+    status, headers, body = res[0]
+    assert (status, body) == (200, b"year,2024\n")
+    assert headers["cache-control"] == "private, no-cache"
+    assert headers["content-disposition"] == 'attachment; filename="report.csv"'
+    assert res[1][2] == body
+
+    # The browser's copy is still current
+    status, _, body = await get("2024", {"If-None-Match": headers["etag"]})
+    assert (status, body) == (304, b"")
+
+    assert (await get("2025"))[2] == b"year,2025\n"
+    assert calls == ["2024", "2025"]
+    assert len(list(tmp_path.glob("*.file"))) == 2
+
+
+@pytest.mark.asyncio
+async def test_download_cache_evicted(tmp_path: Path):
+    cache = FileCache(tmp_path)
+    app = App(ui.TagList(), None)
+    session = app._create_session(MockConnection())
+
+    with session_context(session):
+
+        @render.download(filename="report.csv", cache=cache, cache_key=lambda: "k")
+        def out():
+            yield "a,b\n"
+
+    response = await session._handle_request_impl(_request(), "download", "out")
+    # Another session evicts the file before the response is sent
+    cache.clear()
+    status, headers, body = await _get(response)
+    assert (status, headers["content-length"], body) == (200, "4", b"a,b\n")
+
+
+def test_download_cache_args():
+    with pytest.raises(TypeError, match="must be used together"):
+        render.download(filename="x.csv", cache="app")
+    with pytest.raises(TypeError, match="must have a `filename`"):
+        render.download(cache="app", cache_key=lambda: 1)
@@ -1,3 +1,4 @@
+import os
 import sys
 import tempfile
 from pathlib import Path
@@ -128,3 +129,22 @@ with ui.card():
         res = run_express(Path(temp_file.name)).tagify()
 
     assert str(res) == str(card_app_core)
+
+
+def test_compiled_express_file_is_cached(tmp_path: Path):
+    from shiny.express._run import compile_express_file
+
+    app_file = tmp_path / "app.py"
+    app_file.write_text("from shiny.express import ui\n\nui.h1('Hello')\n")
+
+    compiled = compile_express_file(app_file)
+    assert len(compiled.code) == 2
+    assert compile_express_file(app_file) is compiled
+    assert "Hello" in str(run_express(app_file).tagify())
+
+    # Changing the file causes it to be recompiled
+    app_file.write_text("from shiny.express import ui\n\nui.h1('Goodbye')\n")
+    stat = app_file.stat()
+    os.utime(app_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert compile_express_file(app_file) is not compiled
+    assert "Goodbye" in str(run_express(app_file).tagify())
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+from typing import Any, AsyncIterator
+
+import pytest
+
+from shiny import App, ui
+from shiny._fileupload import FileUploadManager, sniff_content_type
+from shiny.types import FileInfo
+
+
+async def _chunks(data: bytes, size: int) -> AsyncIterator[bytes]:
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+@pytest.mark.asyncio
+async def test_upload_write_file(monkeypatch: pytest.MonkeyPatch):
+    from shiny import _fileupload
+
+    # Write in several batches
+    monkeypatch.setattr(_fileupload, "UPLOAD_WRITE_SIZE", 1000)
+
+    data = [b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 20, b"a,b\n1,2\n" * 300]
+    file_infos: list[FileInfo] = [
+        {"name": "x", "size": len(data[0]), "type": "", "datapath": ""},
+        {"name": "y.csv", "size": len(data[1]), "type": "text/csv", "datapath": ""},
+    ]
+    manager = FileUploadManager(checksum="sha256")
+    try:
+        job_id = manager.create_upload_operation(file_infos)
+        op = manager.get_upload_operation(job_id)
+        assert op is not None
+
+        for file_data in data:
+            await op.write_file(_chunks(file_data, 300))
+
+        progress = manager.progress()[job_id]
+        assert (
+            progress["bytes_received"] == progress["bytes_total"] == sum(map(len, data))
+        )
+        assert progress["files_done"] == 2
+
+        res = op.finish()
+        assert manager.progress() == {}
+        for file_info, file_data in zip(res, data):
+            with open(file_info["datapath"], "rb") as f:
+                assert f.read() == file_data
+            assert file_info.get("checksum") == hashlib.sha256(file_data).hexdigest()
+        # The type of the first file is recognized from its contents
+        assert [file_info["type"] for file_info in res] == ["image/png", "text/csv"]
+    finally:
+        manager.rm_upload_dir()
+
+
+@pytest.mark.asyncio
+async def test_upload_write_file_error():
+    file_infos: list[FileInfo] = [
+        {"name": "x.txt", "size": 10, "type": "text/plain", "datapath": ""}
+    ]
+    manager = FileUploadManager()
+    try:
+        op = manager.get_upload_operation(manager.create_upload_operation(file_infos))
+        assert op is not None
+
+        async def failing_chunks() -> AsyncIterator[bytes]:
+            yield b"abc"
+            raise OSError("disconnected")
+
+        with pytest.raises(OSError, match="disconnected"):
+            await op.write_file(failing_chunks())
+        # The file was closed
+        assert op._current_file_obj is None
+        assert "checksum" not in op._file_infos[0]
+    finally:
+        manager.rm_upload_dir()
+
+
+def test_sniff_content_type():
+    assert sniff_content_type(b"%PDF-1.7\n") == "application/pdf"
+    assert sniff_content_type(b"PK\x03\x04...") == "application/zip"
+    assert sniff_content_type(b"a,b,c") is None
+    assert sniff_content_type(b"") is None
+
+
+async def _upload(manager: FileUploadManager, data: list[bytes]) -> list[FileInfo]:
+    file_infos: list[FileInfo] = [
+        {"name": f"{i}.csv", "size": len(x), "type": "text/csv", "datapath": ""}
+        for i, x in enumerate(data)
+    ]
+    op = manager.get_upload_operation(manager.create_upload_operation(file_infos))
+    assert op is not None
+    for file_data in data:
+        await op.write_file(_chunks(file_data, 100))
+    return op.finish()
+
+
+@pytest.mark.asyncio
+async def test_upload_target_spooled():
+    data = [b"a,b\n" * 10, b"a,b\n" * 1000]
+    manager = FileUploadManager(target="spooled", spool_max_size=1000)
+    try:
+        res = await _upload(manager, data)
+        for file_info, file_data in zip(res, data):
+            assert file_info["datapath"] == ""
+            assert file_info.get("file").read() == file_data
+        # Only the larger file was moved to disk
+        assert [file_info.get("file")._rolled for file_info in res] == [False, True]
+    finally:
+        manager.rm_upload_dir()
+    assert all(file_info.get("file").closed for file_info in res)
+
+
+@pytest.mark.asyncio
+async def test_upload_target_mmap():
+    data = [b"a,b\n" * 100, b""]
+    manager = FileUploadManager(target="mmap")
+    try:
+        res = await _upload(manager, data)
+        assert isinstance(res[0].get("file"), mmap.mmap)
+        assert res[0].get("file")[:] == data[0]
+        assert res[1].get("file") == b""
+        with open(res[0]["datapath"], "rb") as f:
+            assert f.read() == data[0]
+    finally:
+        manager.rm_upload_dir()
+    assert res[0].get("file").closed
+
+
+@pytest.mark.asyncio
+async def test_upload_target_fn():
+    received: list[tuple[str, int]] = []
+
+    async def count_lines(file_info: FileInfo, chunks: AsyncIterator[bytes]) -> Any:
+        n = 0
+        async for chunk in chunks:
+            received.append((file_info["name"], len(chunk)))
+            n += chunk.count(b"\n")
+        return n
+
+    data = [b"a,b\n" * 100, b"a,b\n" * 3]
+    manager = FileUploadManager(target=count_lines, checksum="md5")
+    try:
+        res = await _upload(manager, data)
+    finally:
+        manager.rm_upload_dir()
+
+    assert [file_info.get("file") for file_info in res] == [100, 3]
+    assert [file_info["datapath"] for file_info in res] == ["", ""]
+    assert res[1].get("checksum") == hashlib.md5(data[1]).hexdigest()
+    # The chunks are passed on as they are received
+    assert received == [("0.csv", 100)] * 4 + [("1.csv", 12)]
+
+
+@pytest.mark.parametrize(
+    "kwargs,match",
+    [
+        ({"upload_checksum": "not-a-hash"}, "must be a `hashlib` algorithm"),
+        ({"upload_target": "memory"}, 'must be "disk", "spooled"'),
+    ],
+)
+def test_upload_options(kwargs: dict[str, Any], match: str):
+    with pytest.raises(ValueError, match=match):
+        App(ui.TagList(), None, **kwargs)
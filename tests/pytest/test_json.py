@@ -0,0 +1,96 @@
+import datetime
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from shiny import _json
+from shiny._json import JsonCodec, OrjsonCodec, RawJson, StdlibJsonCodec
+from shiny._utils import lists_to_tuples
+
+codecs = [StdlibJsonCodec(), OrjsonCodec()]
+
+
+@pytest.mark.parametrize("codec", codecs, ids=lambda c: c.name)
+def test_codec_dumps(codec: JsonCodec):
+    obj = {
+        "int": np.int64(3),
+        "float": np.float32(1.5),
+        "bool": np.bool_(True),
+        "array": np.array([1, 2]),
+        "date": datetime.date(2020, 1, 2),
+        "timestamp": pd.Timestamp("2020-01-02 03:04:05"),
+        "nat": pd.NaT,
+        "na": pd.NA,
+        "tuple": (1, "é"),
+    }
+    assert json.loads(codec.dumps(obj)) == {
+        "int": 3,
+        "float": 1.5,
+        "bool": True,
+        "array": [1, 2],
+        "date": "2020-01-02",
+        "timestamp": "2020-01-02T03:04:05",
+        "nat": None,
+        "na": None,
+        "tuple": [1, "é"],
+    }
+
+    # With a custom `default`, dates and times are passed to it, like the standard
+    # library does
+    assert codec.dumps([datetime.datetime(2020, 1, 2)], default=str) == (
+        '["2020-01-02 00:00:00"]'
+    )
+
+    with pytest.raises(TypeError):
+        codec.dumps(object())
+
+
+@pytest.mark.parametrize("codec", codecs, ids=lambda c: c.name)
+def test_codec_dumps_large_int(codec: JsonCodec):
+    # orjson only encodes 64-bit integers
+    assert codec.dumps({"a": 2**70, "b": [-(2**64)]}) == (
+        '{"a":1180591620717411303424,"b":[-18446744073709551616]}'
+    )
+
+
+@pytest.mark.parametrize("codec", codecs, ids=lambda c: c.name)
+def test_codec_loads(codec: JsonCodec):
+    assert codec.loads('{"a": [1, [2, 3]]}') == {"a": [1, [2, 3]]}
+    with pytest.raises(json.JSONDecodeError):
+        codec.loads("{")
+
+
+def test_set_json_codec():
+    prev = _json.get_json_codec()
+    try:
+        _json.set_json_codec("json")
+        assert isinstance(_json.get_json_codec(), StdlibJsonCodec)
+        assert _json.dumps({"a": 1}) == '{"a":1}'
+        _json.set_json_codec("auto")
+        assert isinstance(_json.get_json_codec(), OrjsonCodec)
+        with pytest.raises(ValueError):
+            _json.set_json_codec("nope")  # pyright: ignore[reportArgumentType]
+    finally:
+        _json.set_json_codec(prev)
+
+
+@pytest.mark.parametrize("codec", codecs, ids=lambda c: c.name)
+def test_dumps_raw_json(codec: JsonCodec):
+    prev = _json.get_json_codec()
+    try:
+        _json.set_json_codec(codec)
+        rows = RawJson('[[1,"a"],[2,null]]')
+        obj = {"data": rows, "other": [RawJson("{}"), "x"]}
+        assert _json.dumps(obj) == '{"data":[[1,"a"],[2,null]],"other":[{},"x"]}'
+        assert _json.dumps([rows], default=str) == '[[[1,"a"],[2,null]]]'
+        assert (
+            _json.dumps([2**70, rows]) == '[1180591620717411303424,[[1,"a"],[2,null]]]'
+        )
+    finally:
+        _json.set_json_codec(prev)
+
+
+def test_lists_to_tuples():
+    assert lists_to_tuples({"a": [1, {"b": [2, [3]]}]}) == {"a": (1, {"b": (2, (3,))})}
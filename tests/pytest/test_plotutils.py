@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from shiny.plotutils import PointIndex, brushed_points, near_points
+
+
+def make_df(n: int = 2000) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    x = rng.normal(size=n)
+    y = rng.uniform(-5, 5, size=n)
+    x[:5] = [np.nan, np.inf, -np.inf, 100, -100]
+    y[5:8] = [np.nan, np.inf, -50]
+    return pd.DataFrame(
+        {"x": x, "y": y, "g": rng.choice(["a", "b"], size=n)},
+        index=rng.permutation(n),
+    )
+
+
+def make_brush(
+    xmin: float, xmax: float, ymin: float, ymax: float, direction: str = "xy"
+) -> Any:
+    return {
+        "xmin": xmin,
+        "xmax": xmax,
+        "ymin": ymin,
+        "ymax": ymax,
+        "direction": direction,
+        "mapping": {"x": "x", "y": "y"},
+    }
+
+
+def make_coordinfo(x: float, y: float, mapping: dict[str, str] | None = None) -> Any:
+    # Data in [-2, 2] x [-4, 4] is drawn in a 400 x 300 pixel plot (with y upside down)
+    return {
+        "x": x,
+        "y": y,
+        "coords_img": {"x": (x + 2) * 100, "y": (4 - y) * 37.5},
+        "img_css_ratio": {"x": 2, "y": 2},
+        "mapping": {"x": "x", "y": "y", **(mapping or {})},
+        "domain": {"left": -2, "right": 2, "bottom": -4, "top": 4},
+        "range": {"left": 0, "right": 400, "bottom": 300, "top": 0},
+        "log": {"x": None, "y": None},
+        "panelvar1": "a",
+    }
+
+
+@pytest.mark.parametrize(
+    "brush",
+    [
+        make_brush(-0.5, 0.7, -1, 2),
+        make_brush(-10, 10, -10, 10),
+        make_brush(5, 200, -5, 5),
+        make_brush(-0.5, 0.7, 0, 0, direction="x"),
+        make_brush(0, 0, -1, 2, direction="y"),
+    ],
+)
+def test_brushed_points_index(brush: Any):
+    df = make_df()
+    index = PointIndex(df, "x", "y")
+
+    expected = brushed_points(df, brush)
+    assert len(expected) > 0
+    pd.testing.assert_frame_equal(brushed_points(df, brush, index=index), expected)
+    pd.testing.assert_frame_equal(
+        brushed_points(df, brush, all_rows=True, index=index),
+        brushed_points(df, brush, all_rows=True),
+    )
+    np.testing.assert_array_equal(
+        index.brushed_rows(brush), np.flatnonzero(df.index.isin(expected.index))
+    )
+
+
+@pytest.mark.parametrize(
+    "point,threshold",
+    [((0.1, 0.2), 5), ((1.99, -3.9), 10), ((0, 0), 1000), ((2.02, 0), 5)],
+)
+def test_near_points_index(point: tuple[float, float], threshold: float):
+    df = make_df()
+    index = PointIndex(df, "x", "y")
+    coordinfo = make_coordinfo(*point)
+
+    for kwargs in [{}, {"max_points": 3}, {"all_rows": True}]:
+        pd.testing.assert_frame_equal(
+            near_points(df, coordinfo, threshold=threshold, index=index, **kwargs),
+            near_points(df, coordinfo, threshold=threshold, **kwargs),
+        )
+
+    # With panels
+    coordinfo = make_coordinfo(*point, mapping={"panelvar1": "g"})
+    pd.testing.assert_frame_equal(
+        near_points(df, coordinfo, threshold=threshold, index=index),
+        near_points(df, coordinfo, threshold=threshold),
+    )
+
+
+def test_point_index_checks_data():
+    df = make_df()
+    index = PointIndex(df, "x", "y")
+
+    with pytest.raises(ValueError, match="build a new `PointIndex`"):
+        brushed_points(df.iloc[1:], make_brush(0, 1, 0, 1), index=index)
+    with pytest.raises(ValueError, match="is for `xvar` x"):
+        brushed_points(df, make_brush(0, 1, 0, 1), xvar="y", index=index)
@@ -1,14 +1,25 @@
 """Tests for `shiny.reactive`."""
 
 import asyncio
-from typing import List
+import json
+from typing import List, cast
 
 import pytest
 
-from shiny import App, render, req, ui
+from shiny import App, Inputs, Outputs, Session, render, req, ui
 from shiny._connection import MockConnection
-from shiny.reactive import Value, calc, effect, event, flush, invalidate_later, isolate
-from shiny.reactive._core import ReactiveWarning
+from shiny.cache import MemoryCache
+from shiny.reactive import (
+    Value,
+    calc,
+    effect,
+    event,
+    flush,
+    invalidate_later,
+    isolate,
+    profile,
+)
+from shiny.reactive._core import FlushMode, ReactiveDomain, ReactiveWarning
 from shiny.types import ActionButtonValue, SilentException
 
 from .mocktime import MockTime
@@ -1377,3 +1388,385 @@ async def test_observer_async_suspended_resumed_observers_run_at_most_once():
     a.set(4)
     await flush()
     assert obs._exec_count == 2
+
+
+# ------------------------------------------------------------
+# Each session flushes its own reactive domain
+# ------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_session_reactive_domains():
+    shared = Value(0)
+    runs: dict[str, list[int]] = {}
+
+    def server(input: Inputs, output: Outputs, session: Session):
+        @effect
+        def _():
+            runs.setdefault(session.id, []).append(shared())
+
+        @effect
+        @event(input.x)
+        def _():
+            shared.set(input.x())
+
+    app = App(ui.TagList(), server)
+    conn_a = MockConnection()
+    conn_b = MockConnection()
+    session_a = app._create_session(conn_a)
+    session_b = app._create_session(conn_b)
+    tasks = [
+        asyncio.create_task(session_a._run()),
+        asyncio.create_task(session_b._run()),
+    ]
+
+    async def settle():
+        for _ in range(20):
+            await asyncio.sleep(0)
+
+    conn_a.cause_receive('{"method": "init", "data": {}}')
+    conn_b.cause_receive('{"method": "init", "data": {}}')
+    await settle()
+    assert runs == {session_a.id: [0], session_b.id: [0]}
+    assert session_a._reactive_domain.lock is not session_b._reactive_domain.lock
+
+    # Session A changes a value that session B depends on; B isn't handling a message
+    # of its own, so the app has to schedule a flush of B's domain.
+    conn_a.cause_receive('{"method": "update", "data": {"x": 5}}')
+    await settle()
+    assert runs == {session_a.id: [0, 5], session_b.id: [0, 5]}
+    assert app._sessions_needing_flush == {}
+
+    conn_a.cause_disconnect()
+    conn_b.cause_disconnect()
+    await asyncio.gather(*tasks)
+    assert app._sessions == {}
+
+
+@pytest.mark.asyncio
+async def test_default_domain_flushed_by_sessions():
+    # Flush anything that other tests left in the default domain
+    await flush()
+    shared = Value(0)
+    runs: list[int] = []
+    outputs: list[int] = []
+
+    # Created outside of any session, like a `reactive.poll()` at the top level of an
+    # app
+    @effect
+    def _():
+        runs.append(shared())
+
+    def server(input: Inputs, output: Outputs, session: Session):
+        @effect
+        @event(input.x)
+        def _():
+            shared.set(input.x())
+
+    app = App(ui.TagList(), server)
+    conn = MockConnection()
+    session = app._create_session(conn)
+    task = asyncio.create_task(session._run())
+
+    async def settle():
+        for _ in range(20):
+            await asyncio.sleep(0)
+
+    conn.cause_receive('{"method": "init", "data": {}}')
+    await settle()
+    assert runs == [0]
+
+    conn.cause_receive('{"method": "update", "data": {"x": 5}}')
+    await settle()
+    assert runs == [0, 5]
+
+    # A context that is queued while the session's lock is held, after the session
+    # has flushed, is flushed once the lock is released
+    with session._reactive_domain.use():
+
+        @effect
+        def _():
+            outputs.append(shared())
+
+    await settle()
+    assert outputs == [5]
+    async with session._reactive_domain.lock:
+        await session._reactive_domain.flush()
+        with isolate():
+            shared.set(6)
+    await settle()
+    assert outputs == [5, 6]
+    assert runs == [0, 5, 6]
+
+    conn.cause_disconnect()
+    await task
+
+
+# ------------------------------------------------------------
+# Concurrent flush mode
+# ------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_concurrent_flush_mode():
+    domain = ReactiveDomain(flush_mode="concurrent")
+    order: list[str] = []
+    b_started = asyncio.Event()
+
+    with domain.use():
+
+        @effect(priority=1)
+        async def first():
+            order.append("first")
+
+        @effect()
+        async def a():
+            # Only finishes if b gets to start while a is waiting
+            order.append("a start")
+            await b_started.wait()
+            order.append("a end")
+
+        @effect()
+        async def b():
+            order.append("b start")
+            b_started.set()
+            await asyncio.sleep(0)
+            order.append("b end")
+
+    await asyncio.wait_for(domain.flush(), timeout=1)
+    assert order[:3] == ["first", "a start", "b start"]
+    assert sorted(order[3:]) == ["a end", "b end"]
+
+
+@pytest.mark.asyncio
+async def test_flush_mode_by_priority():
+    def flush_mode(priority: int) -> FlushMode:
+        return "concurrent" if priority < 0 else "sequential"
+
+    domain = ReactiveDomain(flush_mode=flush_mode)
+    order: list[str] = []
+
+    def make_effect(name: str, priority: int):
+        @effect(priority=priority)
+        async def _():
+            order.append(name + " start")
+            await asyncio.sleep(0)
+            order.append(name + " end")
+
+    with domain.use():
+        make_effect("a", 0)
+        make_effect("b", 0)
+        make_effect("c", -1)
+        make_effect("d", -1)
+
+    await domain.flush()
+    assert order == [
+        "a start",
+        "a end",
+        "b start",
+        "b end",
+        "c start",
+        "d start",
+        "c end",
+        "d end",
+    ]
+
+
+# ------------------------------------------------------------
+# Profiling
+# ------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_profile():
+    a = Value(1)
+
+    @calc
+    def doubled():
+        return a() * 2
+
+    @effect
+    def obs():
+        doubled()
+
+    await flush()
+
+    with profile() as prof:
+        a.set(2)
+        await flush()
+
+    # Nothing is recorded after the profiler has exited
+    a.set(3)
+    await flush()
+
+    assert [(x["source"], x["target"]) for x in prof.invalidations] == [
+        ("value", "calc:doubled"),
+        ("calc:doubled", "effect:obs"),
+    ]
+    assert [(x["label"], x["invalidated_by"]) for x in prof.executions] == [
+        ("calc:doubled", ["value"]),
+        ("effect:obs", ["calc:doubled"]),
+    ]
+    assert len(prof.flushes) == 1
+    assert prof.flushes[0]["executions"] == 2
+
+    assert json.loads(prof.to_json()) == prof.to_dict()
+    trace = prof.to_chrome_trace()["traceEvents"]
+    assert isinstance(trace, list)
+    assert sorted(e["ph"] for e in trace) == ["X", "X", "X", "i", "i"]
+
+
+# ------------------------------------------------------------
+# Equality strategies and early cutoff
+# ------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_value_equals():
+    identity = Value([1, 2])
+    equal = Value([1, 2], equals="equal")
+    custom = Value(1.0, equals=lambda old, new: abs(old - new) < 0.5)
+
+    with isolate():
+        assert identity.set([1, 2]) is True
+        assert equal.set([1, 2]) is False
+        assert equal.set([1, 3]) is True
+        assert custom.set(1.2) is False
+        assert custom.get() == 1.0
+        assert custom.set(2.0) is True
+
+    with pytest.raises(ValueError):
+        Value(1, equals="nope")  # pyright: ignore[reportArgumentType]
+
+
+def test_equality_strategies_for_frames():
+    import numpy as np
+    import pandas as pd
+    import polars as pl
+
+    from shiny.reactive._equality import fingerprints_equal, values_equal
+
+    for eq in (values_equal, fingerprints_equal):
+        assert eq(np.array([1, 2]), np.array([1, 2]))
+        assert not eq(np.array([1, 2]), np.array([1, 3]))
+        assert eq(pd.DataFrame({"a": [1, 2]}), pd.DataFrame({"a": [1, 2]}))
+        assert not eq(pd.DataFrame({"a": [1, 2]}), pd.DataFrame({"b": [1, 2]}))
+        assert not eq(pd.DataFrame({"a": [1, 2]}), pd.DataFrame({"a": [1, 3]}))
+        assert eq(pl.DataFrame({"a": [1, 2]}), pl.DataFrame({"a": [1, 2]}))
+        assert not eq(pl.DataFrame({"a": [1, 2]}), pl.DataFrame({"a": [2, 1]}))
+        assert eq({"x": [1, 2]}, {"x": [1, 2]})
+        assert not eq(1, "1")
+
+    assert values_equal(np.array([1.0, np.nan]), np.array([1.0, np.nan]))
+    assert values_equal(np.array(["a", "b"]), np.array(["a", "b"]))
+    assert not values_equal(np.array(["a", "b"]), np.array(["a", "c"]))
+    assert values_equal(
+        np.array(["a", 1], dtype=object), np.array(["a", 1], dtype=object)
+    )
+    assert not values_equal(
+        np.array(["a", 1], dtype=object), np.array(["a", 2], dtype=object)
+    )
+
+    value = Value(np.array(["a", "b"]), equals="equal")
+    with isolate():
+        assert value.set(np.array(["a", "b"])) is False
+        assert value.set(np.array(["a", "c"])) is True
+
+
+@pytest.mark.asyncio
+async def test_calc_early_cutoff():
+    x = Value(1)
+
+    @calc(equals="equal")
+    def parity():
+        return x() % 2
+
+    @effect
+    def obs():
+        parity()
+
+    await flush()
+    assert parity._exec_count == 1
+    assert obs._exec_count == 1
+
+    # The calc re-executes, but its result is unchanged, so obs doesn't
+    x.set(3)
+    await flush()
+    assert parity._exec_count == 2
+    assert obs._exec_count == 1
+
+    x.set(4)
+    await flush()
+    assert parity._exec_count == 3
+    assert obs._exec_count == 2
+
+    # Without cutoff, every change is passed on
+    @calc
+    def parity2():
+        return x() % 2
+
+    @effect
+    def obs2():
+        parity2()
+
+    await flush()
+    x.set(6)
+    await flush()
+    assert obs2._exec_count == 2
+
+
+# ------------------------------------------------------------
+# Cached calcs
+# ------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_calc_cache():
+    cache = MemoryCache()
+    x = Value(1)
+    y = Value(10)
+    runs = 0
+
+    def make_calc():
+        @calc(cache=cache, cache_key=lambda: x())
+        def plus_y():
+            nonlocal runs
+            runs += 1
+            return x() + y()
+
+        return plus_y
+
+    # Two calcs from the same function (like the same calc in two sessions) share
+    # cached results.
+    calc1 = make_calc()
+    calc2 = make_calc()
+    with isolate():
+        assert calc1() == 11
+        assert calc2() == 11
+    assert runs == 1
+
+    results: list[int] = []
+
+    @effect
+    def obs():
+        results.append(calc1())
+
+    await flush()
+    x.set(2)
+    await flush()
+    x.set(1)
+    await flush()
+    assert results == [11, 12, 11]
+    assert runs == 2
+
+    # Only the cache key is a dependency
+    y.set(20)
+    await flush()
+    assert results == [11, 12, 11]
+
+    with pytest.raises(TypeError):
+        calc(cache=cache)(lambda: 1)
+
+
+@pytest.mark.asyncio
+async def test_calc_app_cache():
+    app = App(ui.TagList(), None)
+    session = app._create_session(MockConnection())
+
+    @calc(cache="app", cache_key=lambda: 1, session=session)
+    def value():
+        return "computed"
+
+    with isolate():
+        assert value() == "computed"
+    assert len(cast(MemoryCache, app.cache)) == 1
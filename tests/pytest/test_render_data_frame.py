@@ -1,9 +1,13 @@
+import json
+
 import pandas as pd
 import pytest
 
-from shiny import render
+from shiny import App, _json, reactive, render, ui
+from shiny._connection import MockConnection
 from shiny._deprecated import ShinyDeprecationWarning
 from shiny.render._data_frame_utils._selection import SelectionModes
+from shiny.session import session_context
 
 
 def test_data_frame_needs_unique_col_names():
@@ -27,6 +31,35 @@ def test_data_frame_needs_unique_col_names():
         data_table.to_payload()
 
 
+@pytest.mark.asyncio
+async def test_data_frame_payload_rows():
+    df = pd.DataFrame({"x": [1, 2], "y": ["a", "b"]})
+
+    # The public payload holds plain rows, which any JSON encoder can handle
+    for value in (render.DataGrid(df), render.DataTable(df)):
+        payload = value.to_payload()
+        assert payload["data"] == [[1, "a"], [2, "b"]]
+        assert json.loads(json.dumps(payload))["data"] == [[1, "a"], [2, "b"]]
+
+    # The rendered output holds the rows as already-encoded JSON
+    app = App(ui.TagList(), None)
+    session = app._create_session(MockConnection())
+    with session_context(session):
+
+        @render.data_frame
+        def out():
+            return df
+
+        out._set_output_metadata(output_id="out")
+
+        with reactive.isolate():
+            res = await out.render()
+
+    assert res is not None
+    assert isinstance(res["payload"]["data"], _json.RawJson)  # type: ignore
+    assert _json.loads(_json.dumps(res))["payload"]["data"] == [[1, "a"], [2, "b"]]
+
+
 def test_as_selection_modes_legacy():
 
     df = pd.DataFrame(data={"a": [1, 2]})
@@ -76,3 +109,40 @@ def test_as_selection_modes():
     for sm in ("col", "cols", "cell", "region"):
         with pytest.raises(RuntimeError, match="based cell selections"):
             SelectionModes(selection_mode_set={sm})
+
+
+@pytest.mark.asyncio
+async def test_data_frame_patches_applied_incrementally():
+    app = App(ui.TagList(), None)
+    session = app._create_session(MockConnection())
+    df = pd.DataFrame({"x": [1, 2, 3], "y": ["a", "b", "c"]})
+
+    with session_context(session):
+
+        @render.data_frame
+        def out():
+            return render.DataGrid(df, editable=True)
+
+        out._set_output_metadata(output_id="out")
+
+        with reactive.isolate():
+            await out.render()
+
+    patches_handler, _ = session._message_handlers["data_frame_patches_out"]
+    with session_context(session), reactive.isolate():
+        await patches_handler([{"row_index": 0, "column_index": 1, "value": "A"}])
+        patched = out._data_patched()
+        assert patched["y"].tolist() == ["A", "b", "c"]
+
+        await patches_handler(
+            [
+                {"row_index": 2, "column_index": 1, "value": "C"},
+                {"row_index": 1, "column_index": 0, "value": 20},
+            ]
+        )
+        assert out._data_patched()["y"].tolist() == ["A", "b", "C"]
+        assert out._data_patched()["x"].tolist() == [1, 20, 3]
+
+        # Earlier results and the original data are not modified
+        assert patched["y"].tolist() == ["A", "b", "c"]
+        assert df["y"].tolist() == ["a", "b", "c"]
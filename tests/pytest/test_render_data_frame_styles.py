@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import polars as pl
+import pytest
+
+from shiny import App, reactive, render, ui
+from shiny._connection import MockConnection
+from shiny.render._data_frame_utils._styles import (
+    as_browser_style_infos,
+    update_browser_style_infos,
+)
+from shiny.render._data_frame_utils._types import StyleInfo
+from shiny.session import session_context
+
+
+@pytest.mark.parametrize(
+    "rows",
+    [
+        pytest.param([False, True, True, False, True, True], id="list"),
+        pytest.param([1, 2, 4, 5], id="int_list"),
+        pytest.param(np.array([False, True, True, False, True, True]), id="numpy"),
+        pytest.param(np.array([1, 2, 4, 5]), id="numpy_int"),
+        pytest.param(pd.Series([None, True, True, False, True, True]), id="pandas"),
+        pytest.param(pl.Series([None, True, True, False, True, True]), id="polars"),
+        pytest.param(pl.col("x") > 1, id="polars_expr"),
+    ],
+)
+def test_style_rows(rows: object):
+    data = pl.DataFrame({"x": [0, 2, 3, 1, 4, 5], "y": list("abcdef")})
+    infos: list[StyleInfo] = [
+        {"rows": rows, "cols": ["y"], "class": "hi"},  # pyright: ignore
+    ]
+
+    assert as_browser_style_infos(infos, data=data) == [
+        {
+            "location": "body",
+            "rows": (1, 2, 4, 5),
+            "cols": (1,),
+            "style": None,
+            "class": "hi",
+        }
+    ]
+
+
+def test_style_rows_errors():
+    data = pd.DataFrame({"x": [0, 1, 2]})
+
+    with pytest.raises(ValueError, match="must match the number of rows"):
+        as_browser_style_infos([{"rows": np.array([True, False])}], data=data)
+    with pytest.raises(TypeError, match="polars expression"):
+        as_browser_style_infos([{"rows": pl.col("x") > 0}], data=data)
+
+
+def test_update_browser_style_infos():
+    data = pd.DataFrame({"x": [0, 5, 6, 1, 7, 8]})
+    calls: list[int] = []
+
+    def styles(df: pd.DataFrame) -> list[StyleInfo]:
+        calls.append(len(df))
+        return [
+            {"rows": (df["x"] > 4).to_numpy(), "class": "big"},
+            {"class": "cell"},
+        ]
+
+    browser_infos = as_browser_style_infos(styles, data=data)
+    assert [info["rows"] for info in browser_infos] == [(1, 2, 4, 5), None]
+
+    data.loc[[1, 3], "x"] = [2, 9]
+    res = update_browser_style_infos(browser_infos, styles, data=data, rows=[3, 1])
+    assert calls == [6, 2]
+    # The style of all rows is kept as is
+    assert [(info["rows"], info["class"]) for info in res] == [
+        ((2, 4, 5), "big"),
+        (None, "cell"),
+        ((3,), "big"),
+    ]
+    # The styles of each row are the same as re-evaluating all rows
+    full = as_browser_style_infos(styles, data=data)
+    assert {
+        row for info in res if info["class"] == "big" for row in info["rows"] or ()
+    } == set(full[0]["rows"] or ())
+
+
+def test_update_browser_style_infos_index_labels():
+    data = pd.DataFrame({"x": [0, 5, 6, 7, 8]})
+
+    def styles(df: pd.DataFrame) -> list[StyleInfo]:
+        # Rows found by their index labels
+        return [{"rows": df.index[df["x"] > 4].tolist(), "class": "big"}]
+
+    browser_infos = as_browser_style_infos(styles, data=data)
+    assert browser_infos[0]["rows"] == (1, 2, 3, 4)
+
+    # Edit a row in the middle, which keeps its style
+    data.loc[2, "x"] = 9
+    res = update_browser_style_infos(browser_infos, styles, data=data, rows=[2])
+    assert {row for info in res for row in info["rows"] or ()} == {1, 2, 3, 4}
+
+    data.loc[2, "x"] = 1
+    res = update_browser_style_infos(browser_infos, styles, data=data, rows=[2])
+    assert {row for info in res for row in info["rows"] or ()} == {1, 3, 4}
+
+
+@pytest.mark.asyncio
+async def test_data_frame_styles_rowwise():
+    app = App(ui.TagList(), None)
+    session = app._create_session(MockConnection())
+    df = pd.DataFrame({"x": [1, 2, 3, 4]})
+    calls: list[int] = []
+
+    def styles(data: pd.DataFrame) -> list[StyleInfo]:
+        calls.append(len(data))
+        return [{"rows": (data["x"] > 2).to_numpy(), "class": "big"}]
+
+    with session_context(session):
+
+        @render.data_frame
+        def out():
+            return render.DataGrid(
+                df, editable=True, styles=styles, styles_rowwise=True
+            )
+
+        out._set_output_metadata(output_id="out")
+
+        with reactive.isolate():
+            await out.render()
+
+    messages: list[tuple[str, object]] = []
+
+    async def send_message_to_browser(handler: str, obj: dict[str, object]):
+        messages.append((handler, obj))
+
+    out._send_message_to_browser = send_message_to_browser  # type: ignore
+    patches_handler, _ = session._message_handlers["data_frame_patches_out"]
+    with session_context(session), reactive.isolate():
+        await patches_handler([{"row_index": 0, "column_index": 0, "value": 10}])
+
+    assert calls == [4, 1]
+    assert messages == [
+        (
+            "updateStyles",
+            {
+                "styles": [
+                    {
+                        "location": "body",
+                        "rows": (2, 3),
+                        "cols": None,
+                        "style": None,
+                        "class": "big",
+                    },
+                    {
+                        "location": "body",
+                        "rows": (0,),
+                        "cols": None,
+                        "style": None,
+                        "class": "big",
+                    },
+                ]
+            },
+        )
+    ]
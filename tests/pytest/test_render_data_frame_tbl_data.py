@@ -10,12 +10,19 @@ import polars.testing as pl_testing
 import pytest
 from typing_extensions import TypeAlias
 
+from shiny import _json
+from shiny.render._data_frame_utils._column_cache import column_info_pd
+from shiny.render._data_frame_utils._patch import CellPatchMap
 from shiny.render._data_frame_utils._tbl_data import (
+    apply_frame_patches,
     copy_frame,
+    frame_column_names,
+    frame_columns,
     frame_shape,
     get_frame_cell,
     serialize_dtype,
     serialize_frame,
+    serialize_frame_json,
     subset_frame,
 )
 from shiny.ui import HTML, h1
@@ -155,6 +162,25 @@ def test_serialize_frame(df: DataFrameLike):
     }
 
 
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"x": [1.5, None], "y": ["a", None], "dt": [datetime(2000, 1, 2)] * 2},
+        {"x": [1.5, 2.0], "y": [3.0, 4.0]},
+        {"x": [1, 2], "y": [3, 4]},
+    ],
+)
+@pytest.mark.parametrize("frame_type", params_frames)
+def test_serialize_frame_json(frame_type: Any, data: dict[str, list[Any]]):
+    df = frame_type(data)
+    res = serialize_frame_json(df)
+    assert isinstance(res["data"], _json.RawJson)
+
+    expected = serialize_frame(df)
+    expected.pop("index", None)  # pyright: ignore[reportGeneralTypeIssues]
+    assert _json.loads(_json.dumps(res)) == expected
+
+
 def test_subset_frame(df: DataFrameLike):
     # TODO: this assumes subset_frame doesn't reset index
     res = subset_frame(df, rows=[1], cols=["chr", "num"])
@@ -188,3 +214,158 @@ def test_subset_frame_cols_single(small_df: DataFrameLike):
 
 def test_shape(small_df: DataFrameLike):
     assert frame_shape(small_df) == (2, 2)
+
+
+def test_column_info_cache():
+    df = pd.DataFrame({"x": [1, 2], "y": [3.5, 4.5], "c": pd.Categorical(["a", "b"])})
+
+    assert serialize_dtype(df["c"]) == {"type": "categorical", "categories": ["a", "b"]}
+    info = column_info_pd(df["c"])
+    assert info.dtype == {"type": "categorical", "categories": ["a", "b"]}
+
+    # Columns of the same 2D array have their own info
+    assert column_info_pd(df["x"]) is not column_info_pd(df["y"])
+    assert column_info_pd(df["x"]) is column_info_pd(df["x"])
+
+    # The info is shared by frames that hold the same values
+    with pd.option_context("mode.copy_on_write", True):
+        assert column_info_pd(df[["c"]].copy(deep=False)["c"]) is info
+    # ... and not by copies
+    assert column_info_pd(df.copy()["c"]) is not info
+
+    # Modifying the cached type hint doesn't change it
+    serialize_dtype(df["c"])["type"] = "string"
+    assert serialize_dtype(df["c"]) == {"type": "categorical", "categories": ["a", "b"]}
+
+
+def test_column_info_cache_object_columns():
+    df = pd.DataFrame({"z": ["a", "b"]})
+    assert serialize_dtype(df["z"]) == {"type": "string"}
+
+    # A value that is replaced in place changes the type hint
+    with pd.option_context("mode.copy_on_write", False):
+        df.loc[1, "z"] = HTML("<b>b</b>")
+    assert serialize_dtype(df["z"]) == {"type": "html"}
+    assert column_info_pd(df["z"]).dtype is None
+
+
+def test_apply_frame_patches(small_df: DataFrameLike):
+    res = apply_frame_patches(
+        small_df,
+        [
+            {"row_index": 1, "column_index": 1, "value": 7},
+            {"row_index": 0, "column_index": 0, "value": 5},
+            {"row_index": 1, "column_index": 1, "value": 8},
+        ],
+    )
+
+    assert_frame_equal(res, small_df.__class__({"x": [5, 2], "y": [3, 8]}))
+    # The original data is not modified
+    assert_frame_equal(small_df, small_df.__class__({"x": [1, 2], "y": [3, 4]}))
+
+
+def test_cell_patch_map():
+    patch_map = CellPatchMap([{"row_index": 1, "column_index": 1, "value": "a"}])
+    assert patch_map.version == 1
+
+    new_map = patch_map.with_patches(
+        [
+            {"row_index": 0, "column_index": 1, "value": "b"},
+            {"row_index": 1, "column_index": 1, "value": "c"},
+            {"row_index": 2, "column_index": 0, "value": "d"},
+        ]
+    )
+    assert new_map is not patch_map
+    assert new_map.shares_storage(patch_map)
+    assert len(new_map) == 3
+    assert new_map.patches() == [
+        {"row_index": 2, "column_index": 0, "value": "d"},
+        {"row_index": 0, "column_index": 1, "value": "b"},
+        {"row_index": 1, "column_index": 1, "value": "c"},
+    ]
+    assert new_map.patches_since(patch_map.version) == [
+        {"row_index": 0, "column_index": 1, "value": "b"},
+        {"row_index": 1, "column_index": 1, "value": "c"},
+        {"row_index": 2, "column_index": 0, "value": "d"},
+    ]
+    assert not CellPatchMap().shares_storage(new_map)
+
+    # Repeated edits of the same cells eventually drop the log
+    for i in range(2000):
+        new_map = new_map.with_patches(
+            [{"row_index": 0, "column_index": 0, "value": i}]
+        )
+    assert len(new_map) == 4
+    assert new_map.patches_since(patch_map.version) is None
+    assert new_map.patches_since(new_map.version) == []
+
+
+def _check_lazy_backend(data: Any):
+    # `data` holds {"x": [3, 1, None, 2, 1], "y": ["x", "Ab", "ab", None, "c"]}
+    assert frame_shape(data) == (5, 2)
+    assert frame_column_names(data) == ["x", "y"]
+    assert get_frame_cell(data, 1, 1) == "Ab"
+
+    subset = subset_frame(data, rows=[3, 0], cols=["y"])
+    assert frame_shape(subset) == (2, 1)
+    assert _json.loads(_json.dumps(serialize_frame_json(subset))) == {
+        "columns": ["y"],
+        "data": [[None], ["x"]],
+        "typeHints": [{"type": "string"}],
+    }
+    assert serialize_frame(subset_frame(data, rows=[1, 2]))["data"] == [
+        [1, "Ab"],
+        [None, "ab"],
+    ]
+
+    patched = apply_frame_patches(
+        data, [{"row_index": 2, "column_index": 0, "value": 7}]
+    )
+    assert get_frame_cell(patched, 2, 0) == 7
+    assert get_frame_cell(data, 2, 0) is None
+
+
+def test_pyarrow_backend():
+    pa = pytest.importorskip("pyarrow")
+
+    _check_lazy_backend(
+        pa.table({"x": [3, 1, None, 2, 1], "y": ["x", "Ab", "ab", None, "c"]})
+    )
+
+
+def test_duckdb_backend():
+    duckdb = pytest.importorskip("duckdb")
+
+    con = duckdb.connect()
+    rel = con.sql(
+        "SELECT * FROM (VALUES (0, 3, 'x'), (1, 1, 'Ab'), (2, NULL, 'ab'), "
+        "(3, 2, NULL), (4, 1, 'c')) AS t(i, x, y) ORDER BY i"
+    ).project("x, y")
+    _check_lazy_backend(rel)
+
+    # The number of rows is only counted once
+    from shiny.render._data_frame_utils._duckdb import _row_counts
+
+    assert _row_counts[rel] == 5
+    assert serialize_frame(subset_frame(rel, rows=[4, 1, 1]))["data"] == [
+        [1, "c"],
+        [1, "Ab"],
+        [1, "Ab"],
+    ]
+
+
+def test_polars_lazy_backend():
+    data = pl.LazyFrame({"x": [3, 1, None, 2, 1], "y": ["x", "Ab", "ab", None, "c"]})
+    _check_lazy_backend(data)
+
+    # Subsets and edits stay lazy
+    assert isinstance(subset_frame(data, rows=[4, 1, 1]), pl.LazyFrame)
+    assert isinstance(subset_frame(data, rows=range(1, 3)), pl.LazyFrame)
+    assert serialize_frame(subset_frame(data, rows=range(1, 3)))["data"] == [
+        [1, "Ab"],
+        [None, "ab"],
+    ]
+    assert [serialize_dtype(col) for col in frame_columns(data)] == [
+        {"type": "numeric"},
+        {"type": "string"},
+    ]
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Optional, cast
 
 import pytest
 
@@ -72,3 +72,71 @@ def test_effect():
         @render.text
         def my_output():
             return "42"
+
+
+@pytest.mark.asyncio
+async def test_render_cache():
+    from htmltools import TagList
+
+    from shiny import App
+    from shiny._connection import MockConnection
+    from shiny.cache import MemoryCache
+    from shiny.session import session_context
+
+    cache = MemoryCache()
+    app = App(TagList(), None)
+    sessions = [app._create_session(MockConnection()) for _ in range(2)]
+    for session in sessions:
+        session.input[".clientdata_pixelratio"]._set(2)
+        session.input[".clientdata_output_plt_width"]._set(400)
+        session.input[".clientdata_output_plt_height"]._set(300)
+
+    n_plots = 0
+    n_uis = 0
+
+    async def render_outputs(session: Session):
+        with session_context(session):
+
+            @render.plot(cache=cache, cache_key=lambda: session.input.n())
+            def plt():
+                from matplotlib.figure import Figure
+
+                nonlocal n_plots
+                n_plots += 1
+                fig = Figure()
+                fig.subplots().plot([1, 2, 3])
+                return fig
+
+            @render.ui(cache="app", cache_key=lambda: session.input.n())
+            def content():
+                nonlocal n_uis
+                n_uis += 1
+                return "Hello"
+
+            with reactive.isolate():
+                return await plt.render(), await content.render()
+
+    sessions[0].input["n"]._set(1)
+    sessions[1].input["n"]._set(1)
+    first = await render_outputs(sessions[0])
+    second = await render_outputs(sessions[1])
+    assert first == second
+    assert (n_plots, n_uis) == (1, 1)
+    assert isinstance(first[0], dict)
+    assert first[0]["width"] == "100%"
+    assert len(cast(MemoryCache, app.cache)) == 1
+
+    # The plot size is part of the key
+    sessions[1].input[".clientdata_output_plt_width"]._set(500)
+    await render_outputs(sessions[1])
+    assert (n_plots, n_uis) == (2, 1)
+
+    # So are the inputs that the cache key reads
+    sessions[1].input["n"]._set(2)
+    await render_outputs(sessions[1])
+    assert (n_plots, n_uis) == (3, 2)
+
+
+def test_render_cache_requires_key():
+    with pytest.raises(TypeError):
+        render.plot(cache="app")
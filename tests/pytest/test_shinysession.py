@@ -1,10 +1,19 @@
 """Tests for `shiny.Session`."""
 
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Optional
+
 import pytest
+from starlette.websockets import WebSocketState
 
 from shiny import ui
+from shiny._connection import StarletteConnection
 from shiny.reactive import effect, flush, isolate
 from shiny.session import Inputs
+from shiny.session._session import OutBoundMessageQueues
 from shiny.types import SilentException
 
 
@@ -76,3 +85,209 @@ async def test_input_nonexistent_deps():
     await flush()
     assert result is True
     assert o1._exec_count == 2
+
+
+def test_outbound_message_serialize():
+    omq = OutBoundMessageQueues()
+    omq.set_value("small", "x")
+    omq.set_value("large", "y" * 100)
+    omq.set_value("large2", "z" * 100)
+    omq.set_error("err", {"message": "oops"})
+    omq.add_input_message("in", {"value": 1})
+
+    messages, sizes = omq.serialize(max_message_size=50)
+    assert [(id, json.loads(m)) for id, m in messages] == [
+        # The browser treats a message with `errors` as the end of the flush, so the
+        # values that are sent on their own only have `values`
+        ("large", {"values": {"large": "y" * 100}}),
+        ("large2", {"values": {"large2": "z" * 100}}),
+        (
+            None,
+            {
+                "values": {"small": "x"},
+                "inputMessages": [{"id": "in", "message": {"value": 1}}],
+                "errors": {"err": {"message": "oops"}},
+            },
+        ),
+    ]
+    assert sizes == {
+        "small": len('"small":"x"'),
+        "large": len("large") + 105,
+        "large2": len("large2") + 105,
+    }
+
+    # Without a limit, everything is sent in one message
+    messages, _ = omq.serialize()
+    assert len(messages) == 1
+    assert json.loads(messages[0][1])["values"] == {
+        "small": "x",
+        "large": "y" * 100,
+        "large2": "z" * 100,
+    }
+
+
+@pytest.mark.asyncio
+async def test_flush_sends_each_output_once():
+    from shiny import App
+    from shiny._connection import MockConnection
+    from shiny.reactive import profile
+
+    sent: list[str] = []
+
+    class RecordingConnection(MockConnection):
+        async def send(self, message: str) -> None:
+            sent.append(message)
+
+    app = App(ui.TagList(), None)
+    app.max_message_size = 10
+    session = app._create_session(RecordingConnection())
+    session._outbound_message_queues.set_value("a", "a" * 20)
+    session._outbound_message_queues.set_value("b", 1)
+
+    with profile() as prof:
+        await session._flush()
+
+    assert [json.loads(m)["values"] for m in sent] == [{"a": "a" * 20}, {"b": 1}]
+    # Only the last message ends the flush
+    assert ["errors" in json.loads(m) for m in sent] == [False, True]
+    assert [(x["output"], x["bytes"]) for x in prof.outputs] == [("a", 26), ("b", 5)]
+    assert session._outbound_message_queues.values == {}
+
+
+class SlowWebSocket:
+    """A WebSocket whose client only receives messages when `receive()` is called."""
+
+    def __init__(self) -> None:
+        self.application_state = WebSocketState.CONNECTED
+        self.client_state = WebSocketState.CONNECTED
+        self.sent: list[str] = []
+        self.closed: Optional[int] = None
+        self._ready = asyncio.Event()
+
+    async def send_text(self, message: str) -> None:
+        await self._ready.wait()
+        self._ready.clear()
+        self.sent.append(message)
+
+    async def close(self, code: int) -> None:
+        self.closed = code
+        self.application_state = WebSocketState.DISCONNECTED
+
+    async def receive(self, n: int) -> None:
+        for _ in range(n):
+            self._ready.set()
+            while self._ready.is_set():
+                await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_starlette_connection_queue():
+    ws = SlowWebSocket()
+    conn = StarletteConnection(ws)  # pyright: ignore[reportArgumentType]
+
+    # Sending doesn't wait for the client
+    await conn.send("a")
+    await conn.send_superseding("value-1", "values:x")
+    await conn.send("b")
+    await conn.send_superseding("value-2", "values:x")
+    await conn.send("c")
+    await ws.receive(4)
+    # The value that was superseded before it was sent is dropped
+    assert ws.sent == ["a", "b", "value-2", "c"]
+
+    # Waiting messages are sent before the connection is closed
+    await conn.send("d")
+    closing = asyncio.create_task(conn.close(1000, None))
+    await asyncio.sleep(0)
+    assert ws.closed is None
+    await ws.receive(1)
+    await closing
+    assert ws.sent[-1] == "d"
+    assert ws.closed == 1000
+
+
+@pytest.mark.asyncio
+async def test_starlette_connection_backpressure():
+    ws = SlowWebSocket()
+    conn = StarletteConnection(ws)  # pyright: ignore[reportArgumentType]
+    conn.high_water_mark = 10
+
+    await conn.send("12345")
+    await asyncio.sleep(0)
+    # The first message is being sent, so this one waits in the queue
+    await conn.send("12345")
+    assert not conn.is_slow
+
+    # Above the high-water mark, senders wait until half of it is left
+    sending = asyncio.create_task(conn.send("1234567"))
+    await asyncio.sleep(0)
+    assert conn.is_slow and not sending.done()
+    await ws.receive(1)
+    assert not sending.done()
+    await ws.receive(1)
+    await sending
+    assert not conn.is_slow
+    await ws.receive(1)
+    assert ws.sent == ["12345", "12345", "1234567"]
+
+
+@pytest.mark.asyncio
+async def test_starlette_connection_superseded_backpressure():
+    ws = SlowWebSocket()
+    conn = StarletteConnection(ws)  # pyright: ignore[reportArgumentType]
+    conn.high_water_mark = 10
+
+    await conn.send("a")
+    await asyncio.sleep(0)
+    sending = asyncio.create_task(conn.send_superseding("123456789012", "values:x"))
+    await asyncio.sleep(0)
+    assert conn.is_slow and not sending.done()
+
+    # Once the large value is superseded, the senders no longer wait for the client
+    await conn.send_superseding("b", "values:x")
+    await sending
+    assert not conn.is_slow
+    await ws.receive(2)
+    assert ws.sent == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_starlette_connection_combines_control_messages():
+    ws = SlowWebSocket()
+    conn = StarletteConnection(ws)  # pyright: ignore[reportArgumentType]
+
+    def recalculating(name: str, status: str) -> str:
+        return json.dumps({"recalculating": {"name": name, "status": status}})
+
+    progress = json.dumps({"progress": {"type": "binding", "message": {"id": "a"}}})
+    await conn.send("first")
+    await asyncio.sleep(0)
+    # Queued while "first" is being sent
+    await conn.send_control(progress, "progress")
+    await conn.send_control(json.dumps({"busy": "busy"}), "busy")
+    await conn.send_control(recalculating("a", "recalculating"), "recalculating")
+    await conn.send_control(recalculating("a", "recalculated"), "recalculating")
+    await conn.send_control(progress, "progress")
+    await conn.send_control(recalculating("b", "recalculating"), "recalculating")
+    await conn.send('{"values": {}}')
+    await conn.send_control(json.dumps({"busy": "idle"}), "busy")
+    await ws.receive(6)
+
+    # Control messages are combined as long as the client handles them in the order
+    # they were sent, and each type appears once per frame
+    assert ws.sent[0] == "first"
+    assert [json.loads(m) for m in ws.sent[1:]] == [
+        {
+            "progress": {"type": "binding", "message": {"id": "a"}},
+            "busy": "busy",
+            "recalculating": {"name": "a", "status": "recalculating"},
+        },
+        {"recalculating": {"name": "a", "status": "recalculated"}},
+        {
+            "progress": {"type": "binding", "message": {"id": "a"}},
+            "recalculating": {"name": "b", "status": "recalculating"},
+        },
+        {"values": {}},
+        {"busy": "idle"},
+    ]
+    assert not conn._queue  # pyright: ignore[reportPrivateUsage]